@@ -8,6 +8,7 @@ setup(
         "alpaca-py>=0.43.0",
         "anthropic>=0.79.0",
         "supabase>=2.28.0",
+        "httpx>=0.24.0",
         "python-dotenv>=1.0.0",
         "requests>=2.31.0",
         "pandas>=2.0.0",
@@ -0,0 +1,70 @@
+-- Realized P&L aggregates for Database.get_outcome_aggregates().
+--
+-- Returns one row per group: the whole account (p_group_by NULL, key 'all'),
+-- per strategy ('strategy') or per signal source ('source', which falls back
+-- to strategy like the signal scorecard does). p_since filters on exit_date.
+-- Wins are realized_pnl > 0, losses < 0, flat = 0.
+
+create or replace function trade_outcome_aggregates(
+    p_account_id text,
+    p_group_by text default null,
+    p_since timestamptz default null
+)
+returns table (
+    group_key text,
+    trades bigint,
+    wins bigint,
+    losses bigint,
+    flat bigint,
+    total_pnl numeric,
+    gross_profit numeric,
+    gross_loss numeric,
+    pnl_pct_sum numeric,
+    holding_hours_sum numeric,
+    holding_count bigint,
+    best_trade jsonb,
+    worst_trade jsonb
+)
+language sql
+stable
+as $$
+    with o as (
+        select
+            case p_group_by
+                when 'strategy' then coalesce(nullif(strategy, ''), 'unknown')
+                when 'source' then coalesce(nullif(signal_source, ''), nullif(strategy, ''), 'unknown')
+                else 'all'
+            end as group_key,
+            symbol,
+            strategy,
+            coalesce(realized_pnl, 0) as pnl,
+            coalesce(pnl_pct, 0) as pnl_pct,
+            nullif(coalesce(holding_period_hours, 0), 0) as holding_hours,
+            created_at
+        from trade_outcomes
+        where account_id = p_account_id
+          and (p_since is null or exit_date >= p_since)
+    )
+    select
+        group_key,
+        count(*) as trades,
+        count(*) filter (where pnl > 0) as wins,
+        count(*) filter (where pnl < 0) as losses,
+        count(*) filter (where pnl = 0) as flat,
+        sum(pnl) as total_pnl,
+        coalesce(sum(pnl) filter (where pnl > 0), 0) as gross_profit,
+        coalesce(-sum(pnl) filter (where pnl < 0), 0) as gross_loss,
+        sum(pnl_pct) as pnl_pct_sum,
+        coalesce(sum(holding_hours), 0) as holding_hours_sum,
+        count(holding_hours) as holding_count,
+        (array_agg(jsonb_build_object('symbol', symbol, 'pnl', pnl, 'pnl_pct', pnl_pct, 'strategy', strategy)
+                   order by pnl desc, created_at desc))[1] as best_trade,
+        (array_agg(jsonb_build_object('symbol', symbol, 'pnl', pnl, 'pnl_pct', pnl_pct, 'strategy', strategy)
+                   order by pnl asc, created_at desc))[1] as worst_trade
+    from o
+    group by group_key;
+$$;
+
+-- Supporting index for the account + exit_date filter.
+create index if not exists trade_outcomes_account_exit_idx
+    on trade_outcomes (account_id, exit_date);
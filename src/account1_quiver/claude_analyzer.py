@@ -1,10 +1,12 @@
 import json
 import logging
 
+from src.shared.claude_cache import price_bucket
 from src.shared.claude_client import ClaudeClient
 from src.shared.database import Database
 from src.shared.alpaca_client import AlpacaClient
 from src.account1_quiver.config import ACCOUNT_ID
+from src.account1_quiver.record_index import fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,54 @@ Respond with this exact JSON structure:
 }"""
 
 
+class RunContext:
+    """Account-level context shared by every signal analysed in one run.
+
+    Built once by ClaudeAnalyzer.build_run_context: the scorecard, active
+    learnings, recent trade outcomes and one batched snapshot fetch for all
+    symbols about to be analysed. Read-only once built, so it is safe to
+    share across analysis threads.
+    """
+
+    def __init__(self, scorecard: list, learnings: list, past_trades: list,
+                 snapshots: dict):
+        self.scorecard = scorecard or []
+        self.learnings = learnings or []
+        self.past_trades = past_trades or []
+        self.snapshots = snapshots or {}
+
+    def trades_for(self, symbol: str) -> list:
+        return [t for t in self.past_trades if t.get("symbol") == symbol]
+
+    def current_price(self, symbol: str):
+        """Latest trade price from the prefetched snapshot (None if unavailable)."""
+        snap = self.snapshots.get(symbol)
+        try:
+            return float(snap.latest_trade.price) if snap and snap.latest_trade else None
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def price_context(self, symbol: str) -> str:
+        """Price lines for the prompt from the prefetched snapshot ('' if none)."""
+        current_price = self.current_price(symbol)
+        if current_price is None:
+            return ""
+        snap = self.snapshots[symbol]
+        try:
+            prev_close = float(snap.previous_daily_bar.close) if snap.previous_daily_bar else None
+            if prev_close:
+                daily_change = ((current_price - prev_close) / prev_close) * 100
+                return (
+                    f"Current Price: ${current_price:.2f}\n"
+                    f"Previous Close: ${prev_close:.2f}\n"
+                    f"Daily Change: {daily_change:+.2f}%"
+                )
+            return f"Current Price: ${current_price:.2f}"
+        except Exception as e:
+            logger.debug(f"Failed to read price data for {symbol}: {e}")
+            return ""
+
+
 class ClaudeAnalyzer:
     """Use Claude to evaluate scored signals with full context."""
 
@@ -39,48 +89,49 @@ class ClaudeAnalyzer:
         self.db = Database()
         self.alpaca = AlpacaClient(ACCOUNT_ID)
 
-    def analyze_signal(self, scored_signal: dict, portfolio_state: dict) -> dict:
-        """Analyze a scored signal with Claude, providing full context."""
-        symbol = scored_signal["symbol"]
-
-        # Gather context
-        scorecard = self.db.get_scorecard(ACCOUNT_ID)
-        learnings = self.db.get_learnings(ACCOUNT_ID)
-        past_trades = self.db.get_trade_outcomes(ACCOUNT_ID, limit=20)
-
-        # Fetch current market data for the symbol
-        price_context = ""
+    def build_run_context(self, symbols: list) -> RunContext:
+        """Fetch the shared analysis context once for a run over symbols."""
+        snapshots = {}
         try:
-            snapshots = self.alpaca.get_snapshots([symbol])
-            snap = snapshots.get(symbol) if snapshots else None
-            if snap and snap.latest_trade:
-                current_price = float(snap.latest_trade.price)
-                prev_close = float(snap.previous_daily_bar.close) if snap.previous_daily_bar else None
-                if prev_close:
-                    daily_change = ((current_price - prev_close) / prev_close) * 100
-                    price_context = (
-                        f"Current Price: ${current_price:.2f}\n"
-                        f"Previous Close: ${prev_close:.2f}\n"
-                        f"Daily Change: {daily_change:+.2f}%"
-                    )
-                else:
-                    price_context = f"Current Price: ${current_price:.2f}"
+            if symbols:
+                snapshots = self.alpaca.get_snapshots(list(symbols)) or {}
         except Exception as e:
-            logger.debug(f"Failed to fetch price data for {symbol}: {e}")
+            logger.debug(f"Failed to fetch price data for {len(symbols)} symbols: {e}")
+        return RunContext(
+            scorecard=self.db.get_scorecard(ACCOUNT_ID),
+            learnings=self.db.get_learnings(ACCOUNT_ID),
+            past_trades=self.db.get_trade_outcomes(ACCOUNT_ID, limit=20),
+            snapshots=snapshots,
+        )
+
+    def analyze_signal(self, scored_signal: dict, portfolio_state: dict,
+                       context: RunContext = None) -> dict:
+        """Analyze a scored signal with Claude, providing full context.
 
-        # Filter past trades for this symbol
-        symbol_trades = [t for t in past_trades if t.get("symbol") == symbol]
+        context is the run's shared RunContext; without one, it is fetched
+        for this symbol alone.
+        """
+        symbol = scored_signal["symbol"]
+        if context is None:
+            context = self.build_run_context([symbol])
 
-        context = self._build_context(
-            scored_signal, portfolio_state, scorecard, learnings, symbol_trades,
-            price_context=price_context,
+        # Account-level context is identical for every symbol in the run, so
+        # it goes first as a cacheable prefix; only the signal part varies
+        account_context = self._build_account_context(
+            portfolio_state, context.scorecard, context.learnings,
+        )
+        prompt = self._build_context(
+            scored_signal, context.trades_for(symbol),
+            price_context=context.price_context(symbol),
         )
 
         result = self.claude.analyze(
             system_prompt=SYSTEM_PROMPT,
-            user_prompt=context,
+            user_prompt=prompt,
             model="sonnet",
             analysis_type="signal_evaluation",
+            cached_context=account_context,
+            cache_inputs=self._signal_key(scored_signal, context.current_price(symbol)),
         )
 
         if result:
@@ -95,16 +146,74 @@ class ClaudeAnalyzer:
 
         return result or {}
 
+    @staticmethod
+    def _signal_key(scored_signal: dict, current_price) -> dict:
+        """Response-cache key for a scored signal set.
+
+        The signals are identified by record fingerprint and the price by
+        band, so re-scoring the same set at a near-identical price reuses
+        the analysis. Portfolio figures (cash, P&L) change every run and
+        are left out.
+        """
+        return {
+            "symbol": scored_signal["symbol"],
+            "signals": sorted(
+                fingerprint(sig.get("source", ""), {
+                    "signal_type": sig.get("signal_type"),
+                    "raw_data": sig.get("raw_data"),
+                })
+                for sig in scored_signal.get("signals", [])
+            ),
+            "composite_score": scored_signal.get("composite_score"),
+            "price": price_bucket(current_price),
+        }
+
+    def _build_account_context(self, portfolio_state: dict, scorecard: list,
+                               learnings: list) -> str:
+        """Build the account-level context shared by every signal in a run."""
+        # Signal source performance
+        scorecard_summary = ""
+        if scorecard:
+            for sc in scorecard:
+                scorecard_summary += (
+                    f"\n  - {sc['signal_source']}: "
+                    f"win_rate={sc.get('win_rate', 'N/A')}%, "
+                    f"avg_return={sc.get('avg_return_pct', 'N/A')}%, "
+                    f"sample_size={sc.get('total_signals', 0)}"
+                )
+
+        # Active learnings
+        learnings_summary = ""
+        if learnings:
+            for l in learnings[:10]:
+                learnings_summary += f"\n  - [{l.get('category', '')}] {l['insight']}"
+
+        # Portfolio state
+        portfolio_summary = (
+            f"Working Capital: ${portfolio_state.get('working_capital', 'N/A')}\n"
+            f"Current Invested: ${portfolio_state.get('invested', 'N/A')}\n"
+            f"Open Positions: {portfolio_state.get('position_count', 'N/A')}\n"
+            f"Today's P&L: ${portfolio_state.get('daily_pnl', 'N/A')}"
+        )
+
+        return f"""ACCOUNT CONTEXT
+
+SIGNAL SOURCE TRACK RECORD:
+{scorecard_summary or '  No historical data yet.'}
+
+ACTIVE LEARNINGS:
+{learnings_summary or '  No learnings accumulated yet.'}
+
+CURRENT PORTFOLIO:
+{portfolio_summary}"""
+
     def _build_context(
         self,
         scored_signal: dict,
-        portfolio_state: dict,
-        scorecard: list,
-        learnings: list,
         symbol_trades: list,
         price_context: str = "",
     ) -> str:
-        """Build the full context prompt for Claude."""
+        """Build the per-signal part of the prompt (follows the account context)."""
         # Signal details
         signal_summary = (
             f"Symbol: {scored_signal['symbol']}\n"
@@ -122,17 +231,6 @@ class ClaudeAnalyzer:
                 f"data={json.dumps(sig.get('raw_data', {}), default=str)[:300]}"
             )
 
-        # Signal source performance
-        scorecard_summary = ""
-        if scorecard:
-            for sc in scorecard:
-                scorecard_summary += (
-                    f"\n  - {sc['signal_source']}: "
-                    f"win_rate={sc.get('win_rate', 'N/A')}%, "
-                    f"avg_return={sc.get('avg_return_pct', 'N/A')}%, "
-                    f"sample_size={sc.get('total_signals', 0)}"
-                )
-
         # Past trades on this symbol
         symbol_history = ""
         if symbol_trades:
@@ -143,20 +241,6 @@ class ClaudeAnalyzer:
                     f"outcome={t.get('outcome', 'N/A')}"
                 )
 
-        # Active learnings
-        learnings_summary = ""
-        if learnings:
-            for l in learnings[:10]:
-                learnings_summary += f"\n  - [{l.get('category', '')}] {l['insight']}"
-
-        # Portfolio state
-        portfolio_summary = (
-            f"Working Capital: ${portfolio_state.get('working_capital', 'N/A')}\n"
-            f"Current Invested: ${portfolio_state.get('invested', 'N/A')}\n"
-            f"Open Positions: {portfolio_state.get('position_count', 'N/A')}\n"
-            f"Today's P&L: ${portfolio_state.get('daily_pnl', 'N/A')}"
-        )
-
         prompt = f"""SIGNAL EVALUATION REQUEST
 
 {signal_summary}
@@ -165,18 +249,9 @@ Signal Details:{raw_details}
 CURRENT MARKET DATA:
 {price_context or '  Price data unavailable.'}
 
-SIGNAL SOURCE TRACK RECORD:
-{scorecard_summary or '  No historical data yet.'}
-
 PAST TRADES ON {scored_signal['symbol']}:
 {symbol_history or '  No prior trades on this symbol.'}
 
-ACTIVE LEARNINGS:
-{learnings_summary or '  No learnings accumulated yet.'}
-
-CURRENT PORTFOLIO:
-{portfolio_summary}
-
-Evaluate this signal and provide your analysis as JSON."""
+Evaluate this signal against the account context above and provide your analysis as JSON."""
 
         return prompt
@@ -1,3 +1,5 @@
+import os
+
 ACCOUNT_ID = "quiver_strat"
 
 # Signal source configurations
@@ -69,6 +71,47 @@ SIGNAL_SOURCES = {
     },
 }
 
+# QuiverQuant fetching: enabled endpoints are requested in parallel on a
+# bounded pool (request starts still paced by the shared Quiver rate limit)
+# and each source is processed as soon as its response arrives
+QUIVER_FETCH = {
+    "concurrent": True,   # False = each processor fetches in turn
+    "workers": 4,
+    # Large payloads decoded record by record as the body arrives, so
+    # processor filters drop rows before the whole list is materialized
+    "stream_endpoints": ["/live/offexchange", "/bulk/congresstrading"],
+    # Diagnostics only (tracemalloc slows every allocation). Per-source peaks
+    # with concurrent off; with it on, the figure is a process-wide peak
+    "trace_memory": False,
+}
+
+# On-disk QuiverQuant response cache (gzip bodies + content hashes).
+# Entries younger than an endpoint's freshness window are served without a
+# request; older ones are revalidated with conditional headers. A source
+# whose payload hash matches the last processed one is skipped.
+QUIVER_CACHE = {
+    "enabled": True,
+    "dir": os.getenv("QUIVER_CACHE_DIR", ".cache/quiver"),
+    "fresh_minutes": {              # endpoints not listed: always revalidate
+        "/live/lobbying": 720,
+        "/live/govcontracts": 360,
+        "/live/govcontractsall": 360,
+        "/live/flights": 360,
+    },
+}
+
+# Fingerprints of records already processed (SQLite, next to the response
+# cache). Only sources whose processors judge each record on its own use
+# it; aggregating sources (insider clusters, lobbying, flights) need the
+# full payload every run.
+RECORD_INDEX = {
+    "enabled": True,
+    "path": os.path.join(QUIVER_CACHE["dir"], "records.sqlite"),
+    "ttl_days": 90,
+    "sources": ["house_trading", "senate_trading", "gov_contracts", "gov_contracts_all",
+                "off_exchange", "wikipedia", "wsb"],
+}
+
 # Base score for each signal source (before weights)
 BASE_SCORES = {
     "house_trading": 30,
@@ -89,6 +132,14 @@ MIN_COMPOSITE_SCORE = 15
 # Maximum age of signals to consider (hours)
 SIGNAL_MAX_AGE_HOURS = 48
 
+# Claude evaluation of the top scored signals
+CLAUDE_ANALYSIS = {
+    "max_signals": 20,                # top-N symbols sent to Claude per run
+    "concurrency": 4,                 # calls in flight at once (1 = serial)
+    "token_budget": 300_000,          # per run; no new calls once (projected) spent
+    "max_consecutive_failures": 3,    # circuit breaker, counted in score order
+}
+
 # Default exit parameters (used when Claude doesn't specify or for pre-existing positions)
 DEFAULT_STOP_LOSS_PCT = 8.0
 DEFAULT_TARGET_RETURN_PCT = 15.0
@@ -1,11 +1,12 @@
 import json
 import logging
-import time
 from datetime import datetime, timedelta, timezone
 
 from src.shared.alpaca_client import AlpacaClient
+from src.shared.account_state import AccountState
 from src.shared.risk_manager import RiskManager
 from src.shared.database import Database
+from src.shared.fill_reconciler import FillReconciler
 from src.account1_quiver.config import (
     ACCOUNT_ID, SIGNAL_MAX_AGE_HOURS,
     DEFAULT_STOP_LOSS_PCT, DEFAULT_TARGET_RETURN_PCT, DEFAULT_TIME_HORIZON_DAYS,
@@ -23,8 +24,10 @@ class Executor:
 
     def __init__(self):
         self.alpaca = AlpacaClient(ACCOUNT_ID)
-        self.risk = RiskManager(ACCOUNT_ID)
+        self.state = AccountState(self.alpaca)
+        self.risk = RiskManager(ACCOUNT_ID, state=self.state)
         self.db = Database()
+        self.fills = FillReconciler(self.alpaca, self.db, ACCOUNT_ID)
         self._upgrades_this_cycle = 0
 
     def execute_signals(self, analyzed_signals: list) -> list:
@@ -33,7 +36,7 @@ class Executor:
         If the market is closed, queues approved signals for execution
         at the next market open.
         """
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             queued = self._queue_signals(analyzed_signals)
             logger.info(
                 f"Market closed. Queued {len(queued)} signals for next open."
@@ -41,17 +44,21 @@ class Executor:
             return []
 
         executed = []
-        for signal in analyzed_signals:
-            result = self._execute_single(signal)
-            if result:
-                executed.append(result)
+        try:
+            for signal in analyzed_signals:
+                result = self._execute_single(signal)
+                if result:
+                    executed.append(result)
+        finally:
+            self.db.flush_signal_updates()
+            self.fills.reconcile()
 
         logger.info(f"Executed {len(executed)}/{len(analyzed_signals)} trades")
         return executed
 
     def execute_queued_orders(self) -> list:
         """Execute any pending queued orders if market is open."""
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             return []
 
         pending = self._get_pending_orders()
@@ -62,21 +69,25 @@ class Executor:
         logger.info(f"Found {len(pending)} queued orders to execute")
         executed = []
 
-        for order_row in pending:
-            signal = order_row.get("signal_data", {})
-            signal["symbol"] = order_row["symbol"]
-            signal["confidence"] = order_row.get("confidence", 50)
-            signal["position_size_pct"] = float(order_row.get("position_size_pct", 0.5))
-            signal["decision"] = order_row["direction"]
-            signal["thesis"] = order_row.get("reasoning", "")
-            signal["composite_score"] = float(order_row.get("composite_score", 0))
-
-            result = self._execute_single(signal)
-            if result:
-                self._mark_order_executed(order_row["id"])
-                executed.append(result)
-            else:
-                self._mark_order_executed(order_row["id"], status="failed")
+        try:
+            for order_row in pending:
+                signal = order_row.get("signal_data", {})
+                signal["symbol"] = order_row["symbol"]
+                signal["confidence"] = order_row.get("confidence", 50)
+                signal["position_size_pct"] = float(order_row.get("position_size_pct", 0.5))
+                signal["decision"] = order_row["direction"]
+                signal["thesis"] = order_row.get("reasoning", "")
+                signal["composite_score"] = float(order_row.get("composite_score", 0))
+
+                result = self._execute_single(signal)
+                if result:
+                    self._mark_order_executed(order_row["id"])
+                    executed.append(result)
+                else:
+                    self._mark_order_executed(order_row["id"], status="failed")
+        finally:
+            self.db.flush_signal_updates()
+            self.fills.reconcile()
 
         logger.info(f"Executed {len(executed)}/{len(pending)} queued orders")
         return executed
@@ -191,6 +202,7 @@ class Executor:
         if not order:
             self._record_skip(signal, "Order submission failed")
             return None
+        self.state.record_open(symbol, direction, position_size, order)
 
         trade_record = {
             "account_id": ACCOUNT_ID,
@@ -208,20 +220,7 @@ class Executor:
             "time_horizon_days": signal.get("time_horizon_days"),
         }
         db_trade = self.db.insert_trade(trade_record)
-
-        if db_trade:
-            try:
-                time.sleep(1)
-                order_info = self.alpaca.get_order(str(order.id))
-                if order_info and "filled" in str(order_info.status).lower():
-                    self.db.update_trade(db_trade["id"], {
-                        "status": "filled",
-                        "fill_price": float(order_info.filled_avg_price),
-                        "filled_at": str(order_info.filled_at),
-                    })
-                    logger.info(f"Order filled: {symbol} @ ${float(order_info.filled_avg_price):.2f}")
-            except Exception as e:
-                logger.warning(f"Order sync failed for {symbol} (non-fatal): {e}")
+        self.fills.track(db_trade)  # fill price/time synced in bulk at end of cycle
 
         logger.info(
             f"Executed {direction} {symbol} for ${position_size:.2f} "
@@ -241,7 +240,7 @@ class Executor:
 
         Returns (position, trade, retention_score) or (None, None, None).
         """
-        positions = self.alpaca.get_positions()
+        positions = self.state.positions
         open_trades = self.db.get_open_trades(ACCOUNT_ID)
 
         # Index trades by symbol, keeping the most recent per symbol
@@ -356,15 +355,18 @@ class Executor:
         return result
 
     def _record_skip(self, signal: dict, reason: str) -> None:
-        """Record a skipped signal in the database."""
+        """Record a skipped signal in the database.
+
+        The update is queued and written when the execution pass flushes.
+        """
         logger.info(f"Skipping {signal['symbol']}: {reason}")
 
-        # Update signal as not acted on
-        for raw_signal in signal.get("signals", [signal]):
-            if "id" in raw_signal:
-                self.db.client.table("signals").update(
-                    {"acted_on": False, "skip_reason": reason}
-                ).eq("id", raw_signal["id"]).execute()
+        # Mark signals as not acted on
+        fields = {"acted_on": False, "skip_reason": reason}
+        self.db.update_signals_batch(
+            [(raw["id"], fields) for raw in signal.get("signals", [signal]) if "id" in raw],
+            defer=True,
+        )
 
     def check_exit_conditions(self) -> list:
         """Check open positions against stored stop/target/time parameters.
@@ -374,11 +376,11 @@ class Executor:
         2. Hit their target return percentage
         3. Exceeded their time horizon
         """
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             logger.info("Exit check: market closed, skipping")
             return []
 
-        positions = self.alpaca.get_positions()
+        positions = self.state.positions
         open_trades = self.db.get_open_trades(ACCOUNT_ID)
         closed = []
 
@@ -448,6 +450,7 @@ class Executor:
 
         # Close position via Alpaca
         self.alpaca.close_position(symbol)
+        self.state.record_close(symbol)
 
         # Update trade status
         if trade and trade.get("id"):
@@ -481,7 +484,7 @@ class Executor:
 
     def execute_rebalance(self, actions: list) -> list:
         """Execute rebalancing trades."""
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             logger.warning("Market closed. Skipping rebalance.")
             return []
 
@@ -1,10 +1,13 @@
 import logging
 import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from src.shared.config import ACCOUNT_CONFIGS
 from src.shared.alerter import HealthTracker
 from src.shared.risk_manager import RiskManager
-from src.account1_quiver.config import ACCOUNT_ID
+from src.account1_quiver.config import ACCOUNT_ID, CLAUDE_ANALYSIS
 from src.account1_quiver.signal_generator import SignalGenerator
 from src.account1_quiver.signal_scorer import SignalScorer
 from src.account1_quiver.claude_analyzer import ClaudeAnalyzer
@@ -18,6 +21,105 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def analyze_top_signals(analyzer, scored_signals: list, portfolio_state: dict,
+                        tracker: HealthTracker):
+    """Run Claude over the top scored signals, yielding (scored, analysis) in score order.
+
+    Up to CLAUDE_ANALYSIS["concurrency"] calls are in flight at once (1
+    reproduces the serial loop). Results are consumed in score order, so the
+    consecutive-failure circuit breaker trips exactly where the serial loop
+    would; calls already in flight past that point are discarded. No new
+    call starts once the run's token budget is spent, or would be by the
+    calls in flight at the current average cost.
+    """
+    top = scored_signals[:CLAUDE_ANALYSIS.get("max_signals", 20)]
+    # Account-level context and prices are fetched once for the whole run
+    context = analyzer.build_run_context([s["symbol"] for s in top])
+    candidates = iter(top)
+    concurrency = max(1, CLAUDE_ANALYSIS.get("concurrency", 1))
+    token_budget = CLAUDE_ANALYSIS.get("token_budget")
+    max_failures = CLAUDE_ANALYSIS.get("max_consecutive_failures", 3)
+    start_tokens = analyzer.claude.tokens_used()
+    latencies = []
+    pending = deque()  # (scored, future) in score order
+    budget_hit = False
+
+    def timed_analysis(scored):
+        started = time.monotonic()
+        try:
+            return analyzer.analyze_signal(scored, portfolio_state, context), None
+        except Exception as e:
+            return None, e
+        finally:
+            latencies.append(time.monotonic() - started)
+
+    def submit_more(pool):
+        nonlocal budget_hit
+        while len(pending) < concurrency and not budget_hit:
+            if token_budget:
+                used = analyzer.claude.tokens_used() - start_tokens
+                avg = used / len(latencies) if latencies else 0
+                if used + avg * len(pending) >= token_budget:
+                    budget_hit = True
+                    tracker.add_warning(
+                        f"Claude token budget ({token_budget}) reached after "
+                        f"{len(latencies)} analyses; skipping remaining signals",
+                        service="Claude",
+                    )
+                    return
+            scored = next(candidates, None)
+            if scored is None:
+                return
+            pending.append((scored, pool.submit(timed_analysis, scored)))
+
+    started = time.monotonic()
+    consecutive_failures = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="claude") as pool:
+        submit_more(pool)
+        while pending:
+            scored, future = pending.popleft()
+            analysis, error = future.result()
+            if error is not None:
+                tracker.add_error(
+                    "Claude", f"Analysis failed for {scored['symbol']}: {error}",
+                    f"Signal {scored['symbol']} skipped"
+                )
+            elif not analysis:
+                consecutive_failures += 1
+                tracker.add_warning(
+                    f"Claude returned empty analysis for {scored['symbol']}",
+                    service="Claude",
+                )
+            else:
+                consecutive_failures = 0  # Reset on success
+                yield scored, analysis
+
+            if consecutive_failures >= max_failures:
+                if pending or next(candidates, None) is not None:
+                    logger.warning(
+                        f"Circuit breaker: {consecutive_failures} consecutive Claude failures, "
+                        f"skipping remaining signals"
+                    )
+                    tracker.add_warning(
+                        f"Claude circuit breaker tripped after {consecutive_failures} failures",
+                        service="Claude",
+                    )
+                for _, in_flight in pending:
+                    in_flight.cancel()
+                break
+            submit_more(pool)
+
+    if latencies:
+        wall = time.monotonic() - started
+        serial = sum(latencies)
+        logger.info(
+            f"Claude analysis: {len(latencies)} calls in {wall:.1f}s wall vs "
+            f"{serial:.1f}s serial-equivalent ({serial / wall if wall else 1:.1f}x) "
+            f"at concurrency {concurrency}, "
+            f"{analyzer.claude.tokens_used() - start_tokens} tokens"
+        )
+
+
 def run():
     """Main entry point for Account 1 QuiverQuant strategy."""
     tracker = HealthTracker("quiver-strategy", ACCOUNT_ID)
@@ -50,6 +152,7 @@ def run():
             raw_signals = []
 
         if not raw_signals:
+            generator.commit_processed()
             logger.info("No signals generated. Checking for rebalance...")
             # Check rebalance even if no new signals
             pie_mgr = PieManager()
@@ -69,6 +172,14 @@ def run():
                 raw_signals[i]["id"] = saved["id"]
                 raw_signals[i]["signal_id"] = saved["id"]
         logger.info(f"Saved {len(saved_rows)} signals to DB")
+        # Only now are the source payloads and records safe to skip next run
+        if len(saved_rows) == len(raw_signals):
+            generator.commit_processed()
+        else:
+            tracker.add_warning(
+                f"Saved {len(saved_rows)}/{len(raw_signals)} signals; sources will be reprocessed",
+                service="Supabase",
+            )
 
         # Step 3: Score and rank signals
         scorer = SignalScorer()
@@ -83,63 +194,39 @@ def run():
         # Step 4: Get portfolio state for Claude context
         working_capital = risk.get_working_capital()
         invested = risk.get_invested_amount()
-        daily_pnl = sum(
-            float(pos.unrealized_intraday_pl)
-            for pos in risk.alpaca.get_positions()
-        )
+        daily_pnl = risk.state.unrealized_intraday_pl
         portfolio_state = {
             "working_capital": round(working_capital, 2),
             "invested": round(invested, 2),
-            "position_count": risk.alpaca.get_position_count(),
+            "position_count": risk.state.position_count,
             "daily_pnl": round(daily_pnl, 2),
         }
 
-        # Step 5: Claude analyzes top signals
+        # Step 5: Claude analyzes top signals (in score order)
         analyzer = ClaudeAnalyzer()
         approved_signals = []
-        consecutive_failures = 0
-        MAX_CONSECUTIVE_FAILURES = 3
-
-        for scored in scored_signals[:20]:  # Analyze top 20 at most
-            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                logger.warning(
-                    f"Circuit breaker: {consecutive_failures} consecutive Claude failures, "
-                    f"skipping remaining signals"
-                )
-                tracker.add_warning(
-                    f"Claude circuit breaker tripped after {consecutive_failures} failures",
-                    service="Claude",
-                )
-                break
-
-            try:
-                analysis = analyzer.analyze_signal(scored, portfolio_state)
-                if not analysis:
-                    consecutive_failures += 1
-                    tracker.add_warning(
-                        f"Claude returned empty analysis for {scored['symbol']}",
-                        service="Claude",
-                    )
-                    continue
-
-                consecutive_failures = 0  # Reset on success
 
+        # Signal updates are queued during the loop and flushed even if it fails
+        try:
+            for scored, analysis in analyze_top_signals(analyzer, scored_signals, portfolio_state, tracker):
                 confidence = analysis.get("confidence", 0)
                 decision = analysis.get("decision", "skip")
 
-                # Update signals with analysis results
-                for sig in scored.get("signals", []):
-                    if sig.get("id"):
-                        db.client.table("signals").update({
-                            "confidence": confidence,
-                            "composite_score": scored["composite_score"],
-                            "acted_on": confidence >= min_confidence and decision != "skip",
-                            "skip_reason": (
-                                f"Confidence {confidence} < {min_confidence}"
-                                if confidence < min_confidence
-                                else None
-                            ),
-                        }).eq("id", sig["id"]).execute()
+                # Queue signal updates with analysis results
+                fields = {
+                    "confidence": confidence,
+                    "composite_score": scored["composite_score"],
+                    "acted_on": confidence >= min_confidence and decision != "skip",
+                    "skip_reason": (
+                        f"Confidence {confidence} < {min_confidence}"
+                        if confidence < min_confidence
+                        else None
+                    ),
+                }
+                db.update_signals_batch(
+                    [(sig["id"], fields) for sig in scored.get("signals", []) if sig.get("id")],
+                    defer=True,
+                )
 
                 if confidence >= min_confidence and decision != "skip":
                     # Merge scored signal data with Claude analysis
@@ -156,12 +243,8 @@ def run():
                         f"REJECTED: {scored['symbol']} "
                         f"(confidence={confidence}, decision={decision})"
                     )
-
-            except Exception as e:
-                tracker.add_error(
-                    "Claude", f"Analysis failed for {scored['symbol']}: {e}",
-                    f"Signal {scored['symbol']} skipped"
-                )
+        finally:
+            db.flush_signal_updates()
 
         # Step 6: Execute approved trades
         if approved_signals:
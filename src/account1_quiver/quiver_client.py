@@ -1,3 +1,6 @@
+import codecs
+import hashlib
+import json
 import logging
 import time
 from typing import Optional
@@ -6,23 +9,96 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src.account1_quiver.config import QUIVER_CACHE, QUIVER_FETCH
+from src.account1_quiver.response_cache import ResponseCache, content_hash
 from src.shared.config import QUIVER_API_TOKEN, QUIVER_BASE_URL
+from src.shared.rate_limiter import limiter_for
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def iter_json_records(chunks):
+    """Incrementally decode a JSON array body, yielding one element at a time.
+
+    chunks is an iterable of bytes. Only the current undecoded tail of the
+    body is buffered, so records can be filtered as they arrive. A body
+    that isn't a top-level array (e.g. {"results": [...]}) is decoded in
+    full and its records yielded afterwards.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf, pos = "", 0
+    in_array = None  # unknown until the first non-whitespace character
+    done = False
+
+    for chunk in chunks:
+        buf = buf[pos:] + text.decode(chunk)
+        pos = 0
+        if in_array is None:
+            stripped = buf.lstrip()
+            if not stripped:
+                continue
+            in_array = stripped[0] == "["
+            pos = len(buf) - len(stripped) + (1 if in_array else 0)
+        if not in_array or done:
+            continue
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                done = True
+                break
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element continues in the next chunk
+            if end == len(buf) and not isinstance(record, (dict, list, str)):
+                break  # a number/literal may continue in the next chunk
+            pos = end
+            yield record
+
+    buf = buf[pos:] + text.decode(b"", final=True)
+    if in_array is None:
+        return
+    if in_array:
+        if not done:
+            raise ValueError("Truncated JSON array in response body")
+        return
+    data = json.loads(buf)
+    if isinstance(data, dict) and "results" in data:
+        data = data["results"]
+    yield from (data if isinstance(data, list) else [data])
+
 
 class QuiverClient:
     """HTTP client for QuiverQuant API endpoints."""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = None):
         self.base_url = QUIVER_BASE_URL
         self.headers = {
             "accept": "application/json",
             "Authorization": f"Token {QUIVER_API_TOKEN}",
         }
-        self.request_delay = 1.0  # Rate limiting between requests
+        # Paces requests per token (shared across processes), replacing a
+        # fixed sleep after every response
+        self.limiter = limiter_for("quiver", "api", QUIVER_API_TOKEN)
         self.timeout = 90  # Generous timeout for large endpoints
         self.max_retries = 3
+        # endpoint -> {"seconds", "bytes", "records", "ok", "cached", "hash"}
+        # for the latest fetch
+        self.fetch_stats = {}
+        if use_cache is None:
+            use_cache = QUIVER_CACHE.get("enabled", False)
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = ResponseCache(QUIVER_CACHE["dir"])
+            except OSError as e:
+                logger.warning(f"QuiverQuant response cache disabled: {e}")
 
         # Session with retry strategy for transient failures
         self.session = requests.Session()
@@ -37,23 +113,57 @@ class QuiverClient:
         self.session.mount("http://", adapter)
 
     def _get(self, endpoint: str, params: dict = None) -> Optional[list]:
-        """Make a GET request to the QuiverQuant API with retries."""
+        """Make a GET request to the QuiverQuant API with retries.
+
+        With the response cache, a fresh entry is returned without a
+        request and a stale one is revalidated (304 reuses the cached body).
+        """
         url = f"{self.base_url}{endpoint}"
+        stats = {"seconds": 0.0, "bytes": 0, "records": 0, "ok": False,
+                 "cached": False, "hash": None}
+        self.fetch_stats[endpoint] = stats
+
+        stream = endpoint in QUIVER_FETCH.get("stream_endpoints", ())
         try:
+            cached, cached_body = None, None
+            if self.cache:
+                cached = self.cache.load(endpoint, params)
+                if cached and not stream:
+                    cached_body = self.cache.body(endpoint, params)
+                    if cached_body is None:
+                        cached = None
+            if cached:
+                fresh_seconds = QUIVER_CACHE["fresh_minutes"].get(endpoint, 0) * 60
+                if time.time() - cached["fetched_at"] < fresh_seconds:
+                    return self._from_cache(endpoint, params, cached, cached_body, stats)
+
+            headers = dict(self.headers)
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+            self.limiter.acquire()
             logger.info(f"Fetching {endpoint}...")
+            start = time.monotonic()
             resp = self.session.get(
-                url, headers=self.headers, params=params, timeout=self.timeout
+                url, headers=headers, params=params, timeout=self.timeout, stream=stream
             )
+            stats["seconds"] = round(time.monotonic() - start, 2)
+            if resp.status_code == 304 and cached:
+                resp.close()
+                self.cache.touch(endpoint, params, cached)
+                return self._from_cache(endpoint, params, cached, cached_body, stats)
             resp.raise_for_status()
-            time.sleep(self.request_delay)
-            data = resp.json()
-            if isinstance(data, list):
-                logger.info(f"{endpoint}: {len(data)} records")
-                return data
-            elif isinstance(data, dict) and "results" in data:
-                logger.info(f"{endpoint}: {len(data['results'])} records")
-                return data["results"]
-            return data if isinstance(data, list) else [data]
+
+            if stream:
+                return self._decode_stream(endpoint, params, resp, stats, start)
+            stats["bytes"] = len(resp.content)
+            if self.cache:
+                stats["hash"] = self.cache.store(endpoint, params, resp.content, resp.headers)["hash"]
+            else:
+                stats["hash"] = content_hash(resp.content)
+            return self._decode(endpoint, resp.content, stats)
         except requests.exceptions.HTTPError as e:
             logger.error(f"QuiverQuant API error for {endpoint}: {e}")
             return None
@@ -67,6 +177,72 @@ class QuiverClient:
             logger.error(f"QuiverQuant request failed for {endpoint}: {e}")
             return None
 
+    def _from_cache(self, endpoint: str, params: dict, meta: dict,
+                    body: Optional[bytes], stats: dict):
+        """Serve a fresh or revalidated entry (streamed when body is None)."""
+        stats.update(cached=True, hash=meta["hash"])
+        if body is None:
+            return self._decode_stream(endpoint, params, None, stats)
+        return self._decode(endpoint, body, stats)
+
+    def _decode_stream(self, endpoint: str, params: dict, resp, stats: dict,
+                       start: float = None):
+        """Yield records as the body arrives (from resp, or the cache if None).
+
+        A fresh body is hashed and written to the cache chunk by chunk; the
+        entry and stats["hash"] are only committed once the whole body has
+        been decoded, so an abandoned or failed stream never replaces a
+        good entry.
+        """
+        if resp is None:
+            chunks = self.cache.iter_body(endpoint, params, STREAM_CHUNK_BYTES)
+            writer, hasher = None, None
+        else:
+            chunks = resp.iter_content(STREAM_CHUNK_BYTES)
+            writer = self.cache.writer(endpoint, params) if self.cache else None
+            hasher = hashlib.sha256()
+
+        def tee(chunks):
+            for chunk in chunks:
+                if resp is not None:
+                    stats["bytes"] += len(chunk)
+                    hasher.update(chunk)
+                    if writer:
+                        writer.write(chunk)
+                yield chunk
+
+        completed = False
+        try:
+            for record in iter_json_records(tee(chunks)):
+                stats["records"] += 1
+                yield record
+            completed = True
+        finally:
+            if resp is not None:
+                resp.close()
+                if not completed and writer:
+                    writer.abort()
+        if resp is not None:
+            stats["hash"] = writer.commit(resp.headers)["hash"] if writer else hasher.hexdigest()
+            stats["seconds"] = round(time.monotonic() - start, 2)
+        stats["ok"] = True
+        source = "cache" if stats["cached"] else f"{stats['bytes'] / 1024:.0f} KB"
+        logger.info(
+            f"{endpoint}: streamed {stats['records']} records ({source}) in {stats['seconds']:.1f}s"
+        )
+
+    def _decode(self, endpoint: str, body: bytes, stats: dict) -> list:
+        """Parse a response body into a list of records, filling in stats."""
+        data = json.loads(body)
+        if isinstance(data, dict) and "results" in data:
+            data = data["results"]
+        elif not isinstance(data, list):
+            data = [data]
+        stats.update(records=len(data), ok=True)
+        source = "cache" if stats["cached"] else f"{stats['bytes'] / 1024:.0f} KB"
+        logger.info(f"{endpoint}: {len(data)} records ({source}) in {stats['seconds']:.1f}s")
+        return data
+
     def get_congress_trades(self) -> Optional[list]:
         """Get recent congressional trades. Falls back to bulk endpoint."""
         data = self._get("/live/congresstrading")
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+_SQL_BATCH = 500  # stay under SQLite's bound-parameter limit
+
+
+def fingerprint(source: str, record: dict) -> int:
+    """64-bit signed fingerprint of a canonicalized (source, record) pair."""
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(f"{source}\x1f{canonical}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class RecordIndex:
+    """Persistent set of Quiver records already processed into signals.
+
+    Stores one 64-bit fingerprint per record (as the SQLite rowid) with its
+    first-seen time. filter_new() drops records seen on earlier runs;
+    callers add() the fingerprints only once the resulting signals are
+    stored, so a failed run is retried. Entries older than ttl_days are compacted away
+    on open, keeping the file bounded by what the feeds return in that
+    window.
+    """
+
+    def __init__(self, path: str, ttl_days: float = 90):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "fp INTEGER PRIMARY KEY, first_seen INTEGER NOT NULL)"
+        )
+        self.compact()
+
+    def compact(self) -> int:
+        """Delete fingerprints past the TTL. Returns the number removed."""
+        cutoff = int(time.time() - self.ttl_seconds)
+        with self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM seen WHERE first_seen < ?", (cutoff,)
+            ).rowcount
+        if removed:
+            logger.info(f"Record index: compacted {removed} expired fingerprints")
+        return removed
+
+    def _seen(self, fps: list) -> set:
+        found = set()
+        for i in range(0, len(fps), _SQL_BATCH):
+            batch = fps[i:i + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                row[0] for row in self.conn.execute(
+                    f"SELECT fp FROM seen WHERE fp IN ({placeholders})", batch
+                )
+            )
+        return found
+
+    def filter_new(self, source: str, records) -> tuple:
+        """Split out records not seen before.
+
+        Returns (new_records, fingerprints); pass the fingerprints to add()
+        after the records have been processed. A list comes back as a list;
+        any other iterable (e.g. a streamed payload) is filtered lazily, in
+        which case the fingerprint list fills as new_records is consumed.
+        """
+        new_fps = []
+
+        def new_records():
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= _SQL_BATCH:
+                    yield from self._filter_batch(source, batch, new_fps)
+                    batch = []
+            yield from self._filter_batch(source, batch, new_fps)
+
+        if isinstance(records, list):
+            return list(new_records()), new_fps
+        return new_records(), new_fps
+
+    def _filter_batch(self, source: str, batch: list, new_fps: list):
+        fps = [fingerprint(source, r) for r in batch]
+        seen = self._seen(list(set(fps)))
+        for record, fp in zip(batch, fps):
+            if fp not in seen:
+                new_fps.append(fp)
+                yield record
+
+    def add(self, fps: list) -> None:
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (fp, first_seen) VALUES (?, ?)",
+                [(fp, now) for fp in set(fps)],
+            )
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
@@ -0,0 +1,208 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(endpoint: str, params: dict = None) -> str:
+    """Stable file-name-safe key for an endpoint + query params."""
+    raw = endpoint + "?" + json.dumps(params or {}, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of raw QuiverQuant response bodies.
+
+    Each entry is a gzip-compressed body plus a small JSON sidecar holding
+    the endpoint, params, content hash, fetch time and validators (ETag /
+    Last-Modified) for conditional requests. Body files are named by their
+    content hash, so the sidecar (replaced atomically) always names a body
+    matching its hash. A separate processed.json
+    records, per signal source, the content hash last turned into signals,
+    so unchanged payloads can skip processing entirely.
+
+    All failures are logged and treated as a cache miss.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _body_path(self, key: str, digest: str) -> str:
+        return os.path.join(self.directory, f"{key}.{digest[:16]}.body.gz")
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        with open(self._meta_path(key)) as f:
+            return json.load(f)
+
+    def load(self, endpoint: str, params: dict = None) -> Optional[dict]:
+        """Return the entry's metadata dict (without the body), or None."""
+        key = cache_key(endpoint, params)
+        if not os.path.exists(self._meta_path(key)):
+            return None
+        try:
+            meta = self._read_meta(key)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable cache entry for {endpoint}: {e}")
+            return None
+        if not os.path.exists(self._body_path(key, meta.get("hash") or "")):
+            return None
+        return meta
+
+    def _entry_body_path(self, endpoint: str, params: dict) -> Optional[str]:
+        meta = self.load(endpoint, params)
+        return self._body_path(cache_key(endpoint, params), meta["hash"]) if meta else None
+
+    def body(self, endpoint: str, params: dict = None) -> Optional[bytes]:
+        body_path = self._entry_body_path(endpoint, params)
+        if body_path is None:
+            return None
+        try:
+            with gzip.open(body_path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError) as e:
+            logger.warning(f"Unreadable cached body for {endpoint}: {e}")
+            return None
+
+    def iter_body(self, endpoint: str, params: dict = None, chunk_size: int = 65536):
+        """Yield the cached body in decompressed chunks (for streaming decode)."""
+        body_path = self._entry_body_path(endpoint, params)
+        if body_path is None:
+            raise FileNotFoundError(f"No cached body for {endpoint}")
+        with gzip.open(body_path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def store(self, endpoint: str, params: dict, body: bytes,
+              headers: dict = None) -> dict:
+        """Write body and metadata; returns the new metadata."""
+        writer = self.writer(endpoint, params)
+        writer.write(body)
+        return writer.commit(headers)
+
+    def writer(self, endpoint: str, params: dict = None) -> "_BodyWriter":
+        """Incremental writer for a body that is being streamed."""
+        return _BodyWriter(self, endpoint, params)
+
+    def touch(self, endpoint: str, params: dict, meta: dict) -> dict:
+        """Mark a still-valid entry (e.g. after a 304) as freshly fetched."""
+        meta = {**meta, "fetched_at": time.time()}
+        try:
+            self._write_json(self._meta_path(cache_key(endpoint, params)), meta)
+        except OSError as e:
+            logger.warning(f"Failed to refresh cache entry for {endpoint}: {e}")
+        return meta
+
+    def processed_hash(self, source: str) -> Optional[str]:
+        return self._read_processed().get(source)
+
+    def mark_processed(self, source: str, digest: str) -> None:
+        processed = self._read_processed()
+        processed[source] = digest
+        try:
+            self._write_json(os.path.join(self.directory, "processed.json"), processed)
+        except OSError as e:
+            logger.warning(f"Failed to record processed hash for {source}: {e}")
+
+    def _read_processed(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, "processed.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_json(path: str, data: dict) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+
+class _BodyWriter:
+    """Compresses and hashes a body chunk by chunk; commit() publishes it.
+
+    The entry only replaces the previous one on commit, so an interrupted
+    download leaves the old entry intact. Write failures disable the writer
+    (the response is still returned, just not cached).
+    """
+
+    def __init__(self, cache: ResponseCache, endpoint: str, params: dict):
+        self.cache = cache
+        self.endpoint = endpoint
+        self.params = params or {}
+        self.key = cache_key(endpoint, params)
+        self.tmp_path = os.path.join(cache.directory, self.key + ".body.tmp")
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        try:
+            self.file = gzip.open(self.tmp_path, "wb")
+        except OSError as e:
+            logger.warning(f"Failed to cache {endpoint}: {e}")
+            self.file = None
+
+    def write(self, chunk: bytes) -> None:
+        self.hasher.update(chunk)
+        self.size += len(chunk)
+        if self.file is None:
+            return
+        try:
+            self.file.write(chunk)
+        except OSError as e:
+            logger.warning(f"Failed to cache {self.endpoint}: {e}")
+            self.abort()
+
+    def commit(self, headers: dict = None) -> dict:
+        headers = headers or {}
+        meta = {
+            "endpoint": self.endpoint,
+            "params": self.params,
+            "hash": self.hasher.hexdigest(),
+            "fetched_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "bytes": self.size,
+        }
+        if self.file is None:
+            return meta
+        try:
+            previous = self.cache._read_meta(self.key).get("hash")
+        except (OSError, ValueError):
+            previous = None
+        try:
+            # The body goes under its own hash and the sidecar switches to it
+            # in one replace, so a crash at any point leaves a consistent
+            # entry (at worst an orphaned old body file)
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.cache._body_path(self.key, meta["hash"]))
+            self.cache._write_json(self.cache._meta_path(self.key), meta)
+            if previous and previous != meta["hash"]:
+                os.remove(self.cache._body_path(self.key, previous))
+        except OSError as e:
+            logger.warning(f"Failed to cache {self.endpoint}: {e}")
+        return meta
+
+    def abort(self) -> None:
+        if self.file is not None:
+            try:
+                self.file.close()
+                os.remove(self.tmp_path)
+            except OSError:
+                pass
+            self.file = None
@@ -1,14 +1,35 @@
 import logging
+import sqlite3
+import time
+import tracemalloc
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from src.shared.database import Database
-from src.account1_quiver.config import ACCOUNT_ID, SIGNAL_MAX_AGE_HOURS, SIGNAL_SOURCES
+from src.account1_quiver.config import (
+    ACCOUNT_ID, QUIVER_FETCH, RECORD_INDEX, SIGNAL_MAX_AGE_HOURS, SIGNAL_SOURCES,
+)
 from src.account1_quiver.quiver_client import QuiverClient
+from src.account1_quiver.record_index import RecordIndex
 
 logger = logging.getLogger(__name__)
 
+# QuiverClient method that fetches each source's data
+SOURCE_FETCHERS = {
+    "house_trading": "get_house_trades",
+    "senate_trading": "get_senate_trades",
+    "insider": "get_insider_trades",
+    "gov_contracts": "get_gov_contracts",
+    "gov_contracts_all": "get_gov_contracts_all",
+    "lobbying": "get_lobbying",
+    "off_exchange": "get_off_exchange",
+    "flights": "get_flights",
+    "wikipedia": "get_wikipedia",
+    "wsb": "get_wsb",
+}
+
 
 class SignalGenerator:
     """Generate trading signals from QuiverQuant data sources."""
@@ -16,12 +37,27 @@ class SignalGenerator:
     def __init__(self):
         self.quiver = QuiverClient()
         self.db = Database()
+        self.records = None
+        # source -> (payload hash, record fingerprints) awaiting commit_processed()
+        self._processed = {}
+        if RECORD_INDEX.get("enabled", False):
+            try:
+                self.records = RecordIndex(RECORD_INDEX["path"], RECORD_INDEX["ttl_days"])
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Record index unavailable, processing full payloads: {e}")
 
     def generate_all_signals(self) -> list:
         """Pull data from all enabled sources and generate signals.
 
-        Pre-fetches existing signal keys per source in one DB call each,
-        then uses local set lookups for dedup instead of per-signal API calls.
+        Pre-fetches existing signal keys for all sources in one paged scan
+        (concurrently with the fetches), then uses local set lookups for
+        dedup instead of per-signal API calls.
+        With QUIVER_FETCH["concurrent"], endpoints are fetched in parallel
+        and sources are processed in the order their responses arrive.
+        Sources whose cached payload is unchanged since they were last
+        processed are skipped, and per-record sources only see records the
+        record index hasn't seen on an earlier run. Neither is updated here:
+        call commit_processed() once the returned signals are stored.
         """
         all_signals = []
 
@@ -38,42 +74,178 @@ class SignalGenerator:
             "wsb": self._process_wsb,
         }
 
-        for source_name, config in SIGNAL_SOURCES.items():
-            if not config["enabled"]:
-                continue
-
-            processor = source_methods.get(source_name)
-            if not processor:
-                continue
+        sources = [
+            name for name, config in SIGNAL_SOURCES.items()
+            if config["enabled"] and name in source_methods
+        ]
+        if QUIVER_FETCH.get("concurrent", False):
+            results = self._fetch_concurrent(sources)
+        else:
+            results = (
+                (name, getattr(self.quiver, SOURCE_FETCHERS[name])() or [])
+                for name in sources
+            )
 
-            try:
-                # Pre-fetch existing signals for this source (1 DB call)
-                existing = self.db.get_existing_signal_keys(ACCOUNT_ID, source_name, since_hours=SIGNAL_MAX_AGE_HOURS)
-                # gov_contracts_all also dedupes against gov_contracts
-                if source_name == "gov_contracts_all":
-                    existing |= self.db.get_existing_signal_keys(ACCOUNT_ID, "gov_contracts", since_hours=SIGNAL_MAX_AGE_HOURS)
-
-                signals = processor(existing_keys=existing)
-                if signals:
-                    all_signals.extend(signals)
-                    logger.info(f"Generated {len(signals)} signals from {source_name}")
-                else:
-                    logger.info(f"No signals from {source_name}")
-            except Exception as e:
-                logger.error(f"Failed to process {source_name}: {e}")
+        trace_memory = QUIVER_FETCH.get("trace_memory", False) and not tracemalloc.is_tracing()
+        # tracemalloc is process-wide: with concurrent fetching a source's peak
+        # also counts the payloads still in flight, so it is labelled as such
+        memory_key = "process_peak_kb" if QUIVER_FETCH.get("concurrent", False) else "peak_kb"
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            # Dedup keys for every source come from one paged scan that runs
+            # while the endpoints are being fetched
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="signal-keys") as pool:
+                keys_future = pool.submit(
+                    self.db.get_signal_keys_by_source, ACCOUNT_ID, SIGNAL_MAX_AGE_HOURS
+                )
+                for source_name, data in results:
+                    self._process_source(source_name, source_methods[source_name], data,
+                                         keys_future, all_signals,
+                                         memory_key if trace_memory else None)
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
 
         return all_signals
 
-    def _process_house_trading(self, existing_keys: set = None) -> list:
+    def _process_source(self, source_name: str, processor, data, keys_future,
+                        all_signals: list, memory_key: str = None) -> None:
+        """Dedup and process one source's payload into all_signals.
+
+        data may be a list or a lazily streamed iterator of records. With
+        memory_key, the peak traced memory while it is processed (and, if
+        streamed, downloaded) is recorded as fetch_stats[endpoint][memory_key]:
+        "peak_kb" when sources are fetched in turn, "process_peak_kb" when
+        concurrent fetches in flight are counted too.
+        """
+        endpoint = SIGNAL_SOURCES[source_name]["endpoint"]
+        if self._payload_unchanged(source_name):
+            logger.info(f"{source_name}: payload unchanged since last run, skipping")
+            return
+        if memory_key:
+            tracemalloc.reset_peak()
+        try:
+            existing = self._existing_keys(source_name, keys_future.result())
+
+            fingerprints = None
+            if self.records is not None and source_name in RECORD_INDEX["sources"] and data:
+                data, fingerprints = self.records.filter_new(source_name, data)
+
+            signals = processor(existing_keys=existing, data=data)
+            if fingerprints is not None:
+                logger.info(f"{source_name}: {len(fingerprints)} records not seen before")
+            if signals:
+                all_signals.extend(signals)
+                logger.info(f"Generated {len(signals)} signals from {source_name}")
+            else:
+                logger.info(f"No signals from {source_name}")
+
+            stats = self.quiver.fetch_stats.get(endpoint, {})
+            digest = stats.get("hash") if self.quiver.cache and stats.get("ok") else None
+            self._processed[source_name] = (digest, fingerprints)
+        except Exception as e:
+            logger.error(f"Failed to process {source_name}: {e}")
+
+        if memory_key:
+            peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024)
+            self.quiver.fetch_stats.setdefault(endpoint, {})[memory_key] = peak_kb
+            scope = "process-wide " if memory_key == "process_peak_kb" else ""
+            logger.info(f"{source_name}: {scope}peak traced memory {peak_kb} KB")
+
+    def commit_processed(self) -> None:
+        """Mark the payloads and records behind the last run's signals as processed.
+
+        Call only after the signals are saved: if the insert fails or the
+        run dies first, nothing is marked and the next run reprocesses them
+        (already-saved signals are caught by the dedup keys).
+        """
+        processed, self._processed = self._processed, {}
+        for source, (digest, fingerprints) in processed.items():
+            if digest:
+                self.quiver.cache.mark_processed(source, digest)
+            if fingerprints:
+                self.records.add(fingerprints)
+
+    def _existing_keys(self, source: str, keys_by_source: Optional[dict]) -> set:
+        """(symbol, signal_type) pairs already signalled for source in the window.
+
+        Uses the prefetched keys; if that scan failed, falls back to a
+        per-source query.
+        """
+        dedup_sources = [source]
+        # gov_contracts_all also dedupes against gov_contracts
+        if source == "gov_contracts_all":
+            dedup_sources.append("gov_contracts")
+        existing = set()
+        for name in dedup_sources:
+            if keys_by_source is not None:
+                existing |= keys_by_source.get(name, set())
+            else:
+                existing |= self.db.get_existing_signal_keys(
+                    ACCOUNT_ID, name, since_hours=SIGNAL_MAX_AGE_HOURS
+                )
+        return existing
+
+    def _payload_unchanged(self, source: str) -> bool:
+        """True if the response cache shows source's payload was already processed.
+
+        Streamed payloads only have a hash once fully read, so this can
+        only short-circuit payloads served from the cache or decoded whole.
+        """
+        cache = self.quiver.cache
+        if not cache:
+            return False
+        digest = self.quiver.fetch_stats.get(SIGNAL_SOURCES[source]["endpoint"], {}).get("hash")
+        return bool(digest) and digest == cache.processed_hash(source)
+
+    def _fetch_concurrent(self, sources: list):
+        """Fetch sources on a bounded pool, yielding (source, data) as each completes.
+
+        A failed fetch yields an empty list so its processor doesn't refetch.
+        Logs per-endpoint latency and size once every fetch has finished.
+        """
+        if not sources:
+            return
+        workers = min(QUIVER_FETCH.get("workers", 4), len(sources))
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiver") as pool:
+            futures = {
+                pool.submit(getattr(self.quiver, SOURCE_FETCHERS[name])): name
+                for name in sources
+            }
+            for future in as_completed(futures):
+                name = futures.pop(future)  # don't keep payloads past their turn
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch {name}: {e}")
+                    data = None
+                yield name, data or []
+
+        stats = self.quiver.fetch_stats.values()
+        total_kb = sum(st.get("bytes", 0) for st in stats) / 1024
+        slowest = max(self.quiver.fetch_stats.items(),
+                      key=lambda kv: kv[1].get("seconds", 0), default=(None, None))[0]
+        logger.info(
+            f"Quiver fetch: {len(sources)} sources, {total_kb:.0f} KB in "
+            f"{time.monotonic() - start:.1f}s wall "
+            f"({sum(st.get('seconds', 0) for st in stats):.1f}s summed, slowest {slowest}) "
+            f"with {workers} workers"
+        )
+
+    def _process_house_trading(self, existing_keys: set = None, data: list = None) -> list:
         """Process House representative trading data into signals."""
-        data = self.quiver.get_house_trades()
+        if data is None:
+            data = self.quiver.get_house_trades()
         if not data:
             return []
         return self._process_congressional_trades(data, "house_trading", "house_trade", existing_keys or set())
 
-    def _process_senate_trading(self, existing_keys: set = None) -> list:
+    def _process_senate_trading(self, existing_keys: set = None, data: list = None) -> list:
         """Process Senate trading data into signals."""
-        data = self.quiver.get_senate_trades()
+        if data is None:
+            data = self.quiver.get_senate_trades()
         if not data:
             return []
         return self._process_congressional_trades(data, "senate_trading", "senate_trade", existing_keys or set())
@@ -133,9 +305,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_insiders(self, existing_keys: set = None) -> list:
+    def _process_insiders(self, existing_keys: set = None, data: list = None) -> list:
         """Process insider trades, detecting clusters (2+ in 14 days)."""
-        data = self.quiver.get_insider_trades()
+        if data is None:
+            data = self.quiver.get_insider_trades()
         if not data:
             return []
 
@@ -188,9 +361,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_gov_contracts(self, existing_keys: set = None) -> list:
+    def _process_gov_contracts(self, existing_keys: set = None, data: list = None) -> list:
         """Process government contract awards."""
-        data = self.quiver.get_gov_contracts()
+        if data is None:
+            data = self.quiver.get_gov_contracts()
         if not data:
             return []
 
@@ -228,9 +402,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_gov_contracts_all(self, existing_keys: set = None) -> list:
+    def _process_gov_contracts_all(self, existing_keys: set = None, data: list = None) -> list:
         """Process all announced government contracts (broader dataset)."""
-        data = self.quiver.get_gov_contracts_all()
+        if data is None:
+            data = self.quiver.get_gov_contracts_all()
         if not data:
             return []
 
@@ -272,9 +447,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_lobbying(self, existing_keys: set = None) -> list:
+    def _process_lobbying(self, existing_keys: set = None, data: list = None) -> list:
         """Process lobbying data, detecting spending increases."""
-        data = self.quiver.get_lobbying()
+        if data is None:
+            data = self.quiver.get_lobbying()
         if not data:
             return []
 
@@ -325,14 +501,15 @@ class SignalGenerator:
 
         return signals
 
-    def _process_off_exchange(self, existing_keys: set = None) -> list:
+    def _process_off_exchange(self, existing_keys: set = None, data: list = None) -> list:
         """Process off-exchange/dark pool short volume data (confirmation signal).
 
         High short volume ratio (OTC_Short / OTC_Total) can indicate institutional
         hedging activity or bearish pressure. We flag tickers with unusually high
         short ratios as confirmation signals.
         """
-        data = self.quiver.get_off_exchange()
+        if data is None:
+            data = self.quiver.get_off_exchange()
         if not data:
             return []
 
@@ -381,13 +558,14 @@ class SignalGenerator:
 
         return signals
 
-    def _process_flights(self, existing_keys: set = None) -> list:
+    def _process_flights(self, existing_keys: set = None, data: list = None) -> list:
         """Process corporate flight data (confirmation signal).
 
         Unusual corporate jet activity can indicate M&A due diligence,
         deal-making, or major business developments.
         """
-        data = self.quiver.get_flights()
+        if data is None:
+            data = self.quiver.get_flights()
         if not data:
             return []
 
@@ -434,9 +612,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_wikipedia(self, existing_keys: set = None) -> list:
+    def _process_wikipedia(self, existing_keys: set = None, data: list = None) -> list:
         """Process Wikipedia traffic spikes (confirmation signal)."""
-        data = self.quiver.get_wikipedia()
+        if data is None:
+            data = self.quiver.get_wikipedia()
         if not data:
             return []
 
@@ -475,9 +654,10 @@ class SignalGenerator:
 
         return signals
 
-    def _process_wsb(self, existing_keys: set = None) -> list:
+    def _process_wsb(self, existing_keys: set = None, data: list = None) -> list:
         """Process WallStreetBets mention spikes (confirmation signal)."""
-        data = self.quiver.get_wsb()
+        if data is None:
+            data = self.quiver.get_wsb()
         if not data:
             return []
 
@@ -0,0 +1,216 @@
+"""In-process minute-bar store for the intraday scanner.
+
+Each symbol keeps its most recent bars in fixed-size NumPy ring buffers
+together with running indicator state (Wilder RSI averages and VWAP
+numerator/denominator sums), so a scan cycle only fetches and processes
+the bars that arrived since the previous cycle.
+"""
+import numpy as np
+
+from src.account2_daytrader import indicators
+
+BAR_STORE_CAPACITY = 200  # bars kept per symbol (matches the old limit=200 fetch)
+
+_EPOCH, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(6)
+
+
+class SymbolBars:
+    """Ring buffer of one symbol's bars plus incremental indicator state.
+
+    RSI is seeded from the first RSI_PERIOD deltas seen and then smoothed
+    bar by bar for as long as the symbol is tracked. VWAP sums cover the
+    bars currently in the buffer: evicted bars are subtracted out, so the
+    result matches a VWAP over the same window computed from scratch.
+    """
+
+    def __init__(self, capacity: int = BAR_STORE_CAPACITY):
+        self.capacity = capacity
+        self._data = np.full((6, capacity), np.nan)
+        self._next = 0  # slot the next bar is written to
+        self.count = 0
+        self.last_epoch = None
+
+        # Wilder RSI
+        self._prev_close = None
+        self._n_deltas = 0
+        self._seed_gains = []
+        self._seed_losses = []
+        self.avg_gain = None
+        self.avg_loss = None
+
+        # VWAP sums over the buffer, and over its bars at/after session open
+        self.session_open = None
+        self._all_tp_vol = 0.0
+        self._all_vol = 0.0
+        self._session_tp_vol = 0.0
+        self._session_vol = 0.0
+        self._session_bars = 0
+
+    def _slot_values(self, slot: int):
+        epoch, _, high, low, close, volume = self._data[:, slot]
+        return epoch, (high + low + close) / 3 * volume, volume
+
+    def set_session(self, session_open: float) -> None:
+        """Switch the session VWAP anchor, rebuilding its sums from the buffer."""
+        if session_open == self.session_open:
+            return
+        self.session_open = session_open
+        self._session_tp_vol = self._session_vol = 0.0
+        self._session_bars = 0
+        for slot in self._slots(self.count):
+            epoch, tp_vol, volume = self._slot_values(slot)
+            if epoch >= session_open:
+                self._session_tp_vol += tp_vol
+                self._session_vol += volume
+                self._session_bars += 1
+
+    def append(self, epoch: float, o: float, h: float, l: float, c: float, v: float) -> bool:
+        """Add one bar; bars at or before the last stored timestamp are ignored."""
+        if self.last_epoch is not None and epoch <= self.last_epoch:
+            return False
+
+        if self.count == self.capacity:
+            old_epoch, old_tp_vol, old_vol = self._slot_values(self._next)
+            self._all_tp_vol -= old_tp_vol
+            self._all_vol -= old_vol
+            if self.session_open is not None and old_epoch >= self.session_open:
+                self._session_tp_vol -= old_tp_vol
+                self._session_vol -= old_vol
+                self._session_bars -= 1
+        else:
+            self.count += 1
+
+        self._data[:, self._next] = (epoch, o, h, l, c, v)
+        self._next = (self._next + 1) % self.capacity
+        self.last_epoch = epoch
+
+        tp_vol = (h + l + c) / 3 * v
+        self._all_tp_vol += tp_vol
+        self._all_vol += v
+        if self.session_open is not None and epoch >= self.session_open:
+            self._session_tp_vol += tp_vol
+            self._session_vol += v
+            self._session_bars += 1
+
+        self._update_rsi(c)
+        return True
+
+    def _update_rsi(self, close: float) -> None:
+        period = indicators.RSI_PERIOD
+        if self._prev_close is not None:
+            delta = close - self._prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            self._n_deltas += 1
+            if self._n_deltas <= period:
+                self._seed_gains.append(gain)
+                self._seed_losses.append(loss)
+                if self._n_deltas == period:
+                    self.avg_gain = np.mean(self._seed_gains)
+                    self.avg_loss = np.mean(self._seed_losses)
+                    self._seed_gains, self._seed_losses = [], []
+            else:
+                self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+                self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+        self._prev_close = close
+
+    def _slots(self, n: int) -> np.ndarray:
+        """Buffer slots of the last n bars, oldest first."""
+        return (self._next - n + np.arange(n)) % self.capacity
+
+    def tail(self, n: int) -> np.ndarray:
+        """Last n bars as a (6 x n) array: epoch, open, high, low, close, volume."""
+        return self._data[:, self._slots(min(n, self.count))]
+
+    @property
+    def rsi(self) -> float:
+        if self._n_deltas < indicators.RSI_PERIOD:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+    @property
+    def vwap(self) -> float:
+        """Session VWAP, or VWAP over the whole buffer with < 5 session bars."""
+        if self._session_bars >= indicators.MIN_SESSION_BARS:
+            tp_vol, vol = self._session_tp_vol, self._session_vol
+        else:
+            tp_vol, vol = self._all_tp_vol, self._all_vol
+        if vol > 0:
+            return tp_vol / vol
+        return float(self._data[_CLOSE, self._slots(1)[0]])
+
+
+class BarStore:
+    """Per-symbol SymbolBars, owned by one Scanner for the trading day."""
+
+    def __init__(self, capacity: int = BAR_STORE_CAPACITY):
+        self.capacity = capacity
+        self._symbols = {}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbols
+
+    def get(self, symbol: str):
+        return self._symbols.get(symbol)
+
+    def last_epoch(self, symbol: str):
+        series = self._symbols.get(symbol)
+        return series.last_epoch if series else None
+
+    def update(self, symbol: str, bars, session_open: float) -> int:
+        """Append bars (Alpaca Bar objects, oldest first). Returns bars added."""
+        series = self._symbols.get(symbol)
+        if series is None:
+            series = self._symbols[symbol] = SymbolBars(self.capacity)
+        series.set_session(session_open)
+        added = 0
+        for b in bars:
+            try:
+                epoch = indicators.bar_epoch(b)
+            except Exception:
+                continue
+            added += series.append(
+                epoch, float(b.open), float(b.high), float(b.low),
+                float(b.close), float(b.volume),
+            )
+        return added
+
+    def indicators(self, symbols: list) -> dict:
+        """{symbol: indicator dict} for symbols with at least LOOKBACK bars.
+
+        RSI and VWAP come from the running state; windowed indicators are
+        computed over the stacked last-LOOKBACK bars of all symbols at once.
+        """
+        ready = [s for s in symbols
+                 if s in self._symbols and self._symbols[s].count >= indicators.LOOKBACK]
+        if not ready:
+            return {}
+
+        window = np.stack([self._symbols[s].tail(indicators.LOOKBACK) for s in ready], axis=1)
+        high, low, close, volume = window[_HIGH], window[_LOW], window[_CLOSE], window[_VOLUME]
+        lengths = np.full(len(ready), indicators.LOOKBACK)
+        avg_volume = np.mean(volume, axis=1)
+        current_volume = volume[:, -1]
+        values = {
+            "current_price": close[:, -1],
+            "current_volume": current_volume,
+            "avg_volume": avg_volume,
+            "volume_ratio": np.divide(
+                current_volume, avg_volume,
+                out=np.zeros_like(avg_volume), where=avg_volume > 0,
+            ),
+            "sma_10": indicators.sma(close, lengths, 10),
+            "sma_20": indicators.sma(close, lengths, indicators.LOOKBACK),
+            "recent_high": indicators.rolling_high(high, lengths),
+            "recent_low": indicators.rolling_low(low, lengths),
+        }
+        result = {}
+        for row, symbol in enumerate(ready):
+            series = self._symbols[symbol]
+            ind = {name: float(arr[row]) for name, arr in values.items()}
+            ind["rsi"] = float(series.rsi)
+            ind["vwap"] = float(series.vwap)
+            result[symbol] = ind
+        return result
@@ -1,6 +1,7 @@
 import json
 import logging
 
+from src.shared.claude_cache import price_bucket
 from src.shared.claude_client import ClaudeClient
 from src.shared.database import Database
 from src.account2_daytrader.config import ACCOUNT_ID
@@ -34,6 +35,15 @@ Respond with this JSON structure:
     "max_risk_today": "<conservative/normal/aggressive>"
 }"""
 
+BATCH_EVAL_SYSTEM = """You are a trading decision assistant reviewing several intraday setups at once. Judge each setup on its own merits.
+
+Respond with ONLY a JSON object with one entry per setup, using the symbol and strategy exactly as given:
+{
+    "evaluations": [
+        {"symbol": "<ticker>", "strategy": "<strategy>", "decision": "yes" or "no", "confidence": 0-100, "reason": "brief reason"}
+    ]
+}"""
+
 
 class DayTraderClaudeAnalyzer:
     """Pre-market briefing and setup evaluation using Claude."""
@@ -108,23 +118,107 @@ Analyze these candidates and provide your pre-market briefing as JSON."""
 
         return result or {}
 
-    def evaluate_setup(self, setup: dict, market_context: dict) -> dict:
-        """Quick evaluation of a specific intraday setup."""
-        prompt = (
-            f"Quick trade evaluation:\n"
+    @staticmethod
+    def _setup_details(setup: dict) -> str:
+        details = (
             f"Symbol: {setup['symbol']}\n"
             f"Strategy: {setup['strategy']}\n"
             f"Entry: ${setup['entry_price']}\n"
             f"Target: ${setup['target_price']} ({setup.get('target_pct', 'N/A')}%)\n"
             f"Stop: ${setup['stop_price']} ({setup.get('stop_pct', 'N/A')}%)\n"
-            f"Market outlook: {market_context.get('market_outlook', 'unknown')}\n"
-            f"Strategy bias: {market_context.get('strategy_bias', 'none')}\n"
         )
         if setup.get("has_catalyst"):
-            prompt += (
+            details += (
                 f"Catalyst: QuiverQuant signal (score={setup.get('catalyst_score', 0)}) — "
                 f"this stock has a fundamental catalyst from government/political data\n"
             )
-        prompt += "\nShould we take this trade?"
+        return details
+
+    @staticmethod
+    def _market_details(market_context: dict) -> str:
+        return (
+            f"Market outlook: {market_context.get('market_outlook', 'unknown')}\n"
+            f"Strategy bias: {market_context.get('strategy_bias', 'none')}\n"
+        )
+
+    @staticmethod
+    def _setup_key(setup: dict) -> dict:
+        """Response-cache key for a setup: its identity, with prices in narrow bands.
+
+        Quotes re-read every cycle drift by cents; banding entry, target
+        and stop (CLAUDE_RESPONSE_CACHE["price_tolerance_pct"]) lets an
+        unchanged setup reuse its decision, while a moved stop or entry
+        gets a fresh one.
+        """
+        return {
+            "symbol": setup["symbol"],
+            "strategy": setup["strategy"],
+            "entry": price_bucket(setup["entry_price"]),
+            "target": price_bucket(setup["target_price"]),
+            "stop": price_bucket(setup["stop_price"]),
+            "catalyst_score": setup.get("catalyst_score") if setup.get("has_catalyst") else None,
+        }
 
-        return self.claude.quick_decision(prompt, model="haiku") or {}
+    @staticmethod
+    def _market_key(market_context: dict) -> dict:
+        return {
+            "outlook": market_context.get("market_outlook"),
+            "bias": market_context.get("strategy_bias"),
+        }
+
+    def evaluate_setup(self, setup: dict, market_context: dict) -> dict:
+        """Quick evaluation of a specific intraday setup."""
+        prompt = (
+            f"Quick trade evaluation:\n"
+            f"{self._setup_details(setup)}"
+            f"{self._market_details(market_context)}"
+            f"\nShould we take this trade?"
+        )
+        cache_inputs = {"setup": self._setup_key(setup), "market": self._market_key(market_context)}
+        return self.claude.quick_decision(prompt, model="haiku", cache_inputs=cache_inputs) or {}
+
+    def evaluate_setups(self, setups: list, market_context: dict) -> dict:
+        """Evaluate a cycle's setups in one call.
+
+        Returns {(symbol, strategy): evaluation} with the same fields as
+        evaluate_setup(). Setups missing from the batch answer (or all of
+        them, if it can't be parsed) are evaluated one by one instead.
+        """
+        if len(setups) <= 1:
+            return {(s["symbol"], s["strategy"]): self.evaluate_setup(s, market_context)
+                    for s in setups}
+
+        blocks = "\n".join(
+            f"SETUP {i}:\n{self._setup_details(setup)}" for i, setup in enumerate(setups, 1)
+        )
+        prompt = (
+            f"Batch trade evaluation ({len(setups)} setups):\n"
+            f"{self._market_details(market_context)}\n"
+            f"{blocks}\n"
+            f"Should we take each of these trades?"
+        )
+        result = self.claude.analyze(
+            system_prompt=BATCH_EVAL_SYSTEM,
+            user_prompt=prompt,
+            model="haiku",
+            analysis_type="setup_batch",
+            max_tokens=128 + 96 * len(setups),
+            cache_inputs={"setups": [self._setup_key(s) for s in setups],
+                          "market": self._market_key(market_context)},
+        )
+
+        evaluations = {}
+        entries = result.get("evaluations") if isinstance(result, dict) else None
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, dict) and entry.get("decision") in ("yes", "no"):
+                evaluations[(str(entry.get("symbol")), str(entry.get("strategy")))] = entry
+
+        missing = [s for s in setups if (s["symbol"], s["strategy"]) not in evaluations]
+        if missing:
+            logger.warning(
+                f"Batch evaluation answered {len(setups) - len(missing)}/{len(setups)} setups, "
+                f"evaluating the rest individually"
+            )
+        for setup in missing:
+            evaluations[(setup["symbol"], setup["strategy"])] = self.evaluate_setup(setup, market_context)
+        return evaluations
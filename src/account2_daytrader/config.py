@@ -7,6 +7,18 @@ SCANNER = {
     "min_gap_pct": 3.0,
     "min_volume_multiplier": 1.5,
     "scan_interval_seconds": 120,  # 2 minutes
+    # Pre-market snapshot fetching
+    "concurrent_snapshots": True,      # False = serial batches of 20 (old path)
+    "snapshot_batch_size": 100,        # symbols per snapshot request
+    "snapshot_workers": 4,             # bounded thread pool
+    # Intraday bar store
+    "incremental_bars": True,          # False = refetch full history every scan
+    "bar_store_capacity": 200,         # minute bars kept per symbol
+    "incremental_batch_size": 50,      # symbols per "bars since last scan" request
+    # Streaming mode: websocket bars/quotes instead of polling every scan_interval
+    "streaming": False,
+    "stream_feed": "iex",              # Alpaca data feed: "iex" (free) or "sip"
+    "stream_manage_interval_seconds": 5,  # min gap between event-driven exit checks
 }
 
 # Strategy configurations
@@ -67,3 +79,8 @@ EOD_REVIEW = "16:00"
 # Behavioral detection thresholds
 MAX_CONSECUTIVE_LOSSES_BEFORE_COOLDOWN = 5
 COOLDOWN_MINUTES = 30
+
+# Order mode: "market" = plain market entries, stops/targets enforced by
+# manage_positions(); "bracket" = entries carry server-side stop/target legs
+# and manage_positions() only ratchets trailing stops and reconciles exits
+ORDER_MODE = "market"
@@ -1,13 +1,15 @@
 import logging
-import time
 from datetime import datetime, timezone
 
 import pytz
 
 from src.shared.alpaca_client import AlpacaClient
+from src.shared.account_state import AccountState
 from src.shared.risk_manager import RiskManager
 from src.shared.database import Database
-from src.account2_daytrader.config import ACCOUNT_ID, STRATEGIES
+from src.shared.fill_reconciler import FillReconciler
+from src.shared import protective_orders
+from src.account2_daytrader.config import ACCOUNT_ID, ORDER_MODE, SCANNER, STRATEGIES
 
 logger = logging.getLogger(__name__)
 ET = pytz.timezone("US/Eastern")
@@ -18,8 +20,13 @@ class DayTraderExecutor:
 
     def __init__(self):
         self.alpaca = AlpacaClient(ACCOUNT_ID)
-        self.risk = RiskManager(ACCOUNT_ID)
+        self.state = AccountState(self.alpaca)
+        self.risk = RiskManager(ACCOUNT_ID, state=self.state)
         self.db = Database()
+        # Fills arrive as trade-update events in streaming mode, else batch-polled
+        self.fills = FillReconciler(
+            self.alpaca, self.db, ACCOUNT_ID, stream=SCANNER.get("streaming", False)
+        )
         self._high_water_marks = {}  # symbol -> highest unrealized P&L % seen
 
     def execute_setup(self, setup: dict) -> dict:
@@ -29,7 +36,7 @@ class DayTraderExecutor:
         strategy = setup.get("strategy", "unknown")
 
         # Guard: skip if market is closed (holidays, early closes)
-        if not self.alpaca.is_market_open():
+        if not self.state.is_market_open():
             logger.warning(f"Market closed. Skipping {symbol}.")
             return {"status": "blocked", "reason": "market_closed"}
 
@@ -53,13 +60,25 @@ class DayTraderExecutor:
             logger.info(f"Cannot open {symbol}: {reason}")
             return {"status": "blocked", "reason": reason}
 
-        # Submit order
-        order = self.alpaca.submit_market_order(
-            symbol=symbol, side=side, notional=position_size
-        )
+        # Submit order: with server-side stop/target legs in bracket mode,
+        # falling back to a plain market order if the bracket can't be placed
+        order, order_type = None, "market"
+        if ORDER_MODE == "bracket":
+            order = self.alpaca.submit_bracket_order(
+                symbol, side, position_size,
+                stop_price=setup.get("stop_price"),
+                target_price=setup.get("target_price"),
+                ref_price=setup.get("entry_price"),
+            )
+            order_type = "bracket" if order else order_type
+        if not order:
+            order = self.alpaca.submit_market_order(
+                symbol=symbol, side=side, notional=position_size
+            )
 
         if not order:
             return {"status": "failed", "reason": "order_submission_failed"}
+        self.state.record_open(symbol, side, position_size, order)
 
         # Record trade
         trade_record = {
@@ -67,28 +86,14 @@ class DayTraderExecutor:
             "symbol": symbol,
             "side": side,
             "notional": round(position_size, 2),
-            "order_type": "market",
+            "order_type": order_type,
             "alpaca_order_id": str(order.id),
             "status": str(order.status),
             "strategy": strategy,
             "reasoning": setup.get("reasoning", ""),
         }
         db_trade = self.db.insert_trade(trade_record)
-
-        # Sync fill status — market orders fill near-instantly
-        if db_trade:
-            try:
-                time.sleep(1)
-                order_info = self.alpaca.get_order(str(order.id))
-                if order_info and "filled" in str(order_info.status).lower():
-                    self.db.update_trade(db_trade["id"], {
-                        "status": "filled",
-                        "fill_price": float(order_info.filled_avg_price),
-                        "filled_at": str(order_info.filled_at),
-                    })
-                    logger.info(f"Order filled: {symbol} @ ${float(order_info.filled_avg_price):.2f}")
-            except Exception as e:
-                logger.warning(f"Order sync failed for {symbol} (non-fatal): {e}")
+        self.fills.track(db_trade)  # synced at the start of the next cycle
 
         logger.info(
             f"Day trade executed: {side} {symbol} ${position_size:.2f} "
@@ -102,9 +107,18 @@ class DayTraderExecutor:
         }
 
     def manage_positions(self) -> list:
-        """Check open positions against stops, targets, and trailing stops."""
-        positions = self.alpaca.get_positions()
+        """Check open positions against stops, targets, and trailing stops.
+
+        Starts a new cycle: broker state is refetched here and reused by
+        execute_setup() until the next call. In bracket mode, positions with
+        open exit orders are left to the broker (the stop leg is only
+        ratcheted once the trail activates) and positions the broker has
+        closed are recorded.
+        """
+        self.fills.reconcile(wait=False)
+        positions = self.state.refresh().positions
         open_trades = self.db.get_open_trades(ACCOUNT_ID)
+        open_orders = self.state.open_orders if ORDER_MODE == "bracket" else []
         actions = []
 
         # Index trades by symbol, keeping the most recent per symbol
@@ -150,6 +164,17 @@ class DayTraderExecutor:
                 if trailing_stop > effective_stop:
                     effective_stop = trailing_stop
 
+            # Broker-held exits: only tighten the stop leg for trailing
+            protection = protective_orders.exit_orders(
+                open_orders, symbol, trade.get("side", "buy")
+            )
+            if protection:
+                stop = protective_orders.stop_order(protection)
+                if stop is not None and effective_stop > -stop_pct:
+                    if self._ratchet_stop(pos, trade, stop, effective_stop):
+                        actions.append({"symbol": symbol, "action": "stop_raised"})
+                continue
+
             # Check stop loss (fixed or trailing)
             if unrealized_pnl_pct <= effective_stop:
                 reason = "trailing_stop" if effective_stop > -stop_pct else "stop_loss"
@@ -158,9 +183,9 @@ class DayTraderExecutor:
                     f"(effective stop: {effective_stop:.2f}%, "
                     f"high: {current_high:.2f}%)"
                 )
-                self._close_and_record(pos, trade, reason)
-                self._high_water_marks.pop(symbol, None)
-                actions.append({"symbol": symbol, "action": reason})
+                if self._close_and_record(pos, trade, reason):
+                    self._high_water_marks.pop(symbol, None)
+                    actions.append({"symbol": symbol, "action": reason})
 
             # Check profit target
             elif unrealized_pnl_pct >= target_pct:
@@ -168,9 +193,9 @@ class DayTraderExecutor:
                     f"TARGET HIT: {symbol} at {unrealized_pnl_pct:.2f}% "
                     f"(target: +{target_pct}%)"
                 )
-                self._close_and_record(pos, trade, "target_hit")
-                self._high_water_marks.pop(symbol, None)
-                actions.append({"symbol": symbol, "action": "target_hit"})
+                if self._close_and_record(pos, trade, "target_hit"):
+                    self._high_water_marks.pop(symbol, None)
+                    actions.append({"symbol": symbol, "action": "target_hit"})
 
         # Clean up high-water marks for closed positions
         open_symbols = {pos.symbol for pos in positions}
@@ -178,12 +203,40 @@ class DayTraderExecutor:
             if sym not in open_symbols:
                 del self._high_water_marks[sym]
 
+        # Record positions the broker's exit legs closed since last check
+        if ORDER_MODE == "bracket":
+            for symbol, trade in trades_by_symbol.items():
+                if symbol in open_symbols:
+                    continue
+                outcome = protective_orders.record_broker_exit(
+                    self.alpaca, self.db, ACCOUNT_ID, trade, trade.get("strategy", "unknown")
+                )
+                if outcome:
+                    actions.append({"symbol": symbol, "action": outcome["exit_reason"]})
+
         return actions
 
+    def _ratchet_stop(self, position, trade: dict, stop, effective_stop_pct: float) -> bool:
+        """Move a broker stop leg up to the trailing level if that tightens it."""
+        side = trade.get("side", "buy")
+        new_stop = protective_orders.stop_price_for_pnl(
+            float(position.avg_entry_price), side, effective_stop_pct
+        )
+        current = float(stop.stop_price) if stop.stop_price is not None else None
+        if current is not None and not protective_orders.is_tighter(side, new_stop, current):
+            return False
+        if not self.alpaca.replace_stop_price(str(stop.id), new_stop):
+            return False
+        logger.info(
+            f"TRAILING STOP: {position.symbol} stop leg moved {current} -> {new_stop:.2f} "
+            f"({effective_stop_pct:.2f}%)"
+        )
+        return True
+
     def force_close_all(self) -> list:
         """Force close all positions (EOD)."""
         self._high_water_marks.clear()
-        positions = self.alpaca.get_positions()
+        positions = self.state.refresh().positions
         closed = []
 
         trades = self.db.get_open_trades(ACCOUNT_ID)
@@ -195,15 +248,15 @@ class DayTraderExecutor:
             symbol = pos.symbol
             trade = trades_by_symbol.get(symbol)
 
-            self._close_and_record(pos, trade, "eod_close")
-            closed.append(symbol)
+            if self._close_and_record(pos, trade, "eod_close"):
+                closed.append(symbol)
 
         if closed:
             logger.info(f"Force closed {len(closed)} positions: {closed}")
 
         return closed
 
-    def _close_and_record(self, position, trade: dict, exit_reason: str) -> None:
+    def _close_and_record(self, position, trade: dict, exit_reason: str) -> bool:
         """Close a position and record the outcome.
 
         Note: P&L is recorded from unrealized_pl before the close order fills.
@@ -216,8 +269,11 @@ class DayTraderExecutor:
         realized_pnl = float(position.unrealized_pl)
         pnl_pct = float(position.unrealized_plpc) * 100
 
-        # Close position via Alpaca
-        self.alpaca.close_position(symbol)
+        # Close position via Alpaca (cancelling any exit legs holding the shares)
+        result = self.alpaca.close_position(symbol, cancel_orders=ORDER_MODE == "bracket")
+        if not result:
+            return False
+        self.state.record_close(symbol)
 
         # Update trade status
         if trade and trade.get("id"):
@@ -248,3 +304,4 @@ class DayTraderExecutor:
             f"Closed {symbol}: P&L=${realized_pnl:.2f} ({pnl_pct:.2f}%), "
             f"reason={exit_reason}"
         )
+        return True
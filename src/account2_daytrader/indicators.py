@@ -0,0 +1,157 @@
+"""Vectorized intraday indicators over a batch of symbols.
+
+Bars for a batch are packed into 2-D float arrays (symbols x bars), left
+aligned and NaN-padded on the right, so every indicator is computed for
+all symbols at once. Each function reproduces the scanner's original
+per-symbol arithmetic exactly (same operation order), so results are
+bit-for-bit identical to the old list-based code.
+"""
+from datetime import datetime
+
+import numpy as np
+
+RSI_PERIOD = 14
+LOOKBACK = 20   # bars for avg volume, rolling high/low and SMA20
+MIN_SESSION_BARS = 5
+
+
+def bar_epoch(bar) -> float:
+    """Bar timestamp as epoch seconds (accepts datetimes or ISO strings)."""
+    ts = bar.timestamp
+    if not hasattr(ts, "timestamp"):
+        ts = datetime.fromisoformat(str(ts))
+    return ts.timestamp()
+
+
+def pack_bars(bars_by_symbol: dict, symbols: list) -> dict:
+    """Pack per-symbol bar lists into NaN-padded (symbols x bars) arrays.
+
+    Returns {"symbols", "lengths", "open", "high", "low", "close",
+    "volume", "epoch"}; rows follow symbols.
+    """
+    n = len(symbols)
+    width = max((len(bars_by_symbol[s]) for s in symbols), default=0)
+    fields = ("open", "high", "low", "close", "volume", "epoch")
+    packed = {f: np.full((n, width), np.nan) for f in fields}
+    lengths = np.zeros(n, dtype=int)
+
+    for row, symbol in enumerate(symbols):
+        bars = bars_by_symbol[symbol]
+        lengths[row] = len(bars)
+        for col, b in enumerate(bars):
+            packed["open"][row, col] = float(b.open)
+            packed["high"][row, col] = float(b.high)
+            packed["low"][row, col] = float(b.low)
+            packed["close"][row, col] = float(b.close)
+            packed["volume"][row, col] = float(b.volume)
+            try:
+                packed["epoch"][row, col] = bar_epoch(b)
+            except Exception:
+                pass  # unparseable timestamp: never counts as a session bar
+
+    packed["symbols"] = list(symbols)
+    packed["lengths"] = lengths
+    return packed
+
+
+def last_window(values: np.ndarray, lengths: np.ndarray, window: int) -> np.ndarray:
+    """The last `window` valid bars of each row (rows need >= window bars)."""
+    cols = lengths[:, None] - window + np.arange(window)
+    return np.take_along_axis(values, np.maximum(cols, 0), axis=1)
+
+
+def last_value(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    return last_window(values, lengths, 1)[:, 0]
+
+
+def sma(closes: np.ndarray, lengths: np.ndarray, window: int) -> np.ndarray:
+    return np.mean(last_window(closes, lengths, window), axis=1)
+
+
+def rolling_high(highs: np.ndarray, lengths: np.ndarray, window: int = LOOKBACK) -> np.ndarray:
+    return np.max(last_window(highs, lengths, window), axis=1)
+
+
+def rolling_low(lows: np.ndarray, lengths: np.ndarray, window: int = LOOKBACK) -> np.ndarray:
+    return np.min(last_window(lows, lengths, window), axis=1)
+
+
+def rsi(closes: np.ndarray, lengths: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder RSI of each row's full history (50 where too short).
+
+    Seeded with the simple mean of the first `period` gains/losses, then
+    smoothed bar by bar; the time recursion is a loop over columns, each
+    step vectorized across symbols.
+    """
+    n = closes.shape[0]
+    out = np.full(n, 50.0)
+    if closes.shape[1] < period + 1:
+        return out
+
+    deltas = np.diff(closes, axis=1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    avg_gain = np.mean(gains[:, :period], axis=1)
+    avg_loss = np.mean(losses[:, :period], axis=1)
+    n_deltas = lengths - 1
+    for i in range(period, deltas.shape[1]):
+        live = i < n_deltas
+        avg_gain = np.where(live, (avg_gain * (period - 1) + gains[:, i]) / period, avg_gain)
+        avg_loss = np.where(live, (avg_loss * (period - 1) + losses[:, i]) / period, avg_loss)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - (100 / (1 + avg_gain / avg_loss))
+    value = np.where(avg_loss == 0, 100.0, value)
+    return np.where(lengths >= period + 1, value, out)
+
+
+def session_vwap(packed: dict, session_open_epoch: float) -> np.ndarray:
+    """VWAP over bars at/after session open, or all bars if fewer than 5 are.
+
+    Falls back to the last close when the volume sum is zero. Sums are
+    cumulative left to right, matching Python's sum() exactly.
+    """
+    high, low, close, volume = (packed[f] for f in ("high", "low", "close", "volume"))
+    lengths = packed["lengths"]
+    valid = np.arange(close.shape[1])[None, :] < lengths[:, None]
+    in_session = valid & (packed["epoch"] >= session_open_epoch)
+    use_session = in_session.sum(axis=1) >= MIN_SESSION_BARS
+    mask = np.where(use_session[:, None], in_session, valid)
+
+    typical = (high + low + close) / 3
+    tp_vol = np.where(mask, typical * volume, 0.0)
+    vol = np.where(mask, volume, 0.0)
+    cum_tp_vol = np.cumsum(tp_vol, axis=1)[:, -1] if tp_vol.shape[1] else np.zeros(len(lengths))
+    cum_vol = np.cumsum(vol, axis=1)[:, -1] if vol.shape[1] else np.zeros(len(lengths))
+
+    current = last_value(close, lengths)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = cum_tp_vol / cum_vol
+    return np.where(cum_vol > 0, vwap, current)
+
+
+def compute(packed: dict, session_open_epoch: float) -> dict:
+    """All scanner indicators for a packed batch, one array per indicator.
+
+    Every row must have at least LOOKBACK bars.
+    """
+    lengths = packed["lengths"]
+    close, volume = packed["close"], packed["volume"]
+    avg_volume = np.mean(last_window(volume, lengths, LOOKBACK), axis=1)
+    current_volume = last_value(volume, lengths)
+    return {
+        "current_price": last_value(close, lengths),
+        "current_volume": current_volume,
+        "avg_volume": avg_volume,
+        "volume_ratio": np.divide(
+            current_volume, avg_volume,
+            out=np.zeros_like(avg_volume), where=avg_volume > 0,
+        ),
+        "vwap": session_vwap(packed, session_open_epoch),
+        "rsi": rsi(close, lengths),
+        "sma_10": sma(close, lengths, 10),
+        "sma_20": sma(close, lengths, LOOKBACK),
+        "recent_high": rolling_high(packed["high"], lengths),
+        "recent_low": rolling_low(packed["low"], lengths),
+    }
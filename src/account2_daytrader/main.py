@@ -16,6 +16,7 @@ from src.account2_daytrader.scanner import Scanner
 from src.account2_daytrader.claude_analyzer import DayTraderClaudeAnalyzer
 from src.account2_daytrader.adaptive_engine import AdaptiveEngine
 from src.account2_daytrader.executor import DayTraderExecutor
+from src.account2_daytrader.market_feed import AlpacaStreamFeed, MarketFeed
 from src.account2_daytrader.strategies.momentum import MomentumBreakout
 from src.account2_daytrader.strategies.mean_reversion import MeanReversion
 from src.account2_daytrader.strategies.gap_fill import GapFill
@@ -134,9 +135,13 @@ def run_premarket():
 
 
 def run_intraday_cycle(watchlist: list, market_context: dict,
-                       executor: DayTraderExecutor, strategies: list):
-    """Single intraday scan and trade cycle."""
-    scanner = Scanner()
+                       executor: DayTraderExecutor, strategies: list,
+                       scanner: Scanner = None):
+    """Single intraday scan and trade cycle.
+
+    Pass the same scanner every cycle so its bar store only fetches new bars.
+    """
+    scanner = scanner or Scanner()
     adaptive = AdaptiveEngine()
 
     # Check for cooldown
@@ -149,38 +154,153 @@ def run_intraday_cycle(watchlist: list, market_context: dict,
     if not candidates:
         return
 
+    _act_on_candidates(candidates, market_context, executor, strategies)
+
+
+def _act_on_candidates(candidates: list, market_context: dict,
+                       executor: DayTraderExecutor, strategies: list) -> None:
+    """Run candidates through the strategies, Claude review and execution.
+
+    Setups below 70 confidence are collected first and reviewed by Claude
+    in a single batch call, so a cycle costs one model round trip.
+    """
     # Evaluate each candidate against strategies
+    setups = []
     for candidate in candidates:
         for strategy in strategies:
             setup = strategy.evaluate(candidate)
             if setup:
                 min_conf = strategy.get_config_value({}, "confidence_minimum", 60)
-                if setup["confidence"] < min_conf:
-                    continue
-                if setup["confidence"] < 70:
-                    analyzer = DayTraderClaudeAnalyzer()
-                    try:
-                        evaluation = analyzer.evaluate_setup(setup, market_context)
-                        if evaluation.get("decision") == "no":
-                            logger.info(
-                                f"Claude rejected {setup['symbol']} "
-                                f"({setup['strategy']}): {evaluation.get('reason')}"
-                            )
-                            continue
-                    except Exception as e:
-                        logger.warning(f"Claude eval failed, proceeding with setup: {e}")
-                else:
-                    logger.info(
-                        f"Auto-executing high-confidence setup: {setup['symbol']} "
-                        f"({setup['strategy']}, confidence={setup['confidence']})"
-                    )
-
-                result = executor.execute_setup(setup)
-                if result.get("status") == "executed":
-                    logger.info(f"Executed: {setup['symbol']} via {setup['strategy']}")
-                elif result.get("status") == "blocked":
-                    if result.get("reason") in ["daily_loss_limit", "max_trades_reached"]:
-                        return  # Stop scanning this cycle
+                if setup["confidence"] >= min_conf:
+                    setups.append(setup)
+
+    evaluations = {}
+    borderline = [s for s in setups if s["confidence"] < 70]
+    if borderline:
+        try:
+            evaluations = DayTraderClaudeAnalyzer().evaluate_setups(borderline, market_context)
+        except Exception as e:
+            logger.warning(f"Claude eval failed, proceeding with setups: {e}")
+
+    for setup in setups:
+        if setup["confidence"] < 70:
+            evaluation = evaluations.get((setup["symbol"], setup["strategy"])) or {}
+            if evaluation.get("decision") == "no":
+                logger.info(
+                    f"Claude rejected {setup['symbol']} "
+                    f"({setup['strategy']}): {evaluation.get('reason')}"
+                )
+                continue
+        else:
+            logger.info(
+                f"Auto-executing high-confidence setup: {setup['symbol']} "
+                f"({setup['strategy']}, confidence={setup['confidence']})"
+            )
+
+        result = executor.execute_setup(setup)
+        if result.get("status") == "executed":
+            logger.info(f"Executed: {setup['symbol']} via {setup['strategy']}")
+        elif result.get("status") == "blocked":
+            if result.get("reason") in ["daily_loss_limit", "max_trades_reached"]:
+                return  # Stop scanning this cycle
+
+
+WATCHLIST_REFRESH_SECONDS = 1800  # 30 minutes
+
+
+def refresh_watchlist(watchlist: list) -> list:
+    """Extend watchlist in place with fresh Quiver and mid-day movers. Returns added symbols."""
+    try:
+        refresh_scanner = Scanner()
+        quiver_syms = refresh_scanner._fetch_quiver_signals()
+        new_movers = refresh_scanner._fetch_dynamic_movers()
+        fresh = quiver_syms + new_movers
+        added = [s for s in fresh if s not in watchlist]
+        if added:
+            watchlist.extend(added)
+            logger.info(f"Watchlist refresh: added {len(added)} symbols "
+                        f"({len(quiver_syms)} quiver, {len(new_movers)} dynamic)")
+        return added
+    except Exception as e:
+        logger.warning(f"Watchlist refresh failed: {e}")
+        return []
+
+
+def run_streaming_session(feed: MarketFeed, scanner: Scanner, executor: DayTraderExecutor,
+                          strategies: list, watchlist: list, market_context: dict,
+                          no_new_trades_time: datetime, force_close_time: datetime,
+                          clock=get_et_now) -> dict:
+    """Event-driven intraday trading until force close (or the feed runs out or dies).
+
+    Streams minute bars for the watchlist and open positions, plus quotes
+    for open positions. Each burst of bars updates the scanner's bar store
+    and re-evaluates setups for just those symbols; bars or quotes for held
+    symbols trigger manage_positions(), at most once per
+    stream_manage_interval_seconds. Returns event counters.
+    """
+    manage_interval = SCANNER_CONFIG.get("stream_manage_interval_seconds", 5)
+    stats = {"events": 0, "bars": 0, "scans": 0, "setups": 0, "manage_calls": 0}
+
+    def manage():
+        stats["manage_calls"] += 1
+        try:
+            actions = executor.manage_positions()
+            if actions:
+                logger.info(f"Position management: {actions}")
+        except Exception as e:
+            logger.warning(f"Position management error: {e}")
+
+    manage()
+    last_manage = clock()
+    last_refresh = clock()
+    scanner.prime(watchlist)
+    held = {p.symbol for p in executor.state.positions}
+    subscribed = set(watchlist) | held
+    feed.subscribe(bars=subscribed, quotes=held)
+
+    while clock() < force_close_time and not feed.exhausted:
+        events = feed.next_events(timeout=1.0)
+        now = clock()
+        stats["events"] += len(events)
+
+        barred, touched = [], set()
+        for event in events:
+            touched.add(event.symbol)
+            if event.kind == "bar" and scanner.ingest_bars(event.symbol, [event.data]):
+                barred.append(event.symbol)
+        stats["bars"] += len(barred)
+
+        # A quiet stream still gets the polling loop's cadence of exit checks
+        since_manage = (now - last_manage).total_seconds()
+        if ((touched & held and since_manage >= manage_interval)
+                or since_manage >= SCANNER_CONFIG.get("scan_interval_seconds", 300)):
+            manage()
+            last_manage = now
+
+        if now < no_new_trades_time:
+            watching = set(watchlist)
+            watched = [s for s in dict.fromkeys(barred) if s in watching]
+            if watched:
+                stats["scans"] += 1
+                candidates = scanner.evaluate(watched)
+                stats["setups"] += len(candidates)
+                if candidates:
+                    if AdaptiveEngine().should_cooldown():
+                        logger.warning("Cooldown active due to consecutive losses. Skipping setups.")
+                    else:
+                        _act_on_candidates(candidates, market_context, executor, strategies)
+
+            if (now - last_refresh).total_seconds() >= WATCHLIST_REFRESH_SECONDS:
+                scanner.prime(refresh_watchlist(watchlist))
+                last_refresh = now
+
+        current = {p.symbol for p in executor.state.positions}
+        wanted = set(watchlist) | current
+        if current != held or wanted != subscribed:
+            held, subscribed = current, wanted
+            feed.subscribe(bars=subscribed, quotes=held)
+
+    return stats
 
 
 def run_eod():
@@ -235,7 +355,24 @@ def run_loop():
         no_new_trades_time = time_str_to_today(NO_NEW_TRADES)
         force_close_time = time_str_to_today(FORCE_CLOSE)
         last_watchlist_refresh = get_et_now()
-        WATCHLIST_REFRESH_SECONDS = 1800  # 30 minutes
+        intraday_scanner = Scanner()
+
+        if SCANNER_CONFIG.get("streaming"):
+            feed = AlpacaStreamFeed(ACCOUNT_ID, SCANNER_CONFIG.get("stream_feed", "iex"))
+            try:
+                stats = run_streaming_session(
+                    feed, intraday_scanner, executor, strategies, watchlist,
+                    market_context, no_new_trades_time, force_close_time,
+                )
+                logger.info(f"Streaming session complete: {stats}")
+                if feed.exhausted and get_et_now() < force_close_time:
+                    tracker.add_warning("Market data stream ended early", service="Alpaca")
+                    logger.warning("Market data stream ended; falling back to polling")
+            except Exception as e:
+                tracker.add_warning(f"Streaming session error: {e}", service="Alpaca")
+                logger.warning("Streaming failed; falling back to polling")
+            finally:
+                feed.close()
 
         while get_et_now() < force_close_time:
             now = get_et_now()
@@ -252,24 +389,14 @@ def run_loop():
             # Refresh watchlist with mid-day movers periodically
             if (now < no_new_trades_time
                     and (now - last_watchlist_refresh).total_seconds() >= WATCHLIST_REFRESH_SECONDS):
-                try:
-                    refresh_scanner = Scanner()
-                    quiver_syms = refresh_scanner._fetch_quiver_signals()
-                    new_movers = refresh_scanner._fetch_dynamic_movers()
-                    fresh = quiver_syms + new_movers
-                    added = [s for s in fresh if s not in watchlist]
-                    if added:
-                        watchlist.extend(added)
-                        logger.info(f"Watchlist refresh: added {len(added)} symbols "
-                                    f"({len(quiver_syms)} quiver, {len(new_movers)} dynamic)")
-                except Exception as e:
-                    logger.warning(f"Watchlist refresh failed: {e}")
+                refresh_watchlist(watchlist)
                 last_watchlist_refresh = now
 
             if now < no_new_trades_time:
                 # Scan for new setups
                 try:
-                    run_intraday_cycle(watchlist, market_context, executor, strategies)
+                    run_intraday_cycle(watchlist, market_context, executor, strategies,
+                                       scanner=intraday_scanner)
                 except Exception as e:
                     tracker.add_warning(f"Intraday cycle error: {e}", service="Scanner")
 
@@ -0,0 +1,174 @@
+"""Live market-data feeds for the day trader's streaming mode.
+
+A MarketFeed delivers minute bars and quotes for subscribed symbols as
+FeedEvents. AlpacaStreamFeed wraps Alpaca's websocket stream; ReplayFeed
+plays back recorded bars so the streaming loop can be run offline.
+"""
+import json
+import logging
+import queue
+import threading
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+
+from src.shared.alpaca_client import get_data_stream
+
+logger = logging.getLogger(__name__)
+
+# kind is "bar" or "quote"; data is the Alpaca Bar/Quote (or a look-alike)
+FeedEvent = namedtuple("FeedEvent", ["kind", "symbol", "data"])
+
+
+class MarketFeed:
+    """Interface for bar/quote sources used by the streaming loop."""
+
+    exhausted = False  # True once a finite feed has nothing left to deliver
+
+    def subscribe(self, bars: list, quotes: list = ()) -> None:
+        """Set the symbols to receive bars and quotes for (replaces previous)."""
+        raise NotImplementedError
+
+    def next_events(self, timeout: float = 1.0) -> list:
+        """Wait up to timeout for events, then return everything pending."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class AlpacaStreamFeed(MarketFeed):
+    """Alpaca websocket feed; the stream runs in a daemon thread.
+
+    If the stream thread dies, the feed reports exhausted once the events
+    it already queued are drained, so callers can fall back to polling.
+    """
+
+    def __init__(self, account_id: str, feed: str = "iex"):
+        self.stream = get_data_stream(account_id, feed)
+        self._events = queue.Queue()
+        self._bars = set()
+        self._quotes = set()
+        self._thread = None
+
+    async def _on_bar(self, bar):
+        self._events.put(FeedEvent("bar", bar.symbol, bar))
+
+    async def _on_quote(self, quote):
+        self._events.put(FeedEvent("quote", quote.symbol, quote))
+
+    def subscribe(self, bars: list, quotes: list = ()) -> None:
+        bars, quotes = set(bars), set(quotes)
+        try:
+            if self._bars - bars:
+                self.stream.unsubscribe_bars(*(self._bars - bars))
+            if self._quotes - quotes:
+                self.stream.unsubscribe_quotes(*(self._quotes - quotes))
+            if bars - self._bars:
+                self.stream.subscribe_bars(self._on_bar, *(bars - self._bars))
+            if quotes - self._quotes:
+                self.stream.subscribe_quotes(self._on_quote, *(quotes - self._quotes))
+        except Exception as e:
+            logger.error(f"Stream subscription update failed: {e}")
+            return
+        self._bars, self._quotes = bars, quotes
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="alpaca-stream", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self.stream.run()  # reconnects internally until stop()
+        except Exception as e:
+            logger.error(f"Market data stream stopped: {e}")
+
+    @property
+    def exhausted(self) -> bool:
+        return (self._thread is not None and not self._thread.is_alive()
+                and self._events.empty())
+
+    def next_events(self, timeout: float = 1.0) -> list:
+        try:
+            events = [self._events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self) -> None:
+        try:
+            self.stream.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop market data stream: {e}")
+
+
+def _event_time(event: FeedEvent) -> float:
+    ts = event.data.timestamp
+    if not hasattr(ts, "timestamp"):
+        ts = datetime.fromisoformat(str(ts))
+    return ts.timestamp()
+
+
+class ReplayFeed(MarketFeed):
+    """Plays back recorded events in timestamp order, one timestamp per call.
+
+    Events for symbols that are not subscribed when their timestamp comes
+    up are dropped, as a live stream would never have delivered them.
+    """
+
+    def __init__(self, events: list):
+        self._events = sorted(events, key=_event_time)
+        self._pos = 0
+        self._bars = set()
+        self._quotes = set()
+
+    @classmethod
+    def from_bars(cls, bars_by_symbol: dict) -> "ReplayFeed":
+        return cls([
+            FeedEvent("bar", symbol, bar)
+            for symbol, bars in bars_by_symbol.items() for bar in bars
+        ])
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayFeed":
+        """Load a JSON-lines recording.
+
+        Each line: {"kind": "bar"|"quote", "symbol": ..., "timestamp": ISO-8601,
+        plus open/high/low/close/volume or bid_price/ask_price fields}.
+        """
+        events = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                kind = row.pop("kind", "bar")
+                events.append(FeedEvent(kind, row["symbol"], SimpleNamespace(**row)))
+        return cls(events)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._events)
+
+    def subscribe(self, bars: list, quotes: list = ()) -> None:
+        self._bars, self._quotes = set(bars), set(quotes)
+
+    def next_events(self, timeout: float = 1.0) -> list:
+        if self.exhausted:
+            return []
+        batch_time = _event_time(self._events[self._pos])
+        batch = []
+        while not self.exhausted and _event_time(self._events[self._pos]) == batch_time:
+            event = self._events[self._pos]
+            self._pos += 1
+            wanted = self._bars if event.kind == "bar" else self._quotes
+            if event.symbol in wanted:
+                batch.append(event)
+        return batch
@@ -1,14 +1,17 @@
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
-import numpy as np
 import requests
 
 import pytz
 
 from src.shared.alpaca_client import AlpacaClient
 from src.shared.database import Database
+from src.account2_daytrader import indicators
+from src.account2_daytrader.bar_store import BarStore
 from src.account2_daytrader.config import ACCOUNT_ID, SCANNER, STRATEGIES
 from src.account2_daytrader.universe import SCAN_UNIVERSE
 
@@ -27,8 +30,13 @@ class Scanner:
 
     def __init__(self):
         self.alpaca = AlpacaClient(ACCOUNT_ID)
+        # Intraday bar state, kept across scans for the current session
+        self.bar_store = BarStore(SCANNER["bar_store_capacity"])
+        self._daily_snapshots: dict = {}  # symbol → snapshot (previous_daily_bar)
+        self._session_date = None
         self.db = Database()
         self._quiver_context: dict = {}  # symbol → catalyst metadata
+        self.phase_timings: dict = {}  # phase → wall seconds, from the last premarket_scan
 
     def _fetch_quiver_signals(self) -> list:
         """Fetch QuiverQuant-identified symbols from Account A's signals table."""
@@ -114,6 +122,8 @@ class Scanner:
     def premarket_scan(self) -> list:
         """Scan for stocks with significant pre-market gaps and volume."""
         logger.info("Running pre-market scan...")
+        timings = {}
+        start = phase_start = time.monotonic()
 
         # Merge: QuiverQuant first (catalyst-backed), then static, then dynamic
         quiver = self._fetch_quiver_signals()
@@ -123,33 +133,65 @@ class Scanner:
             f"Scan universe: {len(quiver)} quiver + {len(SCAN_UNIVERSE)} static + "
             f"{len(dynamic)} dynamic = {len(combined)} unique symbols"
         )
-
-        candidates = []
+        timings["universe"] = time.monotonic() - phase_start
 
         # Get snapshots in batches
-        batch_size = 20
-        for i in range(0, len(combined), batch_size):
-            batch = combined[i:i + batch_size]
-            try:
-                snapshots = self.alpaca.get_snapshots(batch)
-                if not snapshots:
-                    continue
-
-                for symbol, snap in snapshots.items():
-                    try:
-                        candidate = self._evaluate_premarket(symbol, snap)
-                        if candidate:
-                            candidates.append(candidate)
-                    except Exception as e:
-                        logger.debug(f"Failed to evaluate {symbol}: {e}")
+        phase_start = time.monotonic()
+        if SCANNER.get("concurrent_snapshots", True):
+            batch_results = self._fetch_snapshots_concurrent(combined)
+        else:
+            batch_results = [
+                self._fetch_snapshot_batch(combined[i:i + 20])
+                for i in range(0, len(combined), 20)
+            ]
+        timings["snapshots"] = time.monotonic() - phase_start
 
-            except Exception as e:
-                logger.error(f"Failed to get snapshots for batch: {e}")
+        phase_start = time.monotonic()
+        candidates = []
+        for snapshots in batch_results:
+            if not snapshots:
+                continue
+            for symbol, snap in snapshots.items():
+                try:
+                    candidate = self._evaluate_premarket(symbol, snap)
+                    if candidate:
+                        candidates.append(candidate)
+                except Exception as e:
+                    logger.debug(f"Failed to evaluate {symbol}: {e}")
+        timings["evaluate"] = time.monotonic() - phase_start
 
         candidates.sort(key=lambda x: abs(x.get("gap_pct", 0)), reverse=True)
-        logger.info(f"Pre-market scan found {len(candidates)} candidates")
+        timings["total"] = time.monotonic() - start
+        self.phase_timings = {k: round(v, 3) for k, v in timings.items()}
+        logger.info(
+            f"Pre-market scan found {len(candidates)} candidates "
+            f"(timings: {self.phase_timings})"
+        )
         return candidates
 
+    def _fetch_snapshots_concurrent(self, symbols: list) -> list:
+        """Fetch snapshots for symbols in large batches on a bounded thread pool.
+
+        AlpacaClient paces the workers through the credential's data-API
+        rate limiter.
+        Returns one result per batch (None for a failed batch), in order.
+        """
+        batch_size = SCANNER.get("snapshot_batch_size", 100)
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        if not batches:
+            return []
+        workers = min(SCANNER.get("snapshot_workers", 4), len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshots") as pool:
+            return list(pool.map(self._fetch_snapshot_batch, batches))
+
+    def _fetch_snapshot_batch(self, batch: list):
+        """Fetch one batch of snapshots; a failure only loses this batch."""
+        try:
+            return self.alpaca.get_snapshots(batch)
+        except Exception as e:
+            logger.error(f"Failed to get snapshots for batch: {e}")
+            return None
+
     def _evaluate_premarket(self, symbol: str, snapshot) -> dict:
         """Evaluate a stock from its snapshot data."""
         try:
@@ -196,62 +238,24 @@ class Scanner:
         if not self._quiver_context:
             self._fetch_quiver_signals()
         symbols = watchlist or SCAN_UNIVERSE[:50]
-        candidates = []
-
-        batch_size = 10
-        bars_found = 0
-        snaps_found = 0
-        too_few_bars = 0
-        setups_detected = {}
-
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i:i + batch_size]
-            try:
-                bars_data = self.alpaca.get_bars(
-                    batch, TimeFrame.Minute, limit=200
-                )
-                if not bars_data:
-                    logger.warning(f"No bars data for batch starting {batch[0]}")
-                    continue
-
-                snapshots = self.alpaca.get_snapshots(batch)
 
-                for symbol in batch:
-                    try:
-                        try:
-                            symbol_bars = bars_data[symbol] if bars_data else None
-                        except (KeyError, TypeError):
-                            symbol_bars = None
-                        try:
-                            snap = snapshots[symbol] if snapshots else None
-                        except (KeyError, TypeError):
-                            snap = None
-
-                        if symbol_bars:
-                            bars_found += 1
-                        if snap:
-                            snaps_found += 1
-
-                        if not symbol_bars or not snap:
-                            continue
-
-                        bar_count = len(symbol_bars)
-                        if bar_count < 20:
-                            too_few_bars += 1
-                            continue
-
-                        setup = self._detect_intraday_setup(symbol, symbol_bars, snap)
-                        if setup:
-                            candidates.append(setup)
-                            for s in setup.get("setups", []):
-                                setups_detected[s] = setups_detected.get(s, 0) + 1
-                    except Exception as e:
-                        logger.info(f"Intraday eval failed for {symbol}: {e}")
+        # Only bars newer than what the store already holds are fetched
+        session_open = self.start_session(reset=not SCANNER["incremental_bars"])
+        self._update_bar_store(symbols, session_open)
+        self._update_daily_snapshots(symbols)
 
-            except Exception as e:
-                logger.error(f"Intraday scan batch failed: {e}")
+        candidates = self.evaluate(symbols)
 
         if not candidates:
+            bars_found = snaps_found = too_few_bars = 0
+            for symbol in symbols:
+                series = self.bar_store.get(symbol)
+                if series and series.count:
+                    bars_found += 1
+                    if series.count < indicators.LOOKBACK:
+                        too_few_bars += 1
+                if symbol in self._daily_snapshots:
+                    snaps_found += 1
             logger.info(
                 f"Scan diagnostics: {len(symbols)} symbols, "
                 f"bars_found={bars_found}, snaps_found={snaps_found}, "
@@ -261,57 +265,110 @@ class Scanner:
         logger.info(f"Intraday scan found {len(candidates)} setups")
         return candidates
 
-    def _detect_intraday_setup(self, symbol: str, bars, snapshot) -> dict:
-        """Detect potential intraday trading setups."""
-        if not bars or len(bars) < 20:
-            return None
+    def start_session(self, reset: bool = False) -> float:
+        """Reset bar/snapshot state on a new trading day; returns today's 9:30 ET epoch."""
+        today_open = datetime.now(ET).replace(hour=9, minute=30, second=0, microsecond=0)
+        if reset or today_open.date() != self._session_date:
+            self.bar_store = BarStore(SCANNER["bar_store_capacity"])
+            self._daily_snapshots = {}
+            self._session_date = today_open.date()
+        return today_open.timestamp()
+
+    def prime(self, symbols: list) -> None:
+        """Backfill bars and daily snapshots for symbols (streaming mode start-up)."""
+        if not self._quiver_context:
+            self._fetch_quiver_signals()
+        self._update_bar_store(symbols, self.start_session())
+        self._update_daily_snapshots(symbols)
 
-        closes = [float(b.close) for b in bars]
-        volumes = [float(b.volume) for b in bars]
-        highs = [float(b.high) for b in bars]
-        lows = [float(b.low) for b in bars]
+    def ingest_bars(self, symbol: str, bars: list) -> int:
+        """Append streamed bars for symbol to the bar store. Returns bars added."""
+        return self.bar_store.update(symbol, bars, self.start_session())
 
-        current_price = closes[-1]
-        current_volume = volumes[-1]
-        avg_volume = np.mean(volumes[-20:]) if len(volumes) >= 20 else np.mean(volumes)
+    def evaluate(self, symbols: list) -> list:
+        """Setups for symbols from the bar store's current indicator state."""
+        candidates = []
+        ready = [s for s in symbols if s in self._daily_snapshots]
+        try:
+            evaluated = self.bar_store.indicators(ready)
+        except Exception as e:
+            logger.error(f"Intraday indicator pass failed: {e}")
+            evaluated = {}
 
-        # Calculate VWAP using today's session bars only
-        today_open = datetime.now(ET).replace(hour=9, minute=30, second=0, microsecond=0)
-        today_idx = []
-        for idx, b in enumerate(bars):
+        for symbol, ind in evaluated.items():
             try:
-                bar_time = b.timestamp
-                if hasattr(bar_time, 'astimezone'):
-                    bar_et = bar_time.astimezone(ET)
-                else:
-                    bar_et = datetime.fromisoformat(str(bar_time)).astimezone(ET)
-                if bar_et >= today_open:
-                    today_idx.append(idx)
-            except Exception:
-                pass
-
-        if len(today_idx) >= 5:
-            v_highs = [highs[i] for i in today_idx]
-            v_lows = [lows[i] for i in today_idx]
-            v_closes = [closes[i] for i in today_idx]
-            v_volumes = [volumes[i] for i in today_idx]
-        else:
-            v_highs, v_lows, v_closes, v_volumes = highs, lows, closes, volumes
+                setup = self._classify_setup(symbol, ind, self._daily_snapshots[symbol])
+                if setup:
+                    candidates.append(setup)
+            except Exception as e:
+                logger.info(f"Intraday eval failed for {symbol}: {e}")
+        return candidates
 
-        typical_prices = [(h + l + c) / 3 for h, l, c in zip(v_highs, v_lows, v_closes)]
-        cum_tp_vol = sum(tp * v for tp, v in zip(typical_prices, v_volumes))
-        cum_vol = sum(v_volumes)
-        vwap = cum_tp_vol / cum_vol if cum_vol > 0 else current_price
+    def _update_bar_store(self, symbols: list, session_open: float) -> None:
+        """Append new minute bars for symbols to the bar store.
 
-        # Calculate RSI
-        rsi = self._calculate_rsi(closes)
+        Symbols the store already tracks are fetched from just after their
+        last stored bar; new symbols get the last bar_store_capacity bars.
+        """
+        warm = [s for s in symbols if self.bar_store.last_epoch(s) is not None]
+        cold = [s for s in symbols if self.bar_store.last_epoch(s) is None]
+        fetches = [
+            (cold[i:i + 10], {"limit": self.bar_store.capacity})
+            for i in range(0, len(cold), 10)
+        ]
+        batch_size = SCANNER["incremental_batch_size"]
+        for i in range(0, len(warm), batch_size):
+            batch = warm[i:i + batch_size]
+            since = min(self.bar_store.last_epoch(s) for s in batch)
+            start = datetime.fromtimestamp(since + 60, tz=pytz.utc)
+            fetches.append((batch, {"start": start, "limit": None}))
+
+        for batch, params in fetches:
+            try:
+                bars_data = self.alpaca.get_bars(batch, TimeFrame.Minute, **params)
+                if not bars_data:
+                    if "start" not in params:
+                        logger.warning(f"No bars data for batch starting {batch[0]}")
+                    continue
+                for symbol in batch:
+                    symbol_bars = bars_data.get(symbol)
+                    if symbol_bars:
+                        self.bar_store.update(symbol, symbol_bars, session_open)
+            except Exception as e:
+                logger.error(f"Intraday scan batch failed: {e}")
+
+    def _update_daily_snapshots(self, symbols: list) -> None:
+        """Fetch snapshots once per day; intraday only previous_daily_bar is used."""
+        missing = [s for s in symbols if s not in self._daily_snapshots]
+        for i in range(0, len(missing), 10):
+            batch = missing[i:i + 10]
+            try:
+                snapshots = self.alpaca.get_snapshots(batch)
+                if not snapshots:
+                    continue
+                for symbol in batch:
+                    snap = snapshots.get(symbol)
+                    if snap:
+                        self._daily_snapshots[symbol] = snap
+            except Exception as e:
+                logger.error(f"Intraday snapshot batch failed: {e}")
+
+    def _classify_setup(self, symbol: str, ind: dict, snapshot) -> dict:
+        """Apply the setup rules to one symbol's precomputed indicators."""
+        current_price = ind["current_price"]
+        current_volume = ind["current_volume"]
+        avg_volume = ind["avg_volume"]
+        vwap = ind["vwap"]
+        rsi = ind["rsi"]
+        sma_10 = ind["sma_10"]
+        sma_20 = ind["sma_20"]
 
         # Detect setups
         setups = []
 
         # Momentum: price near recent high/low with above-average volume
-        recent_high = max(highs[-20:])
-        recent_low = min(lows[-20:])
+        recent_high = ind["recent_high"]
+        recent_low = ind["recent_low"]
         if current_price > recent_high * 0.99 and current_volume > avg_volume * 1.5:
             setups.append("momentum")
         elif current_price < recent_low * 1.01 and current_volume > avg_volume * 1.5:
@@ -339,8 +396,6 @@ class Scanner:
                 setups.append("gap_fill")
 
         # Trending: price following short MA vs longer MA
-        sma_10 = np.mean(closes[-10:])
-        sma_20 = np.mean(closes[-20:])
         if current_price > sma_10 > sma_20 and current_volume >= avg_volume:
             setups.append("trending")
         elif current_price < sma_10 < sma_20 and current_volume >= avg_volume:
@@ -351,7 +406,7 @@ class Scanner:
 
         logger.info(
             f"Setup detected {symbol}: price={current_price:.2f} RSI={rsi:.1f} "
-            f"vol_ratio={current_volume / avg_volume:.1f}x "
+            f"vol_ratio={ind['volume_ratio']:.1f}x "
             f"vwap_dist={vwap_dist:.2f}% setups={setups}"
         )
 
@@ -378,28 +433,3 @@ class Scanner:
             else:
                 result["catalyst_boost"] = 5
         return result
-
-    @staticmethod
-    def _calculate_rsi(closes: list, period: int = 14) -> float:
-        """Calculate RSI using Wilder's smoothing."""
-        if len(closes) < period + 1:
-            return 50.0  # Default neutral
-
-        deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-
-        # Wilder's smoothing: seed with simple mean, then exponential
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-        if avg_loss == 0:
-            return 100.0
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
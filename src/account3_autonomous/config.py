@@ -9,6 +9,11 @@ EOD_REVIEW = "16:30"
 MIN_THESIS_LENGTH = 100  # Characters
 MIN_CONFIDENCE = 50
 
+# Order mode: "market" = thesis stop/target enforced by check_thesis_exits();
+# "bracket" = entries carry the thesis stop/target as GTC server-side legs
+# and check_thesis_exits() only handles time horizons and reconciles exits
+ORDER_MODE = "market"
+
 # Thesis classification labels
 THESIS_CLASSIFICATIONS = [
     "right_reason_win",
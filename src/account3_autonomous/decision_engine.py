@@ -83,8 +83,12 @@ class DecisionEngine:
         self.config = ACCOUNT_CONFIGS[ACCOUNT_ID]
         self.risk = RiskManager(ACCOUNT_ID)
 
-    def make_daily_decisions(self, briefing: str) -> dict:
-        """Morning decision: Claude reviews everything and decides what to trade."""
+    def make_daily_decisions(self, briefing: str, account_context: str = None) -> dict:
+        """Morning decision: Claude reviews everything and decides what to trade.
+
+        account_context (the briefing's slow-moving sections) is sent first
+        as a cacheable prefix when given.
+        """
         working_capital = self.risk.get_working_capital()
         system_prompt = DECISION_SYSTEM_TEMPLATE.replace(
             "${working_capital}",
@@ -96,6 +100,7 @@ class DecisionEngine:
             model="opus",
             effort="high",
             analysis_type="daily_decision",
+            cached_context=account_context,
         )
 
         if result:
@@ -1,12 +1,14 @@
 import json
 import logging
-import time
 from datetime import datetime, timedelta, timezone
 
 from src.shared.alpaca_client import AlpacaClient
+from src.shared.account_state import AccountState
 from src.shared.risk_manager import RiskManager
 from src.shared.database import Database
-from src.account3_autonomous.config import ACCOUNT_ID
+from src.shared.fill_reconciler import FillReconciler
+from src.shared import protective_orders
+from src.account3_autonomous.config import ACCOUNT_ID, ORDER_MODE
 from src.account3_autonomous.thesis_tracker import ThesisTracker
 
 logger = logging.getLogger(__name__)
@@ -19,8 +21,10 @@ class AutonomousExecutor:
 
     def __init__(self):
         self.alpaca = AlpacaClient(ACCOUNT_ID)
-        self.risk = RiskManager(ACCOUNT_ID)
+        self.state = AccountState(self.alpaca)
+        self.risk = RiskManager(ACCOUNT_ID, state=self.state)
         self.db = Database()
+        self.fills = FillReconciler(self.alpaca, self.db, ACCOUNT_ID)
         self.thesis_tracker = ThesisTracker()
 
     def execute_decisions(self, decisions: dict) -> dict:
@@ -46,7 +50,7 @@ class AutonomousExecutor:
                 "insight": lesson,
             })
 
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             # Queue new positions for later execution
             new_positions = decisions.get("new_positions", [])
             if new_positions:
@@ -67,14 +71,17 @@ class AutonomousExecutor:
             return results
 
         # Execute new positions
-        for position in decisions.get("new_positions", []):
-            try:
-                result = self._open_position(position)
-                if result:
-                    results["opened"].append(result)
-            except Exception as e:
-                logger.error(f"Failed to open {position['symbol']}: {e}")
-                results["errors"].append({"symbol": position["symbol"], "error": str(e)})
+        try:
+            for position in decisions.get("new_positions", []):
+                try:
+                    result = self._open_position(position)
+                    if result:
+                        results["opened"].append(result)
+                except Exception as e:
+                    logger.error(f"Failed to open {position['symbol']}: {e}")
+                    results["errors"].append({"symbol": position["symbol"], "error": str(e)})
+        finally:
+            self.fills.reconcile()
 
         # Execute position reviews
         for review in decisions.get("position_reviews", []):
@@ -108,7 +115,7 @@ class AutonomousExecutor:
 
     def execute_queued_orders(self) -> list:
         """Execute any pending queued orders if market is open."""
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             return []
 
         pending = self._get_pending_orders()
@@ -119,20 +126,23 @@ class AutonomousExecutor:
         logger.info(f"Found {len(pending)} queued orders to execute")
         executed = []
 
-        for order_row in pending:
-            position = order_row.get("signal_data", {})
-            position["symbol"] = order_row["symbol"]
-            position["confidence"] = order_row.get("confidence", 50)
-            position["position_size_pct"] = float(order_row.get("position_size_pct", 0.5))
-            position["side"] = order_row["direction"]
-            position["thesis"] = order_row.get("reasoning", "")
-
-            result = self._open_position(position)
-            if result:
-                self._mark_order_executed(order_row["id"])
-                executed.append(result)
-            else:
-                self._mark_order_executed(order_row["id"], status="failed")
+        try:
+            for order_row in pending:
+                position = order_row.get("signal_data", {})
+                position["symbol"] = order_row["symbol"]
+                position["confidence"] = order_row.get("confidence", 50)
+                position["position_size_pct"] = float(order_row.get("position_size_pct", 0.5))
+                position["side"] = order_row["direction"]
+                position["thesis"] = order_row.get("reasoning", "")
+
+                result = self._open_position(position)
+                if result:
+                    self._mark_order_executed(order_row["id"])
+                    executed.append(result)
+                else:
+                    self._mark_order_executed(order_row["id"], status="failed")
+        finally:
+            self.fills.reconcile()
 
         logger.info(f"Executed {len(executed)}/{len(pending)} queued orders")
         return executed
@@ -224,14 +234,26 @@ class AutonomousExecutor:
             logger.info(f"Cannot open {symbol}: {reason}")
             return None
 
-        # Submit order
+        # Submit order: thesis stop/target as GTC server-side legs in bracket
+        # mode, falling back to a plain market order if they can't be placed
         side = position.get("side", "buy")
-        order = self.alpaca.submit_market_order(
-            symbol=symbol, side=side, notional=position_size
-        )
+        order, order_type = None, "market"
+        if ORDER_MODE == "bracket":
+            order = self.alpaca.submit_bracket_order(
+                symbol, side, position_size,
+                stop_price=float(position.get("stop_loss") or 0) or None,
+                target_price=float(position.get("target_price") or 0) or None,
+                time_in_force="gtc",
+            )
+            order_type = "bracket" if order else order_type
+        if not order:
+            order = self.alpaca.submit_market_order(
+                symbol=symbol, side=side, notional=position_size
+            )
 
         if not order:
             return None
+        self.state.record_open(symbol, side, position_size, order)
 
         # Record trade
         trade_record = {
@@ -239,28 +261,14 @@ class AutonomousExecutor:
             "symbol": symbol,
             "side": side,
             "notional": round(position_size, 2),
-            "order_type": "market",
+            "order_type": order_type,
             "alpaca_order_id": str(order.id),
             "status": str(order.status),
             "strategy": "autonomous",
             "reasoning": position.get("thesis", ""),
         }
         db_trade = self.db.insert_trade(trade_record)
-
-        # Sync fill status — market orders fill near-instantly
-        if db_trade:
-            try:
-                time.sleep(1)
-                order_info = self.alpaca.get_order(str(order.id))
-                if order_info and "filled" in str(order_info.status).lower():
-                    self.db.update_trade(db_trade["id"], {
-                        "status": "filled",
-                        "fill_price": float(order_info.filled_avg_price),
-                        "filled_at": str(order_info.filled_at),
-                    })
-                    logger.info(f"Order filled: {symbol} @ ${float(order_info.filled_avg_price):.2f}")
-            except Exception as e:
-                logger.warning(f"Order sync failed for {symbol} (non-fatal): {e}")
+        self.fills.track(db_trade)  # fills synced in bulk after the batch
 
         # Record thesis
         if db_trade:
@@ -306,10 +314,11 @@ class AutonomousExecutor:
         realized_pnl = float(position.unrealized_pl)
         pnl_pct = float(position.unrealized_plpc) * 100
 
-        # Close position
-        result = self.alpaca.close_position(symbol)
+        # Close position (cancelling any exit legs holding the shares)
+        result = self.alpaca.close_position(symbol, cancel_orders=ORDER_MODE == "bracket")
         if not result:
             return None
+        self.state.record_close(symbol)
 
         # Find the trade record
         trades = self.db.get_open_trades(ACCOUNT_ID)
@@ -354,12 +363,16 @@ class AutonomousExecutor:
 
         No Claude calls. Checks current price against the stop_loss and
         target_price stored in the theses table at entry time.
-        Also checks time_horizon_days for stale positions.
+        Also checks time_horizon_days for stale positions. In bracket mode
+        the broker's legs enforce stop/target, so only the time horizon is
+        checked for protected positions, and positions the broker closed
+        are recorded.
         """
-        if not self.alpaca.is_market_open():
+        if not self.state.refresh().is_market_open():
             return []
 
-        positions = self.alpaca.get_positions()
+        positions = self.state.positions
+        open_orders = self.state.open_orders if ORDER_MODE == "bracket" else []
         open_theses = self.db.get_open_theses(ACCOUNT_ID)
         thesis_map = {t["symbol"]: t for t in open_theses}
         open_trades = self.db.get_open_trades(ACCOUNT_ID)
@@ -383,8 +396,11 @@ class AutonomousExecutor:
             side = trade.get("side", "buy") if trade else "buy"
 
             exit_reason = None
+            protected = protective_orders.exit_orders(open_orders, symbol, side)
 
-            if side == "buy":  # Long position
+            if protected:
+                pass  # broker holds the stop/target legs
+            elif side == "buy":  # Long position
                 if stop_price > 0 and current_price <= stop_price:
                     exit_reason = "guardian_stop_loss"
                 elif target_price > 0 and current_price >= target_price:
@@ -425,6 +441,22 @@ class AutonomousExecutor:
                 if result:
                     closed.append(result)
 
+        # Record positions the broker's exit legs closed since last check
+        if ORDER_MODE == "bracket":
+            open_symbols = {pos.symbol for pos in positions}
+            for symbol, trade in trade_map.items():
+                if symbol in open_symbols:
+                    continue
+                outcome = protective_orders.record_broker_exit(
+                    self.alpaca, self.db, ACCOUNT_ID, trade, "autonomous"
+                )
+                if outcome:
+                    closed.append({
+                        "symbol": symbol,
+                        "pnl": outcome["realized_pnl"],
+                        "reason": f"Broker exit: {outcome['exit_reason']}",
+                    })
+
         if closed:
             logger.info(f"Guardian closed {len(closed)} positions")
         else:
@@ -47,7 +47,7 @@ def run_decision():
         # Build comprehensive briefing
         briefing_builder = MarketBriefing()
         try:
-            briefing = briefing_builder.build_briefing()
+            account_context, briefing = briefing_builder.build_briefing_parts()
         except Exception as e:
             tracker.add_error("Market Data", str(e), "Cannot build briefing")
             tracker.finalize()
@@ -56,7 +56,7 @@ def run_decision():
         # Get Claude's decisions
         engine = DecisionEngine()
         try:
-            decisions = engine.make_daily_decisions(briefing)
+            decisions = engine.make_daily_decisions(briefing, account_context=account_context)
         except Exception as e:
             tracker.add_error("Claude", str(e), "No trading decisions made")
             tracker.finalize()
@@ -23,42 +23,53 @@ class MarketBriefing:
 
     def build_briefing(self) -> str:
         """Build comprehensive market briefing for Claude."""
-        sections = []
+        return "\n\n".join(self.build_briefing_parts())
 
-        # 1. Market overview
-        market_overview = self._get_market_overview()
-        sections.append(f"## MARKET OVERVIEW\n{market_overview}")
-
-        # 2. Top movers — individual stock candidates
-        movers = self._get_top_movers()
-        sections.append(f"## TOP MOVERS (Individual Stock Candidates)\n{movers}")
+    def build_briefing_parts(self) -> tuple:
+        """Return (account_context, market_briefing).
 
-        # 3. Current portfolio
-        portfolio = self._get_portfolio_state()
-        sections.append(f"## CURRENT PORTFOLIO\n{portfolio}")
+        account_context holds the slow-moving sections (performance, trade
+        history, thesis accuracy, learnings) and leads the prompt as a
+        cacheable prefix; market_briefing holds what changes call to call.
+        """
+        account = []
 
-        # 4. Performance metrics
+        # 1. Performance metrics
         metrics = self.tracker.get_performance_metrics()
         metrics_text = self._format_metrics(metrics)
-        sections.append(f"## PERFORMANCE METRICS\n{metrics_text}")
+        account.append(f"## PERFORMANCE METRICS\n{metrics_text}")
 
-        # 5. Trade history
+        # 2. Trade history
         history = self._get_trade_history()
-        sections.append(f"## RECENT TRADE HISTORY\n{history}")
+        account.append(f"## RECENT TRADE HISTORY\n{history}")
 
-        # 6. Thesis accuracy
+        # 3. Thesis accuracy
         thesis_stats = self._get_thesis_stats()
-        sections.append(f"## THESIS ACCURACY\n{thesis_stats}")
+        account.append(f"## THESIS ACCURACY\n{thesis_stats}")
 
-        # 7. Active learnings
+        # 4. Active learnings
         learnings = self._get_learnings()
-        sections.append(f"## ACCUMULATED LEARNINGS\n{learnings}")
+        account.append(f"## ACCUMULATED LEARNINGS\n{learnings}")
+
+        market = []
+
+        # 5. Market overview
+        market_overview = self._get_market_overview()
+        market.append(f"## MARKET OVERVIEW\n{market_overview}")
+
+        # 6. Top movers — individual stock candidates
+        movers = self._get_top_movers()
+        market.append(f"## TOP MOVERS (Individual Stock Candidates)\n{movers}")
+
+        # 7. Current portfolio
+        portfolio = self._get_portfolio_state()
+        market.append(f"## CURRENT PORTFOLIO\n{portfolio}")
 
         # 8. Open theses to review
         open_theses = self._get_open_theses()
-        sections.append(f"## OPEN POSITIONS & THESES\n{open_theses}")
+        market.append(f"## OPEN POSITIONS & THESES\n{open_theses}")
 
-        return "\n\n".join(sections)
+        return "\n\n".join(account), "\n\n".join(market)
 
     def _get_market_overview(self) -> str:
         """Get current market data for major indices."""
@@ -12,3 +12,8 @@ FORCE_CLOSE = "15:50"
 # Trailing stop
 TRAIL_ACTIVATE_PCT = 1.5   # Activate trailing stop after +1.5% unrealized gain
 TRAIL_OFFSET_PCT = 0.75    # Trail 0.75% below high-water mark
+
+# Order mode: "market" = trailing stop enforced by manage_positions();
+# "bracket" = whole-share entries, and a native trailing stop is placed
+# once the trail activates, so the broker enforces it between runs
+ORDER_MODE = "market"
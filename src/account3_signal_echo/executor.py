@@ -1,12 +1,14 @@
 import logging
-import time
 from datetime import datetime, timezone
 
 from src.shared.alpaca_client import AlpacaClient
+from src.shared.account_state import AccountState
 from src.shared.risk_manager import RiskManager
 from src.shared.database import Database
+from src.shared.fill_reconciler import FillReconciler
+from src.shared import protective_orders
 from src.account3_signal_echo.config import (
-    ACCOUNT_ID, TRAIL_ACTIVATE_PCT, TRAIL_OFFSET_PCT,
+    ACCOUNT_ID, ORDER_MODE, TRAIL_ACTIVATE_PCT, TRAIL_OFFSET_PCT,
 )
 
 logger = logging.getLogger(__name__)
@@ -17,12 +19,19 @@ class SignalEchoExecutor:
 
     def __init__(self):
         self.alpaca = AlpacaClient(ACCOUNT_ID)
-        self.risk = RiskManager(ACCOUNT_ID)
+        self.state = AccountState(self.alpaca)
+        self.risk = RiskManager(ACCOUNT_ID, state=self.state)
         self.db = Database()
+        self.fills = FillReconciler(self.alpaca, self.db, ACCOUNT_ID)
         self._high_water_marks = {}
 
     def open_positions(self, signals: list) -> list:
-        """Open positions for eligible signals."""
+        """Open positions for eligible signals.
+
+        Broker state is read once up front; each risk check after that
+        works from it plus the orders placed in this pass.
+        """
+        self.state.refresh()
         opened = []
         for signal in signals:
             symbol = signal["symbol"]
@@ -57,14 +66,17 @@ class SignalEchoExecutor:
                 logger.info(f"Cannot open {symbol}: {reason}")
                 continue
 
-            # Submit market order
+            # Submit market order (whole shares in bracket mode, so a native
+            # trailing stop can be attached once the trail activates)
             side = signal.get("direction", "buy")
             order = self.alpaca.submit_market_order(
                 symbol=symbol, side=side, notional=position_size,
+                whole_shares=ORDER_MODE == "bracket",
             )
             if not order:
                 logger.warning(f"Order submission failed for {symbol}")
                 continue
+            self.state.record_open(symbol, side, position_size, order)
 
             # Record trade in DB
             trade_record = {
@@ -82,23 +94,7 @@ class SignalEchoExecutor:
                 ),
             }
             db_trade = self.db.insert_trade(trade_record)
-
-            # Sync fill status
-            if db_trade:
-                try:
-                    time.sleep(1)
-                    order_info = self.alpaca.get_order(str(order.id))
-                    if order_info and "filled" in str(order_info.status).lower():
-                        self.db.update_trade(db_trade["id"], {
-                            "status": "filled",
-                            "fill_price": float(order_info.filled_avg_price),
-                            "filled_at": str(order_info.filled_at),
-                        })
-                        logger.info(
-                            f"Filled: {symbol} @ ${float(order_info.filled_avg_price):.2f}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Order sync failed for {symbol} (non-fatal): {e}")
+            self.fills.track(db_trade)  # fills synced in bulk after the loop
 
             logger.info(
                 f"Opened {side} {symbol}: ${position_size:.2f} "
@@ -106,12 +102,20 @@ class SignalEchoExecutor:
             )
             opened.append({"symbol": symbol, "notional": position_size, "score": composite_score})
 
+        self.fills.reconcile()
         return opened
 
     def manage_positions(self) -> list:
-        """Trailing stop management on open positions."""
-        positions = self.alpaca.get_positions()
+        """Trailing stop management on open positions.
+
+        In bracket mode an activated trail is handed to the broker as a
+        native trailing stop, positions already carrying one are skipped,
+        and positions the broker has closed are recorded.
+        """
+        self.fills.reconcile(wait=False)
+        positions = self.state.refresh().positions
         open_trades = self.db.get_open_trades(ACCOUNT_ID)
+        open_orders = self.state.open_orders if ORDER_MODE == "bracket" else []
         actions = []
 
         # Index trades by symbol, keeping the most recent per symbol
@@ -133,6 +137,16 @@ class SignalEchoExecutor:
                 self._high_water_marks[symbol] = unrealized_pnl_pct
             current_high = self._high_water_marks.get(symbol, 0)
 
+            side = trade.get("side", "buy")
+            if protective_orders.exit_orders(open_orders, symbol, side):
+                continue  # broker-held trailing stop
+
+            if (ORDER_MODE == "bracket" and TRAIL_ACTIVATE_PCT and TRAIL_OFFSET_PCT
+                    and current_high >= TRAIL_ACTIVATE_PCT
+                    and self._place_trailing_stop(pos, side)):
+                actions.append({"symbol": symbol, "action": "trailing_stop_placed"})
+                continue
+
             # Check trailing stop
             if (TRAIL_ACTIVATE_PCT and TRAIL_OFFSET_PCT
                     and current_high >= TRAIL_ACTIVATE_PCT):
@@ -142,9 +156,9 @@ class SignalEchoExecutor:
                         f"TRAILING STOP: {symbol} at {unrealized_pnl_pct:.2f}% "
                         f"(high={current_high:.2f}%, trail={trailing_stop:.2f}%)"
                     )
-                    self._close_and_record(pos, trade, "trailing_stop")
-                    self._high_water_marks.pop(symbol, None)
-                    actions.append({"symbol": symbol, "action": "trailing_stop"})
+                    if self._close_and_record(pos, trade, "trailing_stop"):
+                        self._high_water_marks.pop(symbol, None)
+                        actions.append({"symbol": symbol, "action": "trailing_stop"})
 
         # Clean up high-water marks for closed positions
         open_symbols = {pos.symbol for pos in positions}
@@ -152,12 +166,40 @@ class SignalEchoExecutor:
             if sym not in open_symbols:
                 del self._high_water_marks[sym]
 
+        # Record positions the broker's trailing stops closed since last check
+        if ORDER_MODE == "bracket":
+            for symbol, trade in trades_by_symbol.items():
+                if symbol in open_symbols:
+                    continue
+                outcome = protective_orders.record_broker_exit(
+                    self.alpaca, self.db, ACCOUNT_ID, trade, "signal_echo"
+                )
+                if outcome:
+                    actions.append({"symbol": symbol, "action": outcome["exit_reason"]})
+
         return actions
 
+    def _place_trailing_stop(self, position, side: str) -> bool:
+        """Hand an activated trail to the broker as a native trailing stop.
+
+        The trail is TRAIL_OFFSET_PCT of entry price, the same distance the
+        polled check uses (offset in P&L points below the high-water mark).
+        Fractional positions can't carry one; they stay on the polled check.
+        """
+        qty = abs(float(position.qty))
+        if qty < 1 or qty != int(qty):
+            return False
+        exit_side = "sell" if side == "buy" else "buy"
+        trail_price = float(position.avg_entry_price) * TRAIL_OFFSET_PCT / 100
+        order = self.alpaca.submit_trailing_stop_order(
+            position.symbol, exit_side, int(qty), trail_price=trail_price,
+        )
+        return order is not None
+
     def force_close_all(self) -> list:
         """Force close ALL positions at EOD."""
         self._high_water_marks.clear()
-        positions = self.alpaca.get_positions()
+        positions = self.state.refresh().positions
         trades = self.db.get_open_trades(ACCOUNT_ID)
         closed = []
 
@@ -168,7 +210,8 @@ class SignalEchoExecutor:
         for pos in positions:
             symbol = pos.symbol
             trade = trades_by_symbol.get(symbol)
-            self._close_and_record(pos, trade, "eod_close")
+            if not self._close_and_record(pos, trade, "eod_close"):
+                continue
             closed.append({
                 "symbol": symbol,
                 "pnl": float(pos.unrealized_pl),
@@ -179,7 +222,7 @@ class SignalEchoExecutor:
             logger.info(f"Force closed {len(closed)} positions")
         return closed
 
-    def _close_and_record(self, position, trade: dict, exit_reason: str) -> None:
+    def _close_and_record(self, position, trade: dict, exit_reason: str) -> bool:
         """Close a position and record the outcome."""
         symbol = position.symbol
         entry_price = float(position.avg_entry_price)
@@ -187,7 +230,10 @@ class SignalEchoExecutor:
         realized_pnl = float(position.unrealized_pl)
         pnl_pct = float(position.unrealized_plpc) * 100
 
-        self.alpaca.close_position(symbol)
+        result = self.alpaca.close_position(symbol, cancel_orders=ORDER_MODE == "bracket")
+        if not result:
+            return False
+        self.state.record_close(symbol)
 
         if trade and trade.get("id"):
             self.db.update_trade(trade["id"], {
@@ -216,3 +262,4 @@ class SignalEchoExecutor:
             f"Closed {symbol}: P&L=${realized_pnl:.2f} ({pnl_pct:.2f}%), "
             f"reason={exit_reason}"
         )
+        return True
@@ -1,5 +1,4 @@
 import logging
-from collections import defaultdict
 
 import numpy as np
 
@@ -12,8 +11,7 @@ logger = logging.getLogger(__name__)
 def calculate_metrics(account_id: str) -> dict:
     """Calculate comprehensive performance metrics for an account."""
     db = Database()
-    outcomes = db.get_trade_outcomes(account_id, limit=10000, since=DATA_START_DATE)
-    snapshots = db.get_snapshots(account_id, limit=365, since=DATA_START_DATE)
+    summary = db.get_outcome_summary(account_id, since=DATA_START_DATE)
 
     metrics = {
         "account_id": account_id,
@@ -35,91 +33,96 @@ def calculate_metrics(account_id: str) -> dict:
         "by_day_of_week": {},
     }
 
-    if not outcomes:
+    if not summary["trades"]:
         return metrics
 
-    # Basic stats
-    pnls = [float(o.get("realized_pnl", 0) or 0) for o in outcomes]
-    wins = [p for p in pnls if p > 0]
-    losses = [p for p in pnls if p < 0]
-
-    metrics["total_trades"] = len(outcomes)
-    metrics["wins"] = len(wins)
-    metrics["losses"] = len(losses)
-    metrics["win_rate"] = round(len(wins) / len(pnls) * 100, 1) if pnls else 0
-    metrics["total_pnl"] = round(sum(pnls), 2)
-    metrics["avg_win"] = round(np.mean(wins), 2) if wins else 0
-    metrics["avg_loss"] = round(np.mean(losses), 2) if losses else 0
-    metrics["return_pct"] = round(sum(pnls) / STARTING_CAPITAL * 100, 2)
+    # Basic stats (aggregated server-side)
+    total_trades = summary["trades"]
+    wins = summary["wins"]
+    losses = summary["losses"]
+    total_pnl = summary["total_pnl"]
+
+    metrics["total_trades"] = total_trades
+    metrics["wins"] = wins
+    metrics["losses"] = losses
+    metrics["win_rate"] = round(wins / total_trades * 100, 1)
+    metrics["total_pnl"] = round(total_pnl, 2)
+    metrics["avg_win"] = round(summary["avg_win"], 2) if wins else 0
+    metrics["avg_loss"] = round(summary["avg_loss"], 2) if losses else 0
+    metrics["return_pct"] = round(total_pnl / STARTING_CAPITAL * 100, 2)
 
     # Profit factor
-    gross_profit = sum(wins)
-    gross_loss = abs(sum(losses))
+    gross_profit = summary["gross_profit"]
+    gross_loss = summary["gross_loss"]
     metrics["profit_factor"] = (
         round(gross_profit / gross_loss, 2) if gross_loss > 0 else float("inf")
     )
 
     # Best/worst trades
-    if outcomes:
-        best = max(outcomes, key=lambda o: float(o.get("realized_pnl", 0) or 0))
-        worst = min(outcomes, key=lambda o: float(o.get("realized_pnl", 0) or 0))
-        metrics["best_trade"] = {
-            "symbol": best.get("symbol"),
-            "pnl": float(best.get("realized_pnl", 0) or 0),
-            "strategy": best.get("strategy"),
-        }
-        metrics["worst_trade"] = {
-            "symbol": worst.get("symbol"),
-            "pnl": float(worst.get("realized_pnl", 0) or 0),
-            "strategy": worst.get("strategy"),
-        }
+    for field in ("best_trade", "worst_trade"):
+        trade = summary[field]
+        if trade:
+            metrics[field] = {
+                "symbol": trade["symbol"],
+                "pnl": trade["pnl"],
+                "strategy": trade["strategy"],
+            }
 
     # Average holding period
-    holding_hours = [
-        float(o.get("holding_period_hours", 0) or 0) for o in outcomes
-        if o.get("holding_period_hours")
-    ]
-    metrics["avg_holding_hours"] = round(np.mean(holding_hours), 1) if holding_hours else 0
-
-    # Sharpe ratio from snapshots
-    if len(snapshots) >= 2:
-        equities = [float(s["equity"]) for s in reversed(snapshots)]
-        daily_returns = []
-        for i in range(1, len(equities)):
-            ret = (equities[i] - equities[i - 1]) / equities[i - 1]
-            daily_returns.append(ret)
-        if daily_returns:
-            metrics["sharpe_ratio"] = round(
-                (np.mean(daily_returns) / np.std(daily_returns)) * np.sqrt(252)
-                if np.std(daily_returns) > 0 else 0, 2
-            )
-        # Max drawdown
-        peak = equities[0]
-        max_dd = 0
-        for eq in equities:
-            if eq > peak:
-                peak = eq
-            dd = (peak - eq) / peak * 100
-            if dd > max_dd:
-                max_dd = dd
-        metrics["max_drawdown_pct"] = round(max_dd, 2)
-
-    # By strategy
-    by_strategy = defaultdict(lambda: {"wins": 0, "losses": 0, "pnl": 0})
-    for o in outcomes:
-        strat = o.get("strategy", "unknown")
-        pnl = float(o.get("realized_pnl", 0) or 0)
-        by_strategy[strat]["wins" if pnl > 0 else "losses"] += 1
-        by_strategy[strat]["pnl"] += pnl
+    metrics["avg_holding_hours"] = round(summary["avg_holding_hours"], 1)
+
+    # Sharpe ratio and max drawdown, streamed from snapshots oldest-first
+    snapshots = db.iter_snapshots(
+        account_id, columns="equity", since=DATA_START_DATE
+    )
+    sharpe, max_dd = _equity_curve_stats(float(s["equity"]) for s in snapshots)
+    metrics["sharpe_ratio"] = sharpe
+    metrics["max_drawdown_pct"] = max_dd
 
+    # By strategy (flat trades count as losses here, as before)
+    by_strategy = db.get_outcome_aggregates(
+        account_id, group_by="strategy", since=DATA_START_DATE
+    )
     for strat, data in by_strategy.items():
-        total = data["wins"] + data["losses"]
+        total = data["trades"]
         metrics["by_strategy"][strat] = {
             "total": total,
             "wins": data["wins"],
-            "losses": data["losses"],
+            "losses": total - data["wins"],
             "win_rate": round(data["wins"] / total * 100, 1) if total > 0 else 0,
-            "pnl": round(data["pnl"], 2),
+            "pnl": round(data["total_pnl"], 2),
         }
 
     return metrics
+
+
+def _equity_curve_stats(equities) -> tuple:
+    """Annualized Sharpe ratio and max drawdown % in one pass over equities.
+
+    Daily return mean/variance are accumulated with Welford's method, so
+    this runs in constant memory over a streamed snapshot history.
+    Returns (0, 0) with fewer than two points.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    prev = None
+    peak = None
+    max_dd = 0.0
+    for eq in equities:
+        if prev is not None:
+            ret = (eq - prev) / prev
+            n += 1
+            delta = ret - mean
+            mean += delta / n
+            m2 += delta * (ret - mean)
+        prev = eq
+        if peak is None or eq > peak:
+            peak = eq
+        max_dd = max(max_dd, (peak - eq) / peak * 100)
+
+    if n == 0:
+        return 0, 0
+    std = np.sqrt(m2 / n)
+    sharpe = round((mean / std) * np.sqrt(252), 2) if std > 0 else 0
+    return sharpe, round(max_dd, 2)
@@ -14,46 +14,31 @@ def update_scorecard(account_id: str, period: str = None) -> dict:
     if period is None:
         period = f"all_time_{datetime.now().strftime('%Y%m')}"
 
-    outcomes = db.get_trade_outcomes(account_id, limit=10000)
-    if not outcomes:
+    aggregates = db.get_outcome_aggregates(account_id, group_by="source")
+    if not aggregates:
         return {}
 
-    # Group by signal source
+    # Per-source totals come back aggregated server-side; flat trades
+    # count as losses here.
     by_source = defaultdict(lambda: {
         "total": 0, "acted_on": 0, "wins": 0, "losses": 0,
-        "returns": [], "best": None, "worst": None,
+        "avg_return": 0, "best": None, "worst": None,
     })
 
-    for o in outcomes:
-        source = o.get("signal_source") or o.get("strategy", "unknown")
-        pnl = float(o.get("realized_pnl", 0) or 0)
-        pnl_pct = float(o.get("pnl_pct", 0) or 0)
-
-        by_source[source]["total"] += 1
-        by_source[source]["acted_on"] += 1
-        by_source[source]["returns"].append(pnl_pct)
-
-        if pnl > 0:
-            by_source[source]["wins"] += 1
-        else:
-            by_source[source]["losses"] += 1
-
-        # Track best/worst
-        trade_info = {"symbol": o.get("symbol"), "pnl": pnl, "pnl_pct": pnl_pct}
-        if by_source[source]["best"] is None or pnl > by_source[source]["best"]["pnl"]:
-            by_source[source]["best"] = trade_info
-        if by_source[source]["worst"] is None or pnl < by_source[source]["worst"]["pnl"]:
-            by_source[source]["worst"] = trade_info
+    for source, agg in aggregates.items():
+        by_source[source].update({
+            "total": agg["trades"],
+            "acted_on": agg["trades"],
+            "wins": agg["wins"],
+            "losses": agg["trades"] - agg["wins"],
+            "avg_return": round(agg["avg_pnl_pct"], 2),
+            "best": _trade_info(agg["best_trade"]),
+            "worst": _trade_info(agg["worst_trade"]),
+        })
 
     # Also count signals that weren't acted on
     try:
-        signals_resp = (
-            db.client.table("signals")
-            .select("source, acted_on")
-            .eq("account_id", account_id)
-            .execute()
-        )
-        for sig in signals_resp.data:
+        for sig in db.iter_signals(account_id, columns="source,acted_on"):
             source = sig.get("source", "unknown")
             by_source[source]["total"] += 1
             if sig.get("acted_on"):
@@ -64,8 +49,7 @@ def update_scorecard(account_id: str, period: str = None) -> dict:
     # Upsert scorecards
     updated = {}
     for source, data in by_source.items():
-        import numpy as np
-        avg_return = round(float(np.mean(data["returns"])), 2) if data["returns"] else 0
+        avg_return = data["avg_return"]
         total = data["wins"] + data["losses"]
         win_rate = round(data["wins"] / total * 100, 1) if total > 0 else 0
 
@@ -87,3 +71,10 @@ def update_scorecard(account_id: str, period: str = None) -> dict:
 
     logger.info(f"Updated scorecard for {account_id}: {len(updated)} sources")
     return updated
+
+
+def _trade_info(trade: dict) -> dict:
+    """Trim an aggregate best/worst trade to the scorecard's shape."""
+    if not trade:
+        return None
+    return {"symbol": trade["symbol"], "pnl": trade["pnl"], "pnl_pct": trade["pnl_pct"]}
@@ -0,0 +1,169 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Reads older than this trigger a refetch even if nobody called refresh().
+ACCOUNT_STATE_MAX_AGE = 120.0
+
+
+class LocalPosition:
+    """Placeholder for a position opened this cycle, before the broker reports it.
+
+    Carries the Alpaca Position attributes the risk checks read, valued at
+    the order's notional with no P&L yet.
+    """
+
+    def __init__(self, symbol: str, side: str, notional: float, price: float = None):
+        self.symbol = symbol
+        self.side = "long" if side.lower() == "buy" else "short"
+        self.market_value = notional if self.side == "long" else -notional
+        self.cost_basis = notional
+        self.current_price = price
+        self.avg_entry_price = price
+        self.qty = notional / price if price else 0
+        self.unrealized_pl = 0.0
+        self.unrealized_plpc = 0.0
+        self.unrealized_intraday_pl = 0.0
+
+
+class AccountState:
+    """Broker state for one account, read once per cycle and shared.
+
+    Positions, account, open orders and clock are each fetched lazily on
+    first use and then served from memory until refresh() (call it at the
+    start of each cycle) or until they are older than max_age seconds.
+    Executors call record_open()/record_close() after submitting orders so
+    later risk checks in the same cycle see the new exposure without
+    another broker read.
+
+    A failed positions read is never cached: positions_known is False and
+    the next access retries, so one broker error can't stand in for an
+    empty book for the rest of the cycle.
+    """
+
+    def __init__(self, alpaca, max_age: float = ACCOUNT_STATE_MAX_AGE):
+        self.alpaca = alpaca
+        self.max_age = max_age
+        self._positions = None  # symbol -> position
+        self._account = None
+        self._open_orders = None
+        self._clock = None
+        self._fetched_at = {}
+        self.reads = 0  # broker calls made, for logging
+
+    def refresh(self) -> "AccountState":
+        """Drop everything cached; the next read refetches from the broker."""
+        self._positions = None
+        self._account = None
+        self._open_orders = None
+        self._clock = None
+        self._fetched_at.clear()
+        return self
+
+    def _stale(self, field: str) -> bool:
+        fetched = self._fetched_at.get(field)
+        return fetched is None or time.monotonic() - fetched > self.max_age
+
+    def _mark(self, field: str) -> None:
+        self._fetched_at[field] = time.monotonic()
+        self.reads += 1
+
+    # --- Positions ---
+
+    def _position_map(self) -> Optional[dict]:
+        """symbol -> position, or None if the broker read failed."""
+        if self._positions is None or self._stale("positions"):
+            try:
+                positions = self.alpaca.get_positions(raise_errors=True)
+            except Exception:
+                self._positions = None
+                return None
+            self._positions = {p.symbol: p for p in positions}
+            self._mark("positions")
+        return self._positions
+
+    @property
+    def positions_known(self) -> bool:
+        """False if open positions couldn't be read from the broker."""
+        return self._position_map() is not None
+
+    @property
+    def positions(self) -> list:
+        """All open positions (AlpacaClient.get_positions, cached); [] if unknown."""
+        return list((self._position_map() or {}).values())
+
+    def get_position(self, symbol: str):
+        """Position for symbol, or None."""
+        return (self._position_map() or {}).get(symbol)
+
+    @property
+    def position_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def invested_value(self) -> float:
+        """Total absolute market value of open positions."""
+        return sum(abs(float(p.market_value)) for p in self.positions)
+
+    @property
+    def unrealized_pl(self) -> float:
+        return sum(float(p.unrealized_pl) for p in self.positions)
+
+    @property
+    def unrealized_intraday_pl(self) -> float:
+        return sum(float(p.unrealized_intraday_pl) for p in self.positions)
+
+    # --- Account, orders, clock ---
+
+    @property
+    def account(self):
+        """Alpaca account object, or None if the read failed."""
+        if self._account is None or self._stale("account"):
+            try:
+                self._account = self.alpaca.get_account()
+            except Exception as e:
+                logger.error(f"Failed to get account for {self.alpaca.account_id}: {e}")
+                return None
+            self._mark("account")
+        return self._account
+
+    @property
+    def open_orders(self) -> list:
+        """Open (unfilled) orders."""
+        if self._open_orders is None or self._stale("open_orders"):
+            self._open_orders = list(self.alpaca.get_open_orders())
+            self._mark("open_orders")
+        return self._open_orders
+
+    @property
+    def clock(self):
+        """Market clock, or None if the read failed."""
+        if self._clock is None or self._stale("clock"):
+            try:
+                self._clock = self.alpaca.get_clock()
+            except Exception as e:
+                logger.error(f"Failed to check market clock: {e}")
+                return None
+            self._mark("clock")
+        return self._clock
+
+    def is_market_open(self) -> bool:
+        clock = self.clock
+        return bool(clock and clock.is_open)
+
+    # --- Local updates ---
+
+    def record_open(self, symbol: str, side: str, notional: float,
+                    order=None, price: float = None) -> None:
+        """Reflect a just-submitted entry order without refetching."""
+        positions = self._position_map()
+        if positions is not None and symbol not in positions:
+            positions[symbol] = LocalPosition(symbol, side, notional, price)
+        if order is not None and self._open_orders is not None:
+            self._open_orders.append(order)
+
+    def record_close(self, symbol: str) -> Optional[object]:
+        """Reflect a just-submitted close; returns the removed position."""
+        return (self._position_map() or {}).pop(symbol, None)
@@ -2,8 +2,9 @@ import logging
 import time
 from typing import Optional
 
-from src.shared.database import Database
 from src.shared.notifier import send_email
+from src.shared.rate_limiter import get_rate_limiter_stats
+from src.shared.write_behind import enqueue_insert
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,6 @@ class HealthTracker:
         self.errors: list[dict] = []
         self.warnings: list[dict] = []
         self.start_time = time.time()
-        self.db = Database()
 
     def add_error(self, service: str, message: str, impact: str = "") -> None:
         """Record an error that occurred during the run."""
@@ -61,8 +61,8 @@ class HealthTracker:
         duration = time.time() - self.start_time
         status = self.severity
 
-        # Log to health_checks table
-        self.db.log_health_check({
+        # Log to health_checks table (written in the background)
+        enqueue_insert("health_checks", {
             "workflow": self.workflow,
             "account_id": self.account_id,
             "status": status,
@@ -71,6 +71,13 @@ class HealthTracker:
             "run_duration_seconds": round(duration, 2),
         })
 
+        throttled = {
+            name: stats for name, stats in get_rate_limiter_stats().items()
+            if stats["throttled"]
+        }
+        if throttled:
+            logger.info(f"[{self.workflow}] Rate limiter waits: {throttled}")
+
         # Send alert email if there were errors
         if self.errors:
             self._send_alert_email(duration)
@@ -1,9 +1,21 @@
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
 from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
-from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.stream import TradingStream
+from alpaca.trading.requests import (
+    MarketOrderRequest,
+    LimitOrderRequest,
+    GetOrdersRequest,
+    ReplaceOrderRequest,
+    StopLossRequest,
+    TakeProfitRequest,
+    TrailingStopOrderRequest,
+)
+from alpaca.trading.enums import OrderClass, OrderSide, TimeInForce, QueryOrderStatus
 from alpaca.data.historical.stock import StockHistoricalDataClient
 from alpaca.data.requests import (
     StockBarsRequest,
@@ -13,12 +25,123 @@ from alpaca.data.requests import (
     MarketMoversRequest,
 )
 from alpaca.data.historical.screener import ScreenerClient
-from alpaca.data.timeframe import TimeFrame
+from alpaca.data.live import StockDataStream
+from alpaca.data.enums import DataFeed
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 
 from src.shared.config import ALPACA_ACCOUNTS, TRADING_MODE
+from src.shared.rate_limiter import ThrottledClient, limiter_for
 
 logger = logging.getLogger(__name__)
 
+FINAL_ORDER_STATUSES = ("filled", "canceled", "expired", "rejected", "done_for_day")
+CANCEL_SETTLE_TIMEOUT = 5.0   # seconds close_position waits for cancelled legs
+CANCEL_POLL_INTERVAL = 0.25
+
+
+def order_status(value) -> str:
+    """Normalize "OrderStatus.FILLED" / OrderStatus.FILLED / "filled" to "filled"."""
+    value = getattr(value, "value", value)
+    return str(value).split(".")[-1].lower()
+
+
+# --- Market data cache ---
+
+# Seconds a cached market-data object stays fresh, per kind.
+MARKET_DATA_TTLS = {
+    "quote": 5,
+    "snapshot": 30,
+    "bars": 30,          # intraday bars
+    "bars_day": 86400,   # daily (and longer) bars
+}
+MARKET_DATA_MAX_ENTRIES = 5000
+
+
+class MarketDataCache:
+    """Process-wide TTL/LRU cache of per-symbol market data.
+
+    Entries are keyed by (kind, params, symbol) so one symbol's snapshot is
+    shared by every caller in the process, whichever account's client asked.
+    get_many() serves hits from memory and fetches all misses in a single
+    batched request. Market data is account-independent, so sharing across
+    accounts is safe.
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = MARKET_DATA_MAX_ENTRIES):
+        self.ttls = MARKET_DATA_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "requests": 0, "evictions": 0}
+
+    def get_many(self, kind: str, symbols: list, fetch, params: tuple = ()):
+        """Return {symbol: value} for symbols, fetching misses in one call.
+
+        fetch(missing_symbols) must return a mapping of symbol -> value, or
+        None on failure. Returns None only if nothing could be served.
+        """
+        ttl = self.ttls.get(kind, 0)
+        result = {}
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                key = (kind, params, symbol)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    result[symbol] = entry[1]
+                    self._stats["hits"] += 1
+                else:
+                    missing.append(symbol)
+                    self._stats["misses"] += 1
+
+        if missing:
+            fetched = fetch(missing)
+            with self._lock:
+                self._stats["requests"] += 1
+            if fetched is None:
+                return result or None
+            for symbol in missing:
+                try:
+                    value = fetched[symbol]
+                except (KeyError, TypeError):
+                    continue
+                result[symbol] = value
+                if ttl > 0:
+                    self._put((kind, params, symbol), value, ttl)
+        return result
+
+    def _put(self, key: tuple, value, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Counters: hits, misses, requests, evictions, size, hit_rate."""
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "hit_rate": round(self._stats["hits"] / total, 3) if total else 0.0,
+            }
+
+
+_market_data_cache = MarketDataCache()
+
+
+def get_market_data_cache_stats() -> dict:
+    """Return hit/miss/request counters for the process-wide market data cache."""
+    return _market_data_cache.stats()
+
 
 def get_trading_client(account_id: str) -> TradingClient:
     """Create a TradingClient for the specified account."""
@@ -31,6 +154,16 @@ def get_trading_client(account_id: str) -> TradingClient:
     )
 
 
+def get_trading_stream(account_id: str) -> TradingStream:
+    """Create a TradingStream (websocket order/trade updates) for the account."""
+    creds = ALPACA_ACCOUNTS[account_id]
+    return TradingStream(
+        api_key=creds["key"],
+        secret_key=creds["secret"],
+        paper=TRADING_MODE == "paper",
+    )
+
+
 def get_data_client(account_id: str) -> StockHistoricalDataClient:
     """Create a StockHistoricalDataClient for market data."""
     creds = ALPACA_ACCOUNTS[account_id]
@@ -40,6 +173,16 @@ def get_data_client(account_id: str) -> StockHistoricalDataClient:
     )
 
 
+def get_data_stream(account_id: str, feed: str = "iex") -> StockDataStream:
+    """Create a StockDataStream (websocket bars/quotes) for market data."""
+    creds = ALPACA_ACCOUNTS[account_id]
+    return StockDataStream(
+        api_key=creds["key"],
+        secret_key=creds["secret"],
+        feed=DataFeed(feed),
+    )
+
+
 def get_screener_client(account_id: str) -> ScreenerClient:
     """Create a ScreenerClient for market movers data."""
     creds = ALPACA_ACCOUNTS[account_id]
@@ -52,22 +195,35 @@ def get_screener_client(account_id: str) -> ScreenerClient:
 class AlpacaClient:
     """Unified Alpaca client for a specific account."""
 
-    def __init__(self, account_id: str):
+    def __init__(self, account_id: str, use_cache: bool = True):
         self.account_id = account_id
-        self.trading = get_trading_client(account_id)
-        self.data = get_data_client(account_id)
+        # Every REST call draws from the credential's shared buckets, so
+        # accounts on the same key (and concurrent processes) pace together
+        key = ALPACA_ACCOUNTS[account_id]["key"]
+        self._data_limiter = limiter_for("alpaca", "data", key)
+        self.trading = ThrottledClient(
+            get_trading_client(account_id), limiter_for("alpaca", "trading", key)
+        )
+        self.data = ThrottledClient(get_data_client(account_id), self._data_limiter)
         self._screener = None  # lazy init
+        self.market_data = _market_data_cache if use_cache else MarketDataCache(ttls={})
 
     def get_account(self):
         """Get account information."""
         return self.trading.get_account()
 
-    def get_positions(self) -> list:
-        """Get all open positions."""
+    def get_positions(self, raise_errors: bool = False) -> list:
+        """Get all open positions.
+
+        On failure returns [] (logged), or re-raises with raise_errors so
+        callers can tell an empty book from an unknown one.
+        """
         try:
             return self.trading.get_all_positions()
         except Exception as e:
             logger.error(f"Failed to get positions for {self.account_id}: {e}")
+            if raise_errors:
+                raise
             return []
 
     def get_position(self, symbol: str):
@@ -98,30 +254,76 @@ class AlpacaClient:
             logger.error(f"Failed to get order {order_id}: {e}")
             return None
 
+    def get_open_orders(self, symbols: list = None) -> list:
+        """Get open (unfilled) orders, bracket legs listed individually."""
+        try:
+            params = {"status": QueryOrderStatus.OPEN}
+            if symbols:
+                params["symbols"] = symbols
+            return self.trading.get_orders(filter=GetOrdersRequest(**params))
+        except Exception as e:
+            logger.error(f"Failed to get open orders for {self.account_id}: {e}")
+            return []
+
+    def get_orders_since(self, after, limit: int = 500) -> list:
+        """All orders (any status) submitted after the given time, newest first."""
+        try:
+            return self.trading.get_orders(filter=GetOrdersRequest(
+                status=QueryOrderStatus.ALL, after=after, limit=limit,
+            ))
+        except Exception as e:
+            logger.error(f"Failed to get orders for {self.account_id}: {e}")
+            return []
+
+    def get_exit_fill(self, symbol: str, entry_side: str, since: str = None):
+        """Most recent filled order that closed (part of) a position opened on entry_side."""
+        exit_side = OrderSide.SELL if entry_side.lower() == "buy" else OrderSide.BUY
+        try:
+            params = {
+                "status": QueryOrderStatus.CLOSED,
+                "symbols": [symbol],
+                "side": exit_side,
+                "limit": 20,
+            }
+            if since:
+                params["after"] = since
+            for order in self.trading.get_orders(filter=GetOrdersRequest(**params)):
+                if order.filled_avg_price is not None and order.filled_at is not None:
+                    return order
+            return None
+        except Exception as e:
+            logger.error(f"Failed to get exit fill for {symbol}: {e}")
+            return None
+
     def submit_market_order(
         self,
         symbol: str,
         side: str,
         notional: float = None,
         qty: float = None,
+        whole_shares: bool = False,
     ) -> Optional[object]:
-        """Submit a market order by notional amount or quantity."""
+        """Submit a market order by notional amount or quantity.
+
+        whole_shares converts notional to an integer qty (needed if the
+        position will later carry a trailing stop).
+        """
         try:
             order_side = OrderSide.BUY if side.lower() == "buy" else OrderSide.SELL
 
             # Alpaca doesn't support notional short sells — convert to qty
-            if notional is not None and side.lower() == "sell":
+            if notional is not None and (side.lower() == "sell" or whole_shares):
                 try:
                     quotes = self.get_latest_quotes([symbol])
                     price = float(quotes[symbol].ask_price or quotes[symbol].bid_price)
                     qty = int(notional / price)
                     if qty < 1:
-                        logger.warning(f"Short sell qty < 1 for {symbol} (${notional}/{price}), skipping")
+                        logger.warning(f"Whole-share qty < 1 for {side} {symbol} (${notional}/{price}), skipping")
                         return None
-                    logger.info(f"Converted ${notional:.0f} to {qty} shares for short sell {symbol} @ ${price:.2f}")
+                    logger.info(f"Converted ${notional:.0f} to {qty} shares for {side} {symbol} @ ${price:.2f}")
                     notional = None
                 except Exception as e:
-                    logger.error(f"Cannot convert notional to qty for short {symbol}: {e}")
+                    logger.error(f"Cannot convert notional to qty for {side} {symbol}: {e}")
                     return None
 
             params = {
@@ -182,9 +384,160 @@ class AlpacaClient:
             logger.error(f"Failed to submit limit order {side} {symbol}: {e}")
             return None
 
-    def close_position(self, symbol: str) -> Optional[object]:
-        """Close an entire position."""
+    def submit_bracket_order(
+        self,
+        symbol: str,
+        side: str,
+        notional: float,
+        stop_price: float = None,
+        target_price: float = None,
+        ref_price: float = None,
+        time_in_force: str = "day",
+    ) -> Optional[object]:
+        """Market entry with server-side exit legs.
+
+        Both prices give a bracket (stop and target are OCO); one gives an
+        OTO with that leg only. Alpaca requires whole shares here, so
+        notional is converted at ref_price (or the latest quote). Returns
+        None if the order can't be placed: qty < 1, a leg on the wrong side
+        of the price, or a rejection. Callers fall back to a market order.
+        """
+        try:
+            is_buy = side.lower() == "buy"
+            if not ref_price:
+                quotes = self.get_latest_quotes([symbol])
+                quote = quotes[symbol]
+                ref_price = float((quote.ask_price if is_buy else quote.bid_price)
+                                  or quote.ask_price or quote.bid_price)
+            qty = int(notional / ref_price)
+            if qty < 1:
+                logger.info(f"Bracket qty < 1 for {symbol} (${notional:.0f}/{ref_price}), skipping")
+                return None
+
+            legs = {}
+            if stop_price:
+                if (stop_price >= ref_price) if is_buy else (stop_price <= ref_price):
+                    logger.warning(f"Stop {stop_price} on wrong side of {ref_price} for {side} {symbol}")
+                    return None
+                legs["stop_loss"] = StopLossRequest(stop_price=round(stop_price, 2))
+            if target_price:
+                if (target_price <= ref_price) if is_buy else (target_price >= ref_price):
+                    logger.warning(f"Target {target_price} on wrong side of {ref_price} for {side} {symbol}")
+                    return None
+                legs["take_profit"] = TakeProfitRequest(limit_price=round(target_price, 2))
+            if not legs:
+                return None
+
+            order = MarketOrderRequest(
+                symbol=symbol,
+                qty=qty,
+                side=OrderSide.BUY if is_buy else OrderSide.SELL,
+                time_in_force=TimeInForce(time_in_force),
+                order_class=OrderClass.BRACKET if len(legs) == 2 else OrderClass.OTO,
+                **legs,
+            )
+            result = self.trading.submit_order(order_data=order)
+            logger.info(
+                f"Bracket order submitted: {side} {symbol} {qty} shares "
+                f"stop={stop_price} target={target_price} order_id={result.id}"
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Failed to submit bracket order {side} {symbol}: {e}")
+            return None
+
+    def submit_trailing_stop_order(
+        self,
+        symbol: str,
+        side: str,
+        qty: float,
+        trail_price: float = None,
+        trail_percent: float = None,
+        time_in_force: str = "day",
+    ) -> Optional[object]:
+        """Submit a native trailing stop (side is the exit side). Whole shares only."""
+        try:
+            params = {
+                "symbol": symbol,
+                "qty": qty,
+                "side": OrderSide.BUY if side.lower() == "buy" else OrderSide.SELL,
+                "time_in_force": TimeInForce(time_in_force),
+            }
+            if trail_price is not None:
+                params["trail_price"] = round(trail_price, 2)
+            else:
+                params["trail_percent"] = trail_percent
+            result = self.trading.submit_order(order_data=TrailingStopOrderRequest(**params))
+            logger.info(
+                f"Trailing stop submitted: {side} {symbol} {qty} shares "
+                f"trail={trail_price or str(trail_percent) + '%'} order_id={result.id}"
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Failed to submit trailing stop {side} {symbol}: {e}")
+            return None
+
+    def replace_stop_price(self, order_id: str, stop_price: float) -> Optional[object]:
+        """Move an open stop order (e.g. a bracket's stop leg) to a new price."""
         try:
+            return self.trading.replace_order_by_id(
+                order_id, ReplaceOrderRequest(stop_price=round(stop_price, 2))
+            )
+        except Exception as e:
+            logger.error(f"Failed to replace stop on order {order_id}: {e}")
+            return None
+
+    def cancel_orders_for(self, symbol: str) -> list:
+        """Cancel every open order for symbol (e.g. exit legs before a manual close).
+
+        Returns the ids of the orders a cancel was requested for.
+        """
+        cancelled = []
+        for order in self.get_open_orders(symbols=[symbol]):
+            try:
+                self.trading.cancel_order_by_id(order.id)
+                cancelled.append(str(order.id))
+            except Exception as e:
+                logger.warning(f"Failed to cancel order {order.id} for {symbol}: {e}")
+        return cancelled
+
+    def wait_until_final(self, order_ids: list, timeout: float = None) -> bool:
+        """Poll until every order reaches a final status; False on timeout.
+
+        Cancels are asynchronous (pending_cancel first), and the shares an
+        exit leg holds are only released once it is final.
+        """
+        if timeout is None:
+            timeout = CANCEL_SETTLE_TIMEOUT
+        pending = list(order_ids)
+        deadline = time.monotonic() + timeout
+        while True:
+            still_open = []
+            for order_id in pending:
+                order = self.get_order(order_id)
+                if order is None or order_status(order.status) not in FINAL_ORDER_STATUSES:
+                    still_open.append(order_id)
+            pending = still_open
+            if not pending:
+                return True
+            if time.monotonic() >= deadline:
+                logger.error(f"Orders still open after {timeout:.0f}s: {pending}")
+                return False
+            time.sleep(CANCEL_POLL_INTERVAL)
+
+    def close_position(self, symbol: str, cancel_orders: bool = False) -> Optional[object]:
+        """Close an entire position.
+
+        With cancel_orders, open orders for the symbol (exit legs holding
+        the shares) are cancelled first and the close waits for them to
+        settle. None if they do not settle or the close fails.
+        """
+        try:
+            if cancel_orders:
+                cancelled = self.cancel_orders_for(symbol)
+                if cancelled and not self.wait_until_final(cancelled):
+                    logger.error(f"Not closing {symbol}: exit legs did not cancel")
+                    return None
             result = self.trading.close_position(symbol)
             logger.info(f"Closed position: {symbol}")
             return result
@@ -214,41 +567,60 @@ class AlpacaClient:
 
     def get_bars(self, symbols: list, timeframe: TimeFrame,
                  start: str = None, end: str = None, limit: int = 100):
-        """Get historical bars for given symbols."""
-        try:
-            params = {
-                "symbol_or_symbols": symbols,
-                "timeframe": timeframe,
-            }
-            if start:
-                params["start"] = start
-            if end:
-                params["end"] = end
-            if limit:
-                params["limit"] = limit
-            request = StockBarsRequest(**params)
-            return self.data.get_stock_bars(request)
-        except Exception as e:
-            logger.error(f"Failed to get bars: {e}")
-            return None
+        """Get historical bars for given symbols.
+
+        Returns {symbol: [Bar, ...]} (None on failure). Served from the
+        market data cache; daily bars are cached for a day, intraday bars
+        briefly.
+        """
+        kind = "bars_day" if timeframe.unit in (
+            TimeFrameUnit.Day, TimeFrameUnit.Week, TimeFrameUnit.Month
+        ) else "bars"
+
+        def fetch(missing):
+            try:
+                params = {
+                    "symbol_or_symbols": missing,
+                    "timeframe": timeframe,
+                }
+                if start:
+                    params["start"] = start
+                if end:
+                    params["end"] = end
+                if limit:
+                    params["limit"] = limit
+                request = StockBarsRequest(**params)
+                return self.data.get_stock_bars(request).data
+            except Exception as e:
+                logger.error(f"Failed to get bars: {e}")
+                return None
+
+        params = (str(timeframe), str(start), str(end), limit)
+        return self.market_data.get_many(kind, symbols, fetch, params)
 
     def get_snapshots(self, symbols: list):
-        """Get latest snapshots for symbols."""
-        try:
-            request = StockSnapshotRequest(symbol_or_symbols=symbols)
-            return self.data.get_stock_snapshot(request)
-        except Exception as e:
-            logger.error(f"Failed to get snapshots: {e}")
-            return None
+        """Get latest snapshots for symbols (via the market data cache)."""
+        def fetch(missing):
+            try:
+                request = StockSnapshotRequest(symbol_or_symbols=missing)
+                return self.data.get_stock_snapshot(request)
+            except Exception as e:
+                logger.error(f"Failed to get snapshots: {e}")
+                return None
+
+        return self.market_data.get_many("snapshot", symbols, fetch)
 
     def get_latest_quotes(self, symbols: list):
-        """Get latest quotes for symbols."""
-        try:
-            request = StockLatestQuoteRequest(symbol_or_symbols=symbols)
-            return self.data.get_stock_latest_quote(request)
-        except Exception as e:
-            logger.error(f"Failed to get latest quotes: {e}")
-            return None
+        """Get latest quotes for symbols (via the market data cache)."""
+        def fetch(missing):
+            try:
+                request = StockLatestQuoteRequest(symbol_or_symbols=missing)
+                return self.data.get_stock_latest_quote(request)
+            except Exception as e:
+                logger.error(f"Failed to get latest quotes: {e}")
+                return None
+
+        return self.market_data.get_many("quote", symbols, fetch)
 
     def get_screener_movers(self, top: int = 20) -> dict:
         """Get most active stocks and top gainers/losers from Alpaca Screener.
@@ -258,7 +630,9 @@ class AlpacaClient:
         """
         try:
             if self._screener is None:
-                self._screener = get_screener_client(self.account_id)
+                self._screener = ThrottledClient(
+                    get_screener_client(self.account_id), self._data_limiter
+                )
 
             result = {"most_actives": [], "gainers": [], "losers": []}
 
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.shared.config import CLAUDE_RESPONSE_CACHE
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Canonical form of prompt text for cache keys (whitespace runs collapsed)."""
+    return _WHITESPACE.sub(" ", (text or "").strip())
+
+
+def price_bucket(price, tolerance_pct: float = None) -> Optional[int]:
+    """Index of the log-spaced price band holding price, for structured cache keys.
+
+    Bands are tolerance_pct wide relative to the price, so quotes that
+    differ by less than that usually share a key. The tolerance should sit
+    well below stop distances. None for a missing or non-positive price.
+    """
+    if tolerance_pct is None:
+        tolerance_pct = CLAUDE_RESPONSE_CACHE["price_tolerance_pct"]
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return None
+    if price <= 0:
+        return None
+    return round(math.log(price) / math.log1p(tolerance_pct / 100))
+
+
+def response_key(model_id: str, analysis_type: str, system_prompt: str,
+                 inputs, options: dict = None) -> str:
+    """sha256 over (model, analysis type, system prompt, inputs, options).
+
+    inputs is anything JSON-serializable: the prompt texts (normalized by
+    the client) or a caller-built structured key.
+    """
+    canonical = json.dumps(
+        [model_id, analysis_type, normalize(system_prompt), inputs, options or {}],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ClaudeResponseCache:
+    """Persistent cache of Claude response texts keyed by response_key().
+
+    Entries are SQLite rows (key, analysis type, text, stored time, hit
+    count). Freshness is decided per lookup, since the TTL belongs to the
+    analysis type. put() trims the oldest entries past max_entries, which
+    keeps the file bounded. The client may be shared across threads, so
+    one connection is used under a lock. Failures are logged and treated
+    as a miss.
+    """
+
+    def __init__(self, path: str, max_entries: int = 2000):
+        self.path = path
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, analysis_type TEXT NOT NULL, "
+            "response TEXT NOT NULL, stored_at REAL NOT NULL, "
+            "hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)"
+        )
+
+    def get(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """The cached response text if stored within ttl_seconds, else None."""
+        try:
+            with self._lock, self.conn:
+                row = self.conn.execute(
+                    "SELECT response FROM responses WHERE key = ? AND stored_at >= ?",
+                    (key, time.time() - ttl_seconds),
+                ).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE responses SET hits = hits + 1 WHERE key = ?", (key,)
+                    )
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Claude response cache read failed: {e}")
+            return None
+
+    def put(self, key: str, analysis_type: str, response: str) -> None:
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, analysis_type, response, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, analysis_type, response, time.time()),
+                )
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Claude response cache write failed: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_cache_lock = threading.Lock()
+_cache = None
+
+
+def get_response_cache() -> Optional[ClaudeResponseCache]:
+    """The process-wide response cache, opened on first use (None if disabled or unusable)."""
+    global _cache
+    if not CLAUDE_RESPONSE_CACHE["enabled"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ClaudeResponseCache(
+                    CLAUDE_RESPONSE_CACHE["path"], CLAUDE_RESPONSE_CACHE["max_entries"],
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Claude response cache unavailable: {e}")
+                CLAUDE_RESPONSE_CACHE["enabled"] = False
+                return None
+        return _cache
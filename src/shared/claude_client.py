@@ -1,15 +1,22 @@
 import json
 import logging
 import re
+import threading
 from typing import Optional
 
 import anthropic
 
-from src.shared.config import ANTHROPIC_API_KEY, CLAUDE_MODELS
-from src.shared.database import Database
+from src.shared.claude_cache import get_response_cache, normalize, response_key
+from src.shared.config import (
+    ANTHROPIC_API_KEY, CLAUDE_MODELS, CLAUDE_PROMPT_CACHING, CLAUDE_RESPONSE_CACHE,
+)
+from src.shared.rate_limiter import limiter_for
+from src.shared.write_behind import enqueue_insert
 
 logger = logging.getLogger(__name__)
 
+CACHE_BREAKPOINT = {"type": "ephemeral"}
+
 
 class ClaudeClient:
     """Wrapper around Anthropic SDK with model-aware methods.
@@ -18,12 +25,20 @@ class ClaudeClient:
     - analyze():          Standard analysis (Sonnet default, optional extended thinking)
     - quick_decision():   Fast yes/no (Haiku, no thinking)
     - strategic_review(): Deep strategic analysis (Opus with adaptive thinking)
+
+    Analysis types with a TTL in CLAUDE_RESPONSE_CACHE are answered from the
+    local response cache when the same request was made within the TTL.
     """
 
     def __init__(self, account_id: str = None):
         self.client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
         self.account_id = account_id
-        self.db = Database()
+        self.limiter = limiter_for("anthropic", "messages", ANTHROPIC_API_KEY)
+        # Running token totals for this client (callers may share it across threads)
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0,
+                      "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0,
+                      "response_cache_hits": 0}
+        self._usage_lock = threading.Lock()
 
     def _parse_json(self, text: str) -> Optional[dict]:
         """Extract JSON from response text, handling markdown code blocks."""
@@ -62,19 +77,114 @@ class ClaudeClient:
                 result_text += block.text
         return result_text
 
+    @staticmethod
+    def _usage_counts(usage) -> dict:
+        """Token counts from a response's usage, cache fields defaulting to 0."""
+        return {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        }
+
+    def _record_usage(self, counts: dict) -> None:
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            for key, value in counts.items():
+                self.usage[key] += value
+
+    @staticmethod
+    def _total_tokens(counts: dict) -> int:
+        """All tokens a call processed: uncached input, cache reads/writes and output.
+
+        With prompt caching, input_tokens excludes the cached prefix, so it
+        is added back to keep totals comparable with uncached calls.
+        """
+        return (counts["input_tokens"] + counts["cache_read_input_tokens"]
+                + counts["cache_creation_input_tokens"] + counts["output_tokens"])
+
+    def tokens_used(self) -> int:
+        """Total tokens (incl. cached input) across every call made through this client."""
+        with self._usage_lock:
+            return self._total_tokens(self.usage)
+
     def _log(self, model_id: str, analysis_type: str, prompt_summary: str,
-             response_text: str, tokens_used: int):
-        """Log API call to database."""
-        self.db.log_analysis({
+             response_text: str, tokens_used: int, usage: dict = None,
+             cache_hit: bool = False):
+        """Log API call to claude_analyses via the background writer (non-blocking).
+
+        usage (per-field token counts, incl. prompt cache reads/writes) is
+        kept alongside the text in full_response; answers served from the
+        response cache are flagged with cache_hit.
+        """
+        full_response = {"text": response_text}
+        if usage:
+            full_response["usage"] = usage
+        if cache_hit:
+            full_response["cache_hit"] = True
+        enqueue_insert("claude_analyses", {
             "account_id": self.account_id,
             "analysis_type": analysis_type,
             "prompt_summary": prompt_summary[:500],
             "response_summary": response_text[:500],
-            "full_response": {"text": response_text},
+            "full_response": full_response,
             "tokens_used": tokens_used,
             "model": model_id,
         })
 
+    def _cached_response(self, model_id: str, analysis_type: str, system_prompt: str,
+                         prompts: list, options: dict, cache_inputs=None) -> tuple:
+        """(cache key, cached response text) for this request.
+
+        The key covers cache_inputs when given, else the exact prompt texts
+        (whitespace-normalized). The key is None when analysis_type isn't
+        cached; the text is None on a miss.
+        """
+        ttl_minutes = CLAUDE_RESPONSE_CACHE["ttl_minutes"].get(analysis_type)
+        cache = get_response_cache() if ttl_minutes else None
+        if cache is None:
+            return None, None
+        if cache_inputs is None:
+            cache_inputs = [normalize(text) for text in prompts if text]
+        key = response_key(model_id, analysis_type, system_prompt, cache_inputs, options)
+        return key, cache.get(key, ttl_minutes * 60)
+
+    def _cache_response(self, key: Optional[str], analysis_type: str, response_text: str) -> None:
+        cache = get_response_cache() if key else None
+        if cache is not None:
+            cache.put(key, analysis_type, response_text)
+
+    def _from_cache(self, model_id: str, analysis_type: str, prompt_summary: str,
+                    response_text: str, expect_json: bool) -> Optional[dict]:
+        """Serve a cached response: logged as a hit, no tokens spent."""
+        with self._usage_lock:
+            self.usage["response_cache_hits"] += 1
+        logger.debug(f"Claude response cache hit ({analysis_type})")
+        self._log(model_id, analysis_type, prompt_summary, response_text, 0, cache_hit=True)
+        if expect_json:
+            return self._parse_json(response_text)
+        return {"text": response_text, "tokens_used": 0}
+
+    @staticmethod
+    def _prompt(system_prompt: str, user_prompt: str, cached_context: str = None) -> tuple:
+        """(system, messages) with the stable prefix first and cache-marked.
+
+        The system prompt and cached_context (account-level context shared
+        by many calls) lead the request and each end a cache breakpoint;
+        the per-call user_prompt follows uncached.
+        """
+        if not CLAUDE_PROMPT_CACHING:
+            content = f"{cached_context}\n\n{user_prompt}" if cached_context else user_prompt
+            return system_prompt, [{"role": "user", "content": content}]
+        system = [{"type": "text", "text": system_prompt, "cache_control": CACHE_BREAKPOINT}]
+        content = user_prompt
+        if cached_context:
+            content = [
+                {"type": "text", "text": cached_context, "cache_control": CACHE_BREAKPOINT},
+                {"type": "text", "text": user_prompt},
+            ]
+        return system, [{"role": "user", "content": content}]
+
     def analyze(
         self,
         system_prompt: str,
@@ -85,41 +195,64 @@ class ClaudeClient:
         max_tokens: int = 4096,
         thinking: bool = False,
         thinking_budget: int = 4096,
+        cached_context: str = None,
+        cache_inputs=None,
     ) -> Optional[dict]:
         """Standard analysis. Defaults to Sonnet without thinking.
 
         Set thinking=True to enable extended thinking (budget_tokens) on Sonnet/Haiku.
+        cached_context is context shared across calls (learnings, scorecard,
+        ...); it is sent ahead of user_prompt as a cacheable prefix.
+        cache_inputs optionally replaces the prompt text in the response
+        cache key with a structured key (e.g. setup fields with prices
+        bucketed), for prompts carrying values that drift between calls.
         """
         import time as _time
 
         model_id = CLAUDE_MODELS[model]
+        use_thinking = thinking and model != "opus"
+        cache_key, cached = self._cached_response(
+            model_id, analysis_type, system_prompt, [cached_context, user_prompt],
+            {"max_tokens": max_tokens, "thinking_budget": thinking_budget if use_thinking else None},
+            cache_inputs,
+        )
+        if cached is not None:
+            return self._from_cache(model_id, analysis_type, user_prompt, cached, expect_json)
+
+        system, messages = self._prompt(system_prompt, user_prompt, cached_context)
         max_retries = 2
         for attempt in range(max_retries + 1):
             try:
                 params = {
                     "model": model_id,
                     "max_tokens": max_tokens,
-                    "system": system_prompt,
-                    "messages": [{"role": "user", "content": user_prompt}],
+                    "system": system,
+                    "messages": messages,
                 }
-                if thinking and model != "opus":
+                if use_thinking:
                     params["thinking"] = {"type": "enabled", "budget_tokens": thinking_budget}
                     # API requires max_tokens > budget_tokens
                     if params["max_tokens"] <= thinking_budget:
                         params["max_tokens"] = thinking_budget + max_tokens
 
+                self.limiter.acquire()
                 message = self.client.messages.create(**params)
 
                 response_text = self._extract_text(message)
-                tokens_used = message.usage.input_tokens + message.usage.output_tokens
-                self._log(model_id, analysis_type, user_prompt, response_text, tokens_used)
+                usage = self._usage_counts(message.usage)
+                tokens_used = self._total_tokens(usage)
+                self._record_usage(usage)
+                self._log(model_id, analysis_type, user_prompt, response_text, tokens_used, usage)
 
                 if expect_json:
                     parsed = self._parse_json(response_text)
                     if parsed is None:
                         logger.error("Failed to parse JSON from Claude response")
+                    else:
+                        self._cache_response(cache_key, analysis_type, response_text)
                     return parsed
                 else:
+                    self._cache_response(cache_key, analysis_type, response_text)
                     return {"text": response_text, "tokens_used": tokens_used}
 
             except anthropic.APIStatusError as e:
@@ -142,6 +275,8 @@ class ClaudeClient:
                         expect_json=expect_json,
                         max_tokens=max_tokens,
                         thinking=False,
+                        cached_context=cached_context,
+                        cache_inputs=cache_inputs,
                     )
                 logger.error(f"Claude API call failed ({model_id}): {e}")
                 return None
@@ -149,8 +284,12 @@ class ClaudeClient:
                 logger.error(f"Claude API call failed ({model_id}): {e}")
                 return None
 
-    def quick_decision(self, context: str, model: str = "haiku") -> Optional[dict]:
-        """Fast yes/no trade decision. Haiku, no thinking. Returns parsed JSON."""
+    def quick_decision(self, context: str, model: str = "haiku",
+                       cache_inputs=None) -> Optional[dict]:
+        """Fast yes/no trade decision. Haiku, no thinking. Returns parsed JSON.
+
+        cache_inputs: structured response-cache key (see analyze()).
+        """
         system = (
             "You are a trading decision assistant. Respond with ONLY a JSON object: "
             '{"decision": "yes" or "no", "confidence": 0-100, "reason": "brief reason"}'
@@ -161,6 +300,7 @@ class ClaudeClient:
             model=model,
             analysis_type="quick_decision",
             max_tokens=256,
+            cache_inputs=cache_inputs,
         )
 
     def strategic_review(
@@ -172,14 +312,24 @@ class ClaudeClient:
         analysis_type: str = "strategic_review",
         expect_json: bool = True,
         max_tokens: int = 32000,
+        cached_context: str = None,
     ) -> Optional[dict]:
         """Deep strategic analysis. Opus 4.6 with adaptive thinking.
 
         Effort levels: 'low', 'medium', 'high' (default), 'max'
+        cached_context is sent ahead of user_prompt as a cacheable prefix.
         """
         import time
 
         model_id = CLAUDE_MODELS[model]
+        cache_key, cached = self._cached_response(
+            model_id, analysis_type, system_prompt, [cached_context, user_prompt],
+            {"max_tokens": max_tokens, "effort": effort},
+        )
+        if cached is not None:
+            return self._from_cache(model_id, analysis_type, user_prompt, cached, expect_json)
+
+        system, messages = self._prompt(system_prompt, user_prompt, cached_context)
         max_retries = 3
 
         for attempt in range(max_retries):
@@ -189,24 +339,30 @@ class ClaudeClient:
                     "max_tokens": max_tokens,
                     "thinking": {"type": "adaptive"},
                     "output_config": {"effort": effort},
-                    "system": system_prompt,
-                    "messages": [{"role": "user", "content": user_prompt}],
+                    "system": system,
+                    "messages": messages,
                 }
 
                 # Use streaming for Opus to avoid timeout on long-running requests
+                self.limiter.acquire()
                 with self.client.messages.stream(**params) as stream:
                     message = stream.get_final_message()
 
                 response_text = self._extract_text(message)
-                tokens_used = message.usage.input_tokens + message.usage.output_tokens
-                self._log(model_id, analysis_type, user_prompt, response_text, tokens_used)
+                usage = self._usage_counts(message.usage)
+                tokens_used = self._total_tokens(usage)
+                self._record_usage(usage)
+                self._log(model_id, analysis_type, user_prompt, response_text, tokens_used, usage)
 
                 if expect_json:
                     parsed = self._parse_json(response_text)
                     if parsed is None:
                         logger.error("Failed to parse JSON from strategic review response")
+                    else:
+                        self._cache_response(cache_key, analysis_type, response_text)
                     return parsed
                 else:
+                    self._cache_response(cache_key, analysis_type, response_text)
                     return {"text": response_text, "tokens_used": tokens_used}
 
             except anthropic.APIStatusError as e:
@@ -226,6 +382,7 @@ class ClaudeClient:
                         max_tokens=min(max_tokens, 8192),
                         thinking=True,
                         thinking_budget=4096,
+                        cached_context=cached_context,
                     )
                 logger.error(f"Strategic review API call failed ({model_id}): {e}")
                 return None
@@ -42,6 +42,38 @@ CLAUDE_MODELS = {
     "opus": "claude-opus-4-6",
 }
 CLAUDE_MODEL = CLAUDE_MODELS["sonnet"]  # Default for backward compat
+# Mark system prompts and stable context blocks with cache_control so
+# repeated calls reuse the cached prefix (prefixes under the model's
+# minimum cacheable length are simply not cached)
+CLAUDE_PROMPT_CACHING = os.getenv("CLAUDE_PROMPT_CACHING", "true").lower() == "true"
+
+# Local cache of whole Claude responses (SQLite). Only analysis types with
+# a TTL here are cached; a repeated call with the same model, system prompt
+# and inputs inside the TTL is answered without an API call. Inputs are the
+# prompt text, or a structured key supplied by the caller (cache_inputs)
+CLAUDE_RESPONSE_CACHE = {
+    "enabled": os.getenv("CLAUDE_RESPONSE_CACHE", "true").lower() == "true",
+    "path": os.getenv("CLAUDE_RESPONSE_CACHE_PATH", ".cache/claude/responses.sqlite"),
+    "max_entries": 2000,
+    "price_tolerance_pct": 0.1,  # price band width in structured keys (well under stop widths)
+    "ttl_minutes": {
+        "quick_decision": 10,       # day trader setup checks, repeated every cycle
+        "setup_batch": 10,          # the same, batched per cycle
+        "signal_evaluation": 240,   # Account 1 re-scoring an unchanged signal set
+    },
+}
+
+# API rate limits: "<service>.<endpoint class>" -> (requests/sec, burst).
+# Buckets are per credential; processes on one host share them via lock
+# files in RATE_LIMIT_DIR unless RATE_LIMIT_SHARED is off.
+RATE_LIMITS = {
+    "alpaca.trading": (3.0, 10),      # 200/min per key
+    "alpaca.data": (3.0, 10),
+    "quiver.api": (1.0, 1),
+    "anthropic.messages": (0.8, 4),   # 50 RPM tier
+}
+RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED", "true").lower() == "true"
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR", "")
 
 # Gmail
 GMAIL_ADDRESS = os.getenv("GMAIL_ADDRESS", "")
@@ -1,24 +1,414 @@
+import atexit
+import copy
+import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import date, datetime
 from typing import Any, Optional
 
-from supabase import create_client, Client
+import httpx
+from supabase import create_client, Client, ClientOptions
 
 from src.shared.config import SUPABASE_URL, SUPABASE_KEY
 
 logger = logging.getLogger(__name__)
 
+# HTTP pool shared by every Database in the process (keep-alive, bounded)
+DB_POOL_MAX_CONNECTIONS = 10
+DB_POOL_MAX_KEEPALIVE = 5
+DB_POOL_KEEPALIVE_EXPIRY = 60.0
+DB_REQUEST_TIMEOUT = 120.0
+
+# --- Client registry ---
+#
+# One Supabase client (and one pooled httpx session underneath it) per
+# process. Every Database() shares it, so a 2-minute intraday cycle that
+# builds a RiskManager, Scanner, executor, etc. reuses the same TLS
+# connections instead of opening a fresh client per object.
+
+_registry_lock = threading.Lock()
+_shared_client: Optional[Client] = None
+_http_client: Optional[httpx.Client] = None
+_registry_stats = {
+    "clients_created": 0,
+    "clients_closed": 0,
+    "handles_issued": 0,
+    "requests_sent": 0,
+}
+
+
+def _count_request(request: httpx.Request) -> None:
+    """httpx event hook: count requests sent over the shared pool."""
+    _registry_stats["requests_sent"] += 1
+
+
+def _create_client() -> Client:
+    """Build a Supabase client backed by a keep-alive connection pool."""
+    global _http_client
+    _http_client = httpx.Client(
+        timeout=DB_REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=DB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=DB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=DB_POOL_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks={"request": [_count_request]},
+    )
+    client = create_client(
+        SUPABASE_URL, SUPABASE_KEY,
+        options=ClientOptions(httpx_client=_http_client),
+    )
+    _registry_stats["clients_created"] += 1
+    logger.info("Created shared Supabase client")
+    return client
+
 
 def get_db() -> Client:
-    """Create and return a Supabase client."""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    """Return the process-wide Supabase client, creating it on first use.
+
+    Thread-safe: concurrent first callers block on the registry lock and
+    all receive the same client.
+    """
+    global _shared_client
+    client = _shared_client
+    if client is None:
+        with _registry_lock:
+            if _shared_client is None:
+                _shared_client = _create_client()
+            client = _shared_client
+    _registry_stats["handles_issued"] += 1
+    return client
+
+
+def close_db() -> None:
+    """Close the shared client and its connection pool.
+
+    Safe to call more than once. The next get_db() call creates a new
+    client. Registered with atexit so pooled connections are released
+    when a workflow run ends.
+    """
+    global _shared_client, _http_client
+    with _registry_lock:
+        if _shared_client is None:
+            return
+        try:
+            if _http_client is not None:
+                _http_client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close Supabase connection pool: {e}")
+        _shared_client = None
+        _http_client = None
+        _registry_stats["clients_closed"] += 1
+        logger.info(
+            f"Closed shared Supabase client ({get_db_stats()}, "
+            f"cache={_query_cache.stats()})"
+        )
+
+
+def get_db_stats() -> dict:
+    """Return registry counters: clients created/closed, handles, requests."""
+    return dict(_registry_stats)
+
+
+atexit.register(close_db)
+
+
+# --- Read-through query cache ---
+
+# Seconds a cached read stays fresh, per table. Tables not listed are never cached.
+CACHE_TTLS = {
+    "adaptive_config": 300,
+    "signal_scorecard": 600,
+    "strategy_learnings": 600,
+    "signal_weights": 600,
+    "trade_outcomes": 60,
+}
+CACHE_MAX_ENTRIES = 256
+
+_MISS = object()
+
+
+class QueryCache:
+    """Bounded LRU cache of query results with per-table TTLs.
+
+    Keys are (table, *query args). Writes through Database invalidate
+    every cached entry for the written table, so a process always sees
+    its own writes. Returned values are deep copies, so callers may
+    mutate them freely.
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: tuple):
+        """Return the cached value for key, or _MISS if absent or expired."""
+        table = key[0]
+        if table not in self.ttls:
+            return _MISS
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return _MISS
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def put(self, key: tuple, value):
+        """Store value under key (if its table is cacheable) and return it."""
+        ttl = self.ttls.get(key[0])
+        if not ttl:
+            return value
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, table: str) -> None:
+        """Drop every cached entry for a table."""
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == table]
+            for k in stale:
+                del self._entries[k]
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction/invalidation counters and current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups * 100, 1) if lookups else 0.0
+        return stats
+
+
+_query_cache = QueryCache()
+
+
+def get_cache_stats() -> dict:
+    """Return stats for the process-wide query cache."""
+    return _query_cache.stats()
+
+
+# --- Trade outcome aggregation ---
+
+OUTCOME_GROUP_COLUMNS = {
+    "strategy": ("strategy",),
+    "source": ("signal_source", "strategy"),  # coalesce, as in the scorecard
+}
+OUTCOME_AGGREGATE_COLUMNS = (
+    "symbol,strategy,signal_source,realized_pnl,pnl_pct,holding_period_hours"
+)
+
+# None until the trade_outcome_aggregates RPC has been tried once; False
+# only once the database reported the function missing
+_aggregate_rpc_available: Optional[bool] = None
+
+# PostgREST "function not found in schema cache", Postgres "undefined
+# function", and a plain 404 from the RPC endpoint
+_MISSING_FUNCTION_CODES = ("PGRST202", "42883", "404")
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """True if an RPC error means the function doesn't exist (vs. a transient failure)."""
+    code = str(getattr(error, "code", "") or "")
+    return code in _MISSING_FUNCTION_CODES or "PGRST202" in str(error)
+
+
+def _empty_outcome_stats() -> dict:
+    return {
+        "trades": 0, "wins": 0, "losses": 0, "flat": 0,
+        "total_pnl": 0.0, "gross_profit": 0.0, "gross_loss": 0.0,
+        "pnl_pct_sum": 0.0, "holding_hours_sum": 0.0, "holding_count": 0,
+        "best_trade": None, "worst_trade": None,
+    }
+
+
+def _outcome_group_key(row: dict, group_by: Optional[str]) -> str:
+    if group_by is None:
+        return "all"
+    for col in OUTCOME_GROUP_COLUMNS[group_by]:
+        if row.get(col):
+            return row[col]
+    return "unknown"
+
+
+def aggregate_outcomes(rows, group_by: str = None) -> dict:
+    """Aggregate trade_outcomes rows in Python.
+
+    Mirrors the trade_outcome_aggregates RPC (sql/trade_outcome_aggregates.sql)
+    and is used when the RPC is unavailable. Accepts any iterable of rows,
+    so it runs in constant memory over a streamed source.
+
+    Returns {group_key: stats}; the key is "all" when group_by is None.
+    Wins are pnl > 0, losses pnl < 0 and flat pnl == 0.
+    """
+    groups = {}
+    for row in rows:
+        key = _outcome_group_key(row, group_by)
+        stats = groups.get(key)
+        if stats is None:
+            stats = groups[key] = _empty_outcome_stats()
+
+        pnl = float(row.get("realized_pnl", 0) or 0)
+        pnl_pct = float(row.get("pnl_pct", 0) or 0)
+        stats["trades"] += 1
+        stats["total_pnl"] += pnl
+        stats["pnl_pct_sum"] += pnl_pct
+        if pnl > 0:
+            stats["wins"] += 1
+            stats["gross_profit"] += pnl
+        elif pnl < 0:
+            stats["losses"] += 1
+            stats["gross_loss"] += -pnl
+        else:
+            stats["flat"] += 1
+
+        hours = float(row.get("holding_period_hours", 0) or 0)
+        if hours:
+            stats["holding_hours_sum"] += hours
+            stats["holding_count"] += 1
+
+        trade = {
+            "symbol": row.get("symbol"),
+            "pnl": pnl,
+            "pnl_pct": pnl_pct,
+            "strategy": row.get("strategy"),
+        }
+        if stats["best_trade"] is None or pnl > stats["best_trade"]["pnl"]:
+            stats["best_trade"] = trade
+        if stats["worst_trade"] is None or pnl < stats["worst_trade"]["pnl"]:
+            stats["worst_trade"] = trade
+
+    return {key: _finalize_outcome_stats(stats) for key, stats in groups.items()}
+
+
+def _finalize_outcome_stats(stats: dict) -> dict:
+    """Coerce numeric fields and add derived averages."""
+    out = _empty_outcome_stats()
+    for field in ("trades", "wins", "losses", "flat", "holding_count"):
+        out[field] = int(stats.get(field) or 0)
+    for field in ("total_pnl", "gross_profit", "gross_loss",
+                  "pnl_pct_sum", "holding_hours_sum"):
+        out[field] = float(stats.get(field) or 0)
+    for field in ("best_trade", "worst_trade"):
+        trade = stats.get(field)
+        if trade:
+            out[field] = {
+                "symbol": trade.get("symbol"),
+                "pnl": float(trade.get("pnl") or 0),
+                "pnl_pct": float(trade.get("pnl_pct") or 0),
+                "strategy": trade.get("strategy"),
+            }
+
+    trades = out["trades"]
+    out["win_rate"] = round(out["wins"] / trades * 100, 1) if trades else 0
+    out["avg_win"] = out["gross_profit"] / out["wins"] if out["wins"] else 0.0
+    out["avg_loss"] = -out["gross_loss"] / out["losses"] if out["losses"] else 0.0
+    out["avg_pnl_pct"] = out["pnl_pct_sum"] / trades if trades else 0.0
+    out["avg_holding_hours"] = (
+        out["holding_hours_sum"] / out["holding_count"] if out["holding_count"] else 0.0
+    )
+    return out
+
+
+# Trade statuses before the entry order is confirmed filled (raw enum
+# strings included: rows store str(order.status) at submission)
+UNFILLED_TRADE_STATUSES = [
+    "submitted", "partially_filled", "pending_new", "accepted", "new",
+    "OrderStatus.PENDING_NEW", "OrderStatus.ACCEPTED", "OrderStatus.NEW",
+    "OrderStatus.PARTIALLY_FILLED",
+]
+
+
+# --- Keyset pagination ---
+
+KEYSET_PAGE_SIZE = 1000
+KEYSET_COLUMNS = ("created_at", "id")
+
+
+def _keyset_select(columns: str) -> str:
+    """Projection for a keyset scan; the cursor columns are always included."""
+    if columns.strip() == "*":
+        return "*"
+    cols = [c.strip() for c in columns.split(",") if c.strip()]
+    cols += [c for c in KEYSET_COLUMNS if c not in cols]
+    return ",".join(cols)
+
+
+def _keyset_after(created_at: str, row_id) -> str:
+    """PostgREST or-filter for rows strictly after (created_at, id)."""
+    return f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})'
 
 
 class Database:
-    """Wrapper around Supabase client with helper methods for common queries."""
+    """Wrapper around Supabase client with helper methods for common queries.
 
-    def __init__(self):
+    All instances share the process-wide client from get_db() and the
+    process-wide read-through QueryCache (pass use_cache=False to bypass it).
+    """
+
+    def __init__(self, use_cache: bool = True):
         self.client = get_db()
+        self.cache = _query_cache if use_cache else QueryCache(ttls={})
+        self._pending_signal_updates = {}
+
+    def _iter_keyset(self, table: str, columns: str = "*",
+                     page_size: int = KEYSET_PAGE_SIZE, eq: dict = None,
+                     gte: dict = None, raise_errors: bool = False):
+        """Yield rows of table oldest-first, one page per request.
+
+        Pages by a (created_at, id) cursor rather than offset, so each page is
+        an index range scan and rows inserted mid-scan are neither skipped nor
+        repeated. Only one page is held in memory at a time. Not cached.
+
+        A failed page is logged and ends the scan, unless raise_errors is set.
+        """
+        select = _keyset_select(columns)
+        cursor = None
+        fetched = 0
+        while True:
+            try:
+                q = self.client.table(table).select(select)
+                for col, value in (eq or {}).items():
+                    q = q.eq(col, value)
+                for col, value in (gte or {}).items():
+                    if value is not None:
+                        q = q.gte(col, value)
+                if cursor is not None:
+                    q = q.or_(_keyset_after(*cursor))
+                resp = (
+                    q.order("created_at").order("id")
+                    .limit(page_size)
+                    .execute()
+                )
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.error(f"Failed to page {table} after {fetched} rows: {e}")
+                return
+            rows = resp.data or []
+            yield from rows
+            fetched += len(rows)
+            if len(rows) < page_size:
+                return
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
 
     # --- Signals ---
 
@@ -73,6 +463,126 @@ class Database:
             logger.error(f"Failed to batch fetch signal keys: {e}")
             return set()
 
+    def get_signal_keys_by_source(self, account_id: str,
+                                  since_hours: int = 24) -> Optional[dict]:
+        """Existing (symbol, signal_type) pairs for every source in one scan.
+
+        Pages through the account's signals in the window once and splits
+        them into {source: set}, replacing one get_existing_signal_keys call
+        per source. Returns None if the scan fails, so callers can fall back.
+        """
+        from datetime import timedelta, timezone
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=since_hours)).isoformat()
+        keys = {}
+        try:
+            for row in self._iter_keyset(
+                "signals", "source,symbol,signal_type", eq={"account_id": account_id},
+                gte={"created_at": cutoff}, raise_errors=True,
+            ):
+                keys.setdefault(row["source"], set()).add((row["symbol"], row["signal_type"]))
+        except Exception as e:
+            logger.error(f"Failed to prefetch signal keys: {e}")
+            return None
+        return keys
+
+    def update_signals_batch(self, updates: list, defer: bool = False,
+                             batch_size: int = 500) -> int:
+        """Apply [(signal_id, fields), ...] to the signals table in bulk.
+
+        When every update carries the same fields they go out as one
+        update(...).in_("id", ids) call per batch. Mixed fields (e.g. a
+        per-symbol confidence and composite_score) are merged onto the
+        current rows and written with one upsert per batch, so the cost
+        doesn't grow with the number of distinct payloads. Later fields for
+        the same id are merged over earlier ones.
+
+        With defer=True the updates are only queued on this Database and are
+        written by the next flush_signal_updates() (write-behind).
+
+        Returns the number of signals written (0 when deferred).
+        """
+        for signal_id, fields in updates:
+            self._pending_signal_updates.setdefault(signal_id, {}).update(fields)
+        if defer:
+            return 0
+        return self.flush_signal_updates(batch_size)
+
+    def flush_signal_updates(self, batch_size: int = 500) -> int:
+        """Write all queued signal updates. Returns the number of signals written."""
+        pending, self._pending_signal_updates = self._pending_signal_updates, {}
+        if not pending:
+            return 0
+
+        groups = {}
+        for signal_id, fields in pending.items():
+            payload_key = json.dumps(fields, sort_keys=True, default=str)
+            groups.setdefault(payload_key, (fields, []))[1].append(signal_id)
+
+        written = 0
+        ids = list(pending)
+        for i in range(0, len(ids), batch_size):
+            batch = ids[i:i + batch_size]
+            if len(groups) == 1:
+                written += self._update_signal_ids(next(iter(groups.values()))[0], batch)
+            else:
+                written += self._upsert_signal_updates({sid: pending[sid] for sid in batch})
+        logger.info(
+            f"Flushed {written}/{len(pending)} signal updates "
+            f"({len(groups)} distinct payload(s))"
+        )
+        return written
+
+    def _update_signal_ids(self, fields: dict, ids: list) -> int:
+        try:
+            self.client.table("signals").update(fields).in_("id", ids).execute()
+            return len(ids)
+        except Exception as e:
+            logger.error(f"Failed to update signal batch ({len(ids)} signals): {e}")
+            return 0
+
+    def _upsert_signal_updates(self, updates: dict) -> int:
+        """Merge {id: fields} onto the stored rows and upsert them in one call.
+
+        Upserted rows must be complete (NOT NULL columns), hence the read.
+        If the read fails, falls back to one update call per distinct payload.
+        """
+        try:
+            resp = (
+                self.client.table("signals").select("*")
+                .in_("id", list(updates)).execute()
+            )
+            rows = [{**row, **updates[row["id"]]} for row in resp.data or []
+                    if row.get("id") in updates]
+        except Exception as e:
+            logger.warning(f"Failed to read signals for bulk update, updating per payload: {e}")
+            groups = {}
+            for signal_id, fields in updates.items():
+                payload_key = json.dumps(fields, sort_keys=True, default=str)
+                groups.setdefault(payload_key, (fields, []))[1].append(signal_id)
+            return sum(self._update_signal_ids(fields, ids) for fields, ids in groups.values())
+
+        if not rows:
+            return 0
+        try:
+            self.client.table("signals").upsert(rows).execute()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Failed to update signal batch ({len(rows)} signals): {e}")
+            return 0
+
+    def iter_signals(self, account_id: str, columns: str = "*",
+                     page_size: int = KEYSET_PAGE_SIZE, source: str = None,
+                     since: str = None):
+        """Stream an account's signals oldest-first (see _iter_keyset).
+
+        since filters on created_at.
+        """
+        eq = {"account_id": account_id}
+        if source:
+            eq["source"] = source
+        return self._iter_keyset("signals", columns, page_size, eq=eq,
+                                 gte={"created_at": since})
+
     def insert_signals_batch(self, signals: list, batch_size: int = 500) -> list:
         """Insert signals in batches. Returns list of saved rows with IDs."""
         saved = []
@@ -171,6 +681,44 @@ class Database:
             logger.error(f"Failed to update trade {trade_id}: {e}")
             return None
 
+    def update_trades_batch(self, rows: list, batch_size: int = 500) -> int:
+        """Write back full trades rows (as read or inserted) in bulk, keyed on id.
+
+        Rows must be complete: they are upserted, so a partial row would
+        violate the table's NOT NULL columns. Returns the number written.
+        """
+        written = 0
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            try:
+                self.client.table("trades").upsert(batch).execute()
+                written += len(batch)
+            except Exception as e:
+                logger.error(f"Failed to update trade batch ({len(batch)} trades): {e}")
+        return written
+
+    def get_unfilled_trades(self, account_id: str, ids: list = None, since: str = None) -> list:
+        """Trades whose entry order has not been confirmed filled yet.
+
+        Optionally only ids, or only rows created at or after since.
+        """
+        try:
+            query = (
+                self.client.table("trades")
+                .select("*")
+                .eq("account_id", account_id)
+                .in_("status", UNFILLED_TRADE_STATUSES)
+            )
+            if ids is not None:
+                query = query.in_("id", ids)
+            if since:
+                query = query.gte("created_at", since)
+            resp = query.execute()
+            return resp.data
+        except Exception as e:
+            logger.error(f"Failed to get unfilled trades: {e}")
+            return []
+
     def get_open_trades(self, account_id: str) -> list:
         try:
             resp = (
@@ -211,8 +759,14 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to insert trade outcome: {e}")
             return None
+        finally:
+            self.cache.invalidate("trade_outcomes")
 
     def get_trade_outcomes(self, account_id: str, limit: int = 50, since: str = None) -> list:
+        key = ("trade_outcomes", account_id, limit, since)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             q = (
                 self.client.table("trade_outcomes")
@@ -222,12 +776,26 @@ class Database:
             if since:
                 q = q.gte("exit_date", since)
             resp = q.order("created_at", desc=True).limit(limit).execute()
-            return resp.data
+            return self.cache.put(key, resp.data)
         except Exception as e:
             logger.error(f"Failed to get trade outcomes: {e}")
             return []
 
+    def iter_trade_outcomes(self, account_id: str, columns: str = "*",
+                            page_size: int = KEYSET_PAGE_SIZE, since: str = None):
+        """Stream an account's trade outcomes oldest-first (see _iter_keyset).
+
+        since filters on exit_date, as in get_trade_outcomes.
+        """
+        return self._iter_keyset("trade_outcomes", columns, page_size,
+                                 eq={"account_id": account_id},
+                                 gte={"exit_date": since})
+
     def get_outcomes_by_strategy(self, account_id: str, strategy: str, limit: int = 50) -> list:
+        key = ("trade_outcomes", account_id, "strategy", strategy, limit)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             resp = (
                 self.client.table("trade_outcomes")
@@ -238,14 +806,79 @@ class Database:
                 .limit(limit)
                 .execute()
             )
-            return resp.data
+            return self.cache.put(key, resp.data)
         except Exception as e:
             logger.error(f"Failed to get outcomes by strategy: {e}")
             return []
 
+    def get_outcome_aggregates(self, account_id: str, group_by: str = None,
+                               since: str = None) -> dict:
+        """Aggregate realized P&L server-side, one small response per call.
+
+        group_by: None (whole account), "strategy", or "source"
+        (signal_source falling back to strategy). since filters on exit_date.
+
+        Returns {group_key: stats} with trades, wins, losses, flat, total_pnl,
+        gross_profit, gross_loss, pnl_pct_sum, holding_hours_sum,
+        holding_count, best_trade, worst_trade and derived win_rate,
+        avg_win, avg_loss, avg_pnl_pct, avg_holding_hours.
+
+        Uses the trade_outcome_aggregates RPC when the database has it,
+        otherwise aggregates the rows locally.
+        """
+        global _aggregate_rpc_available
+        if group_by is not None and group_by not in OUTCOME_GROUP_COLUMNS:
+            raise ValueError(f"Unknown outcome grouping: {group_by}")
+
+        key = ("trade_outcomes", account_id, "aggregate", group_by, since)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
+
+        if _aggregate_rpc_available is not False:
+            try:
+                resp = self.client.rpc("trade_outcome_aggregates", {
+                    "p_account_id": account_id,
+                    "p_group_by": group_by,
+                    "p_since": since,
+                }).execute()
+                _aggregate_rpc_available = True
+                result = {
+                    row["group_key"]: _finalize_outcome_stats(row)
+                    for row in (resp.data or [])
+                }
+                return self.cache.put(key, result)
+            except Exception as e:
+                if _is_missing_function(e):
+                    logger.info(f"trade_outcome_aggregates RPC unavailable, aggregating locally: {e}")
+                    _aggregate_rpc_available = False
+                else:
+                    # Transient: aggregate locally this time, retry the RPC next call
+                    logger.warning(f"trade_outcome_aggregates RPC failed, aggregating locally: {e}")
+
+        rows = self._iter_keyset(
+            "trade_outcomes", OUTCOME_AGGREGATE_COLUMNS,
+            eq={"account_id": account_id}, gte={"exit_date": since},
+            raise_errors=True,
+        )
+        try:
+            return self.cache.put(key, aggregate_outcomes(rows, group_by))
+        except Exception as e:
+            logger.error(f"Failed to aggregate trade outcomes: {e}")
+            return {}
+
+    def get_outcome_summary(self, account_id: str, since: str = None) -> dict:
+        """Account-wide outcome aggregate (see get_outcome_aggregates)."""
+        groups = self.get_outcome_aggregates(account_id, since=since)
+        return groups.get("all") or _finalize_outcome_stats({})
+
     # --- Learnings ---
 
     def get_learnings(self, account_id: str, active_only: bool = True) -> list:
+        key = ("strategy_learnings", account_id, active_only)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             q = (
                 self.client.table("strategy_learnings")
@@ -255,7 +888,7 @@ class Database:
             if active_only:
                 q = q.eq("is_active", True)
             resp = q.order("created_at", desc=True).execute()
-            return resp.data
+            return self.cache.put(key, resp.data)
         except Exception as e:
             logger.error(f"Failed to get learnings: {e}")
             return []
@@ -267,6 +900,8 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to insert learning: {e}")
             return None
+        finally:
+            self.cache.invalidate("strategy_learnings")
 
     def deactivate_learning(self, learning_id: int) -> None:
         try:
@@ -275,10 +910,16 @@ class Database:
             ).eq("id", learning_id).execute()
         except Exception as e:
             logger.error(f"Failed to deactivate learning {learning_id}: {e}")
+        finally:
+            self.cache.invalidate("strategy_learnings")
 
     # --- Signal Scorecard ---
 
     def get_scorecard(self, account_id: str, signal_source: str = None) -> list:
+        key = ("signal_scorecard", account_id, signal_source)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             q = (
                 self.client.table("signal_scorecard")
@@ -288,7 +929,7 @@ class Database:
             if signal_source:
                 q = q.eq("signal_source", signal_source)
             resp = q.execute()
-            return resp.data
+            return self.cache.put(key, resp.data)
         except Exception as e:
             logger.error(f"Failed to get scorecard: {e}")
             return []
@@ -304,6 +945,8 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to upsert scorecard: {e}")
             return None
+        finally:
+            self.cache.invalidate("signal_scorecard")
 
     # --- Portfolio Snapshots ---
 
@@ -334,6 +977,17 @@ class Database:
             logger.error(f"Failed to get snapshots: {e}")
             return []
 
+    def iter_snapshots(self, account_id: str, columns: str = "*",
+                       page_size: int = KEYSET_PAGE_SIZE, since: str = None):
+        """Stream an account's portfolio snapshots oldest-first (see _iter_keyset).
+
+        since filters on snapshot_date. Snapshots are upserted once per day,
+        so created_at order is snapshot_date order.
+        """
+        return self._iter_keyset("portfolio_snapshots", columns, page_size,
+                                 eq={"account_id": account_id},
+                                 gte={"snapshot_date": since})
+
     def get_latest_snapshot(self, account_id: str, before_date: str = None) -> Optional[dict]:
         try:
             q = (
@@ -400,6 +1054,10 @@ class Database:
 
     def get_adaptive_config(self, account_id: str, parameter: str = None,
                             strategy: str = None) -> list:
+        key = ("adaptive_config", account_id, parameter, strategy)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             q = (
                 self.client.table("adaptive_config")
@@ -411,7 +1069,7 @@ class Database:
             if strategy:
                 q = q.eq("strategy", strategy)
             resp = q.execute()
-            return resp.data
+            return self.cache.put(key, resp.data)
         except Exception as e:
             logger.error(f"Failed to get adaptive config: {e}")
             return []
@@ -427,11 +1085,17 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to upsert adaptive config: {e}")
             return None
+        finally:
+            self.cache.invalidate("adaptive_config")
 
     # --- Signal Weights ---
 
     def get_signal_weights(self, account_id: str) -> dict:
         """Return signal weights as {source: weight} dict."""
+        key = ("signal_weights", account_id)
+        cached = self.cache.get(key)
+        if cached is not _MISS:
+            return cached
         try:
             resp = (
                 self.client.table("signal_weights")
@@ -439,7 +1103,9 @@ class Database:
                 .eq("account_id", account_id)
                 .execute()
             )
-            return {row["signal_source"]: row["weight"] for row in resp.data}
+            return self.cache.put(
+                key, {row["signal_source"]: row["weight"] for row in resp.data}
+            )
         except Exception as e:
             logger.error(f"Failed to get signal weights: {e}")
             return {}
@@ -455,6 +1121,8 @@ class Database:
         except Exception as e:
             logger.error(f"Failed to upsert signal weight: {e}")
             return None
+        finally:
+            self.cache.invalidate("signal_weights")
 
     # --- Pies ---
 
@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.shared.alpaca_client import FINAL_ORDER_STATUSES, get_trading_stream, order_status
+
+logger = logging.getLogger(__name__)
+
+FILL_POLL_ATTEMPTS = 3       # batch polls per reconcile() while orders are pending
+FILL_POLL_INTERVAL = 1.0     # seconds between those polls
+FILL_BACKFILL_DAYS = 3       # unfilled rows older than this are not picked up from the DB
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+
+
+class FillReconciler:
+    """Syncs trades rows with broker fills off the order-submission path.
+
+    Executors track() each inserted trade row right after submitting and
+    call reconcile() once per cycle. Order states come from trade-update
+    events when the stream is running, otherwise from one batch order poll
+    covering every pending order; changed rows are written back in a single
+    bulk upsert. Orders the poll does not return are fetched by id once and
+    dropped if the broker does not know them. Trades a recent run left
+    unfilled are picked up from the DB on the first reconcile().
+    """
+
+    def __init__(self, alpaca, db, account_id: str, stream: bool = False,
+                 poll_attempts: int = FILL_POLL_ATTEMPTS,
+                 poll_interval: float = FILL_POLL_INTERVAL):
+        self.alpaca = alpaca
+        self.db = db
+        self.account_id = account_id
+        self.poll_attempts = poll_attempts
+        self.poll_interval = poll_interval
+        self._pending = {}  # alpaca order id -> trades row
+        self._fetched = set()  # ids already looked up individually (outside the poll window)
+        self._loaded_db = False
+        self._events = {}   # alpaca order id -> latest order from the stream
+        self._events_lock = threading.Lock()
+        self._stream = None
+        if stream:
+            self.start_stream()
+
+    def track(self, trade: dict) -> None:
+        """Register a freshly inserted trades row for fill syncing."""
+        if trade and trade.get("alpaca_order_id"):
+            self._pending[str(trade["alpaca_order_id"])] = trade
+
+    def start_stream(self) -> None:
+        """Consume trade-update events in a daemon thread (polling stays the fallback)."""
+        if self._stream is not None:
+            return
+        try:
+            self._stream = get_trading_stream(self.account_id)
+            self._stream.subscribe_trade_updates(self._on_trade_update)
+            threading.Thread(
+                target=self._stream.run, name="trade-updates", daemon=True
+            ).start()
+        except Exception as e:
+            logger.warning(f"Trade update stream unavailable, polling only: {e}")
+            self._stream = None
+
+    async def _on_trade_update(self, data):
+        with self._events_lock:
+            self._events[str(data.order.id)] = data.order
+
+    def _drain_events(self) -> dict:
+        with self._events_lock:
+            events, self._events = self._events, {}
+        return events
+
+    def _poll(self) -> dict:
+        """One get_orders call covering the pending orders, keyed by id.
+
+        Orders already fetched individually are left out of the window.
+        """
+        times = [_parse_time(t.get("created_at")) for order_id, t in self._pending.items()
+                 if order_id not in self._fetched]
+        times = [t for t in times if t is not None]
+        after = min(times) - timedelta(minutes=1) if times else None
+        return {str(o.id): o for o in self.alpaca.get_orders_since(after)}
+
+    def _fetch_missing(self, orders: dict) -> None:
+        """Look up pending orders the poll did not return, once each.
+
+        Adds the ones found to orders; stops tracking those the broker
+        does not know.
+        """
+        for order_id in list(self._pending):
+            if order_id in orders or order_id in self._fetched:
+                continue
+            self._fetched.add(order_id)
+            order = self.alpaca.get_order(order_id)
+            if order is None:
+                trade = self._pending.pop(order_id)
+                logger.warning(
+                    f"Order {order_id} for {trade['symbol']} not found at the broker; "
+                    f"no longer syncing its fill"
+                )
+            else:
+                orders[order_id] = order
+
+    def reconcile(self, wait: bool = True) -> list:
+        """Apply fills to pending trades and write them back in bulk.
+
+        With wait, polls up to poll_attempts times while orders the poll
+        returned are still open; without, a single pass. Returns the trades
+        rows updated.
+        """
+        if not self._loaded_db:
+            since = (datetime.now(timezone.utc) - timedelta(days=FILL_BACKFILL_DAYS)).isoformat()
+            for trade in self.db.get_unfilled_trades(self.account_id, since=since):
+                self._pending.setdefault(str(trade.get("alpaca_order_id")), trade)
+            self._pending.pop("None", None)
+            self._loaded_db = True
+
+        updated = []
+        for attempt in range(self.poll_attempts):
+            if not self._pending:
+                break
+            orders = self._drain_events()
+            if any(order_id not in orders and order_id not in self._fetched
+                   for order_id in self._pending):
+                orders = {**self._poll(), **orders}
+            self._fetch_missing(orders)
+
+            still_open = False
+            for order_id in list(self._pending):
+                order = orders.get(order_id)
+                if order is None:
+                    continue
+                if order_status(order.status) not in FINAL_ORDER_STATUSES:
+                    # Waiting only helps orders the poll or stream can report
+                    still_open = still_open or order_id not in self._fetched
+                    continue
+                updated.append(self._apply(self._pending.pop(order_id), order))
+
+            if not wait or attempt == self.poll_attempts - 1 or not still_open:
+                break
+            time.sleep(self.poll_interval)
+
+        if updated:
+            # Rows may have moved on since they were tracked (e.g. closed);
+            # only write fills onto rows that are still unfilled
+            current = {
+                row["id"]: row for row in self.db.get_unfilled_trades(
+                    self.account_id, ids=[t["id"] for t in updated]
+                )
+            }
+            updated = [
+                {**current[t["id"]], **{k: t[k] for k in ("status", "fill_price", "filled_at") if k in t}}
+                for t in updated if t["id"] in current
+            ]
+            written = self.db.update_trades_batch(updated)
+            logger.info(
+                f"Fill sync: {written}/{len(updated)} trades updated, "
+                f"{len(self._pending)} still pending"
+            )
+        return updated
+
+    @staticmethod
+    def _apply(trade: dict, order) -> dict:
+        status = order_status(order.status)
+        row = dict(trade)
+        # A cancelled or expired order can still have filled in part
+        if status == "filled" or (order.filled_avg_price is not None
+                                  and float(order.filled_qty or 0) > 0):
+            row.update({
+                "status": "filled",
+                "fill_price": float(order.filled_avg_price),
+                "filled_at": str(order.filled_at),
+            })
+            logger.info(f"Order filled: {trade['symbol']} @ ${float(order.filled_avg_price):.2f}")
+        else:
+            row["status"] = status
+            logger.warning(f"Order for {trade['symbol']} ended {status} without a fill")
+        return row
@@ -83,10 +83,9 @@ class PortfolioTracker:
 
     def get_performance_metrics(self) -> dict:
         """Calculate comprehensive performance metrics."""
-        outcomes = self.db.get_trade_outcomes(self.account_id, limit=10000)
-        snapshots = self.db.get_snapshots(self.account_id, limit=365)
+        summary = self.db.get_outcome_summary(self.account_id)
 
-        if not outcomes:
+        if not summary["trades"]:
             return {
                 "total_trades": 0,
                 "win_rate": 0,
@@ -98,55 +97,47 @@ class PortfolioTracker:
                 "avg_loss": 0,
             }
 
-        # Win/loss stats
-        wins = [o for o in outcomes if float(o.get("realized_pnl", 0) or 0) > 0]
-        losses = [o for o in outcomes if float(o.get("realized_pnl", 0) or 0) < 0]
-        total_trades = len(outcomes)
-        win_rate = len(wins) / total_trades * 100 if total_trades > 0 else 0
+        # Win/loss stats (aggregated server-side)
+        total_trades = summary["trades"]
+        wins = summary["wins"]
+        losses = summary["losses"]
+        win_rate = wins / total_trades * 100 if total_trades > 0 else 0
 
-        total_pnl = sum(float(o.get("realized_pnl", 0) or 0) for o in outcomes)
-        avg_win = (
-            np.mean([float(o["realized_pnl"]) for o in wins]) if wins else 0
-        )
-        avg_loss = (
-            np.mean([float(o["realized_pnl"]) for o in losses]) if losses else 0
-        )
+        total_pnl = summary["total_pnl"]
+        avg_win = summary["avg_win"]
+        avg_loss = summary["avg_loss"]
 
         # Profit factor
-        gross_profit = sum(float(o["realized_pnl"]) for o in wins)
-        gross_loss = abs(sum(float(o["realized_pnl"]) for o in losses))
+        gross_profit = summary["gross_profit"]
+        gross_loss = summary["gross_loss"]
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else float("inf")
 
-        # Sharpe ratio from daily snapshots
+        # Sharpe ratio and max drawdown over the full snapshot history,
+        # streamed oldest-first (one float per day is kept for the returns)
         sharpe_ratio = 0.0
         max_drawdown = 0.0
-        if len(snapshots) >= 2:
-            equities = [float(s["equity"]) for s in reversed(snapshots)]
-            daily_returns = []
-            for i in range(1, len(equities)):
-                ret = (equities[i] - equities[i - 1]) / equities[i - 1]
-                daily_returns.append(ret)
-
-            if daily_returns:
-                mean_ret = np.mean(daily_returns)
-                std_ret = np.std(daily_returns)
-                sharpe_ratio = (
-                    (mean_ret / std_ret) * np.sqrt(252) if std_ret > 0 else 0
-                )
-
-            # Max drawdown
-            peak = equities[0]
-            for eq in equities:
-                if eq > peak:
-                    peak = eq
-                drawdown = (peak - eq) / peak * 100
-                if drawdown > max_drawdown:
-                    max_drawdown = drawdown
+        daily_returns = []
+        prev = peak = None
+        for snap in self.db.iter_snapshots(self.account_id, columns="equity"):
+            eq = float(snap["equity"])
+            if prev:
+                daily_returns.append((eq - prev) / prev)
+            prev = eq
+            peak = eq if peak is None else max(peak, eq)
+            if peak > 0:
+                max_drawdown = max(max_drawdown, (peak - eq) / peak * 100)
+
+        if daily_returns:
+            mean_ret = np.mean(daily_returns)
+            std_ret = np.std(daily_returns)
+            sharpe_ratio = (
+                (mean_ret / std_ret) * np.sqrt(252) if std_ret > 0 else 0
+            )
 
         return {
             "total_trades": total_trades,
-            "wins": len(wins),
-            "losses": len(losses),
+            "wins": wins,
+            "losses": losses,
             "win_rate": round(win_rate, 1),
             "total_pnl": round(total_pnl, 2),
             "avg_win": round(avg_win, 2),
@@ -0,0 +1,116 @@
+"""Helpers for executors that leave stops and targets to the broker.
+
+With ORDER_MODE = "bracket", entries carry server-side exit legs (or get a
+native trailing stop later), so the executors' position checks become
+reconcilers: they skip positions the broker is protecting, ratchet
+trailing stops, and record outcomes for positions the broker closed.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+STOP_ORDER_TYPES = ("stop", "stop_limit", "trailing_stop")
+
+
+def _value(enum_or_str) -> str:
+    return str(getattr(enum_or_str, "value", enum_or_str) or "").lower()
+
+
+def exit_orders(open_orders: list, symbol: str, entry_side: str) -> list:
+    """Open orders for symbol on the closing side of a position opened on entry_side."""
+    exit_side = "sell" if entry_side.lower() == "buy" else "buy"
+    return [
+        o for o in open_orders
+        if o.symbol == symbol and _value(o.side) == exit_side
+    ]
+
+
+def stop_order(orders: list):
+    """The stop (or trailing stop) among a position's exit orders, or None."""
+    for order in orders:
+        if _value(getattr(order, "order_type", None) or getattr(order, "type", None)) in STOP_ORDER_TYPES:
+            return order
+    return None
+
+
+def stop_price_for_pnl(entry_price: float, entry_side: str, pnl_pct: float) -> float:
+    """Price at which a position opened at entry_price shows pnl_pct unrealized P&L."""
+    if entry_side.lower() == "buy":
+        return entry_price * (1 + pnl_pct / 100)
+    return entry_price * (1 - pnl_pct / 100)
+
+
+def is_tighter(entry_side: str, new_stop: float, current_stop: float) -> bool:
+    """True if new_stop locks in more than current_stop (stops only ever tighten)."""
+    if entry_side.lower() == "buy":
+        return new_stop > current_stop
+    return new_stop < current_stop
+
+
+def _exit_reason(order) -> str:
+    order_type = _value(getattr(order, "order_type", None) or getattr(order, "type", None))
+    if order_type == "trailing_stop":
+        return "trailing_stop"
+    if order_type in ("stop", "stop_limit"):
+        return "stop_loss"
+    if order_type == "limit":
+        return "target_hit"
+    return "broker_exit"
+
+
+def record_broker_exit(alpaca, db, account_id: str, trade: dict, strategy: str) -> dict:
+    """Close out a trade whose position the broker already exited.
+
+    Looks up the filling exit order placed after the trade was opened and
+    records the outcome from the actual fill prices. Returns the outcome,
+    or None if no exit fill exists yet (e.g. the entry is still pending).
+    """
+    symbol = trade["symbol"]
+    side = trade.get("side", "buy")
+    exit_order = alpaca.get_exit_fill(symbol, side, since=trade.get("created_at"))
+    if not exit_order:
+        return None
+
+    entry_price = trade.get("fill_price")
+    if not entry_price and trade.get("alpaca_order_id"):
+        entry_order = alpaca.get_order(trade["alpaca_order_id"])
+        if entry_order and entry_order.filled_avg_price is not None:
+            entry_price = entry_order.filled_avg_price
+    if not entry_price:
+        logger.warning(f"No entry fill for broker-closed {symbol}; cannot record outcome")
+        return None
+
+    entry_price = float(entry_price)
+    exit_price = float(exit_order.filled_avg_price)
+    qty = float(exit_order.filled_qty or 0)
+    direction = 1 if side.lower() == "buy" else -1
+    realized_pnl = (exit_price - entry_price) * qty * direction
+    pnl_pct = (exit_price / entry_price - 1) * 100 * direction
+    exit_reason = _exit_reason(exit_order)
+
+    db.update_trade(trade["id"], {
+        "status": "closed",
+        "fill_price": exit_price,
+        "filled_at": str(exit_order.filled_at),
+    })
+    outcome = {
+        "trade_id": trade["id"],
+        "account_id": account_id,
+        "symbol": symbol,
+        "strategy": strategy,
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "entry_date": trade.get("created_at"),
+        "exit_date": str(exit_order.filled_at),
+        "realized_pnl": round(realized_pnl, 2),
+        "pnl_pct": round(pnl_pct, 2),
+        "outcome": "win" if realized_pnl > 0 else "loss",
+        "exit_reason": exit_reason,
+    }
+    db.insert_trade_outcome(outcome)
+
+    logger.info(
+        f"Broker closed {symbol}: P&L=${realized_pnl:.2f} ({pnl_pct:.2f}%), "
+        f"reason={exit_reason}"
+    )
+    return outcome
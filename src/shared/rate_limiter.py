@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: shared limiters degrade to per-process
+    fcntl = None
+
+from src.shared.config import RATE_LIMITS, RATE_LIMIT_DIR, RATE_LIMIT_SHARED
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe token bucket.
+
+    Allows bursts of up to capacity requests, refilling at rate tokens per
+    second. acquire() blocks until a token is available, so threads sharing
+    one limiter collectively stay under the rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, tokens: float) -> float:
+        """Take tokens if available (returns 0), else return the seconds to wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping until they are available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self._take(tokens)
+            if delay <= 0:
+                with self._lock:
+                    self._stats["acquired"] += 1
+                    if waited:
+                        self._stats["throttled"] += 1
+                        self._stats["wait_seconds"] += waited
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "wait_seconds": round(self._stats["wait_seconds"], 3)}
+
+
+class SharedRateLimiter(RateLimiter):
+    """Token bucket whose state lives in a file, shared by every process on the host.
+
+    The bucket (tokens, last refill wall time) is read and rewritten under
+    an exclusive flock, so processes using the same credentials draw from
+    one budget. Falls back to the in-process bucket if the file can't be
+    used.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, path: str = None):
+        super().__init__(rate, capacity)
+        self.path = path
+        self._file_ok = fcntl is not None
+
+    def _take(self, tokens: float) -> float:
+        if not self._file_ok:
+            return super()._take(tokens)
+        try:
+            with self._lock, open(self.path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    state = json.loads(raw) if raw.strip() else {}
+                    now = time.time()
+                    available = min(
+                        self.capacity,
+                        state.get("tokens", self.capacity)
+                        + max(0.0, now - state.get("updated", now)) * self.rate,
+                    )
+                    delay = 0.0
+                    if available >= tokens:
+                        available -= tokens
+                    else:
+                        delay = (tokens - available) / self.rate
+                    f.seek(0)
+                    f.truncate()
+                    json.dump({"tokens": available, "updated": now}, f)
+                    f.flush()
+                    return delay
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Shared rate limit file {self.path} unusable, limiting per process: {e}")
+            self._file_ok = False
+            return super()._take(tokens)
+
+
+class ThrottledClient:
+    """Proxy that acquires a limiter token before every method call on client."""
+
+    def __init__(self, client, limiter: RateLimiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self._limiter.acquire()
+            return attr(*args, **kwargs)
+        return call
+
+
+_limiters_lock = threading.Lock()
+_limiters = {}
+
+
+def get_rate_limiter(name: str, rate: float, capacity: float = None,
+                     shared: bool = False) -> RateLimiter:
+    """Return the process-wide limiter registered under name, creating it on first use.
+
+    rate/capacity/shared only apply when the limiter is created. Shared
+    limiters coordinate across processes through a lock file in
+    RATE_LIMIT_DIR.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            if shared:
+                directory = RATE_LIMIT_DIR or os.path.join(
+                    tempfile.gettempdir(), "qd-engine-ratelimits"
+                )
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, name.replace(":", "_") + ".json")
+                limiter = SharedRateLimiter(rate, capacity, path)
+            else:
+                limiter = RateLimiter(rate, capacity)
+            _limiters[name] = limiter
+        return limiter
+
+
+def credential_id(secret: str) -> str:
+    """Short, non-reversible id for an API credential (safe for names and logs)."""
+    return hashlib.sha256((secret or "").encode()).hexdigest()[:12]
+
+
+def limiter_for(service: str, endpoint_class: str, credential: str) -> RateLimiter:
+    """The limiter for one credential's endpoint class (e.g. "alpaca", "data", key).
+
+    Rates come from RATE_LIMITS["<service>.<endpoint_class>"]. Clients
+    sharing a credential share the bucket, across processes when
+    RATE_LIMIT_SHARED is set.
+    """
+    rate, capacity = RATE_LIMITS[f"{service}.{endpoint_class}"]
+    name = f"{service}:{endpoint_class}:{credential_id(credential)}"
+    return get_rate_limiter(name, rate, capacity, shared=RATE_LIMIT_SHARED)
+
+
+def get_rate_limiter_stats() -> dict:
+    """{limiter name: acquired/throttled/wait_seconds} for every limiter in this process."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
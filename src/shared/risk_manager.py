@@ -5,6 +5,7 @@ from typing import Tuple, Optional
 from src.shared.config import STARTING_CAPITAL, ACCOUNT_CONFIGS
 from src.shared.database import Database
 from src.shared.alpaca_client import AlpacaClient
+from src.shared.account_state import AccountState
 
 logger = logging.getLogger(__name__)
 
@@ -15,24 +16,32 @@ class RiskManager:
     Each account operates with exactly $10,000 starting capital.
     Working capital = starting_capital + cumulative realized P&L + unrealized P&L.
     The remaining $90k in each paper account is OFF LIMITS.
+
+    Broker reads go through an AccountState, so repeated checks within a
+    cycle share one positions fetch. Pass the executor's state to share it
+    (and its local fill updates); otherwise a private one is created.
     """
 
     _REALIZED_PNL_CACHE_TTL = 300  # 5 minutes
 
-    def __init__(self, account_id: str):
+    def __init__(self, account_id: str, state: AccountState = None):
         self.account_id = account_id
         self.config = ACCOUNT_CONFIGS[account_id]
         self.db = Database()
-        self.alpaca = AlpacaClient(account_id)
+        if state is None:
+            state = AccountState(AlpacaClient(account_id))
+        self.state = state
+        self.alpaca = state.alpaca
         self._realized_pnl_cache = None
         self._realized_pnl_cache_time = 0.0
 
     def _get_realized_pnl(self) -> float:
         """Get realized P&L with in-memory TTL cache.
 
-        The expensive DB query (fetches all trade outcomes) only runs
-        once per TTL period. Safe because realized P&L only changes
-        when a trade closes, which is infrequent relative to the
+        P&L is summed server-side (Database.get_outcome_summary), so the
+        query returns one row instead of the whole outcomes table, and it
+        only runs once per TTL period. Safe because realized P&L only
+        changes when a trade closes, which is infrequent relative to the
         2-minute check cycles.
         """
         now = time.monotonic()
@@ -41,8 +50,8 @@ class RiskManager:
             return self._realized_pnl_cache
 
         try:
-            outcomes = self.db.get_trade_outcomes(self.account_id, limit=10000)
-            pnl = sum(float(o.get("realized_pnl", 0) or 0) for o in outcomes)
+            summary = self.db.get_outcome_summary(self.account_id)
+            pnl = float(summary["total_pnl"])
         except Exception as e:
             logger.error(f"Failed to calculate realized P&L: {e}")
             return self._realized_pnl_cache if self._realized_pnl_cache is not None else 0.0
@@ -56,13 +65,10 @@ class RiskManager:
         starting = self.config["starting_capital"]
         realized_pnl = self._get_realized_pnl()
 
-        # Unrealized P&L from current positions (always live)
+        # Unrealized P&L from this cycle's positions
         unrealized_pnl = 0.0
         try:
-            positions = self.alpaca.get_positions()
-            unrealized_pnl = sum(
-                float(pos.unrealized_pl) for pos in positions
-            )
+            unrealized_pnl = self.state.unrealized_pl
         except Exception as e:
             logger.error(f"Failed to calculate unrealized P&L: {e}")
 
@@ -76,10 +82,14 @@ class RiskManager:
 
     def get_invested_amount(self) -> float:
         """Get total market value of current positions."""
-        return self.alpaca.get_invested_value()
+        return self.state.invested_value
 
     def can_open_position(self, symbol: str, notional: float) -> Tuple[bool, str]:
         """Check if a new position can be opened within risk limits."""
+        # Every check below reads positions; an unknown book must not pass as empty
+        if not self.state.positions_known:
+            return False, "Open positions unavailable from broker; not opening new positions"
+
         working_capital = self.get_working_capital()
         invested = self.get_invested_amount()
 
@@ -115,14 +125,14 @@ class RiskManager:
         # Check max positions count
         max_positions = self.config.get("max_positions",
                                         self.config.get("max_concurrent_positions", 12))
-        current_count = self.alpaca.get_position_count()
+        current_count = self.state.position_count
         if current_count >= max_positions:
             return False, (
                 f"Max positions reached: {current_count}/{max_positions}"
             )
 
         # Check if already holding this symbol
-        existing = self.alpaca.get_position(symbol)
+        existing = self.state.get_position(symbol)
         if existing:
             return False, f"Already holding position in {symbol}"
 
@@ -174,21 +184,17 @@ class RiskManager:
         from datetime import date
         todays_pnl = 0.0
         try:
-            outcomes = self.db.get_trade_outcomes(self.account_id, limit=100)
-            today_str = date.today().isoformat()
-            todays_pnl = sum(
-                float(o.get("realized_pnl", 0) or 0)
-                for o in outcomes
-                if (o.get("exit_date") or "")[:10] == today_str
+            summary = self.db.get_outcome_summary(
+                self.account_id, since=date.today().isoformat()
             )
+            todays_pnl = float(summary["total_pnl"])
         except Exception as e:
             logger.error(f"Failed to get today's realized P&L: {e}")
 
         # Also include unrealized from open positions
         unrealized = 0.0
         try:
-            for pos in self.alpaca.get_positions():
-                unrealized += float(pos.unrealized_intraday_pl)
+            unrealized = self.state.unrealized_intraday_pl
         except Exception:
             pass
 
@@ -0,0 +1,226 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from src.shared.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Flush a table's buffer once it holds this many rows...
+WRITE_BEHIND_BATCH_SIZE = 50
+# ...or once its oldest row has waited this long (seconds).
+WRITE_BEHIND_FLUSH_INTERVAL = 2.0
+# Rows buffered across all tables before new rows are dropped.
+WRITE_BEHIND_MAX_QUEUED = 5000
+# Attempts per batch before it is dropped, with linear backoff between them.
+WRITE_BEHIND_MAX_ATTEMPTS = 3
+WRITE_BEHIND_RETRY_BACKOFF = 0.5
+# Longest process exit waits for the final flush.
+WRITE_BEHIND_EXIT_TIMEOUT = 10.0
+
+
+class WriteBehindQueue:
+    """Background writer for non-critical inserts (telemetry, logs).
+
+    enqueue() only appends to an in-memory buffer and returns immediately;
+    a daemon thread batches rows per table and inserts them when a table
+    reaches batch_size rows or flush_interval seconds, and again at process
+    exit. Memory is bounded by max_queued: once full, new rows are dropped
+    and counted rather than blocking the caller. A batch that keeps failing
+    after max_attempts is dropped too.
+
+    Only use this for rows nobody reads back within the same run.
+    """
+
+    def __init__(self, batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+                 max_queued: int = WRITE_BEHIND_MAX_QUEUED,
+                 max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+                 retry_backoff: float = WRITE_BEHIND_RETRY_BACKOFF):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+        self._cond = threading.Condition()
+        self._buffers = {}  # table -> deque of rows
+        self._oldest = {}   # table -> monotonic time of its oldest buffered row
+        self._pending = 0   # rows buffered across all tables
+        self._in_flight = 0  # rows taken by the worker but not yet written
+        self._closed = False
+        self._force_flush = False
+        self._worker = None
+        self._stats = {"queued": 0, "written": 0, "dropped": 0, "retries": 0, "failed_batches": 0}
+
+    def enqueue(self, table: str, row: dict) -> bool:
+        """Buffer one row for insertion into table. Never blocks on I/O.
+
+        Returns False if the row was dropped because the queue is full or closed.
+        """
+        with self._cond:
+            if self._closed or self._pending >= self.max_queued:
+                self._stats["dropped"] += 1
+                if self._stats["dropped"] == 1 or self._stats["dropped"] % 100 == 0:
+                    logger.warning(
+                        f"Write-behind queue full, dropped {self._stats['dropped']} rows so far"
+                    )
+                return False
+            buf = self._buffers.setdefault(table, deque())
+            if not buf:
+                self._oldest[table] = time.monotonic()
+            buf.append(row)
+            self._pending += 1
+            self._stats["queued"] += 1
+            self._ensure_worker()
+            if len(buf) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until everything buffered so far has been written or dropped.
+
+        Returns False if timeout elapsed first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._force_flush = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    if self._worker is None or not self._worker.is_alive():
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                return not (self._pending or self._in_flight)
+            finally:
+                self._force_flush = False
+
+    def close(self, timeout: float = WRITE_BEHIND_EXIT_TIMEOUT) -> None:
+        """Flush remaining rows and stop accepting new ones. Idempotent."""
+        if self._closed:
+            return
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        stats = self.stats()
+        if stats["queued"]:
+            log = logger.info if drained and not stats["dropped"] else logger.warning
+            log(f"Write-behind queue closed: {stats}")
+
+    def stats(self) -> dict:
+        """Counters: queued, written, dropped, retries, failed_batches, pending."""
+        with self._cond:
+            return {**self._stats, "pending": self._pending + self._in_flight}
+
+    # --- Worker ---
+
+    def _ensure_worker(self) -> None:
+        # Caller holds self._cond
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="write-behind", daemon=True
+            )
+            self._worker.start()
+
+    def _take_ready(self) -> list:
+        # Caller holds self._cond. Returns [(table, rows)] due for writing.
+        now = time.monotonic()
+        ready = []
+        for table, buf in self._buffers.items():
+            if not buf:
+                continue
+            due = (
+                self._force_flush
+                or len(buf) >= self.batch_size
+                or now - self._oldest[table] >= self.flush_interval
+            )
+            while buf and due:
+                n = min(len(buf), self.batch_size)
+                rows = [buf.popleft() for _ in range(n)]
+                ready.append((table, rows))
+                self._pending -= n
+                self._in_flight += n
+                due = self._force_flush or len(buf) >= self.batch_size
+            if buf:
+                self._oldest[table] = now
+        return ready
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                ready = self._take_ready()
+                while not ready:
+                    if self._closed and not self._pending:
+                        return
+                    self._cond.wait(self.flush_interval / 2)
+                    ready = self._take_ready()
+
+            for table, rows in ready:
+                self._write(table, rows)
+                with self._cond:
+                    self._in_flight -= len(rows)
+                    self._cond.notify_all()
+
+    def _write(self, table: str, rows: list) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                get_db().table(table).insert(rows).execute()
+                with self._cond:
+                    self._stats["written"] += len(rows)
+                return
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    with self._cond:
+                        self._stats["retries"] += 1
+                    time.sleep(self.retry_backoff * attempt)
+                    continue
+                logger.error(
+                    f"Write-behind insert into {table} failed after {attempt} attempts, "
+                    f"dropping {len(rows)} rows: {e}"
+                )
+                with self._cond:
+                    self._stats["dropped"] += len(rows)
+                    self._stats["failed_batches"] += 1
+
+
+# --- Process-wide writer ---
+
+_writer_lock = threading.Lock()
+_writer = None
+
+
+def get_writer() -> WriteBehindQueue:
+    """Return the process-wide write-behind queue, creating it on first use."""
+    global _writer
+    writer = _writer
+    if writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteBehindQueue()
+            writer = _writer
+    return writer
+
+
+def enqueue_insert(table: str, row: dict) -> bool:
+    """Queue a row on the process-wide writer. See WriteBehindQueue.enqueue."""
+    return get_writer().enqueue(table, row)
+
+
+def close_writer() -> None:
+    """Flush and close the process-wide writer. Registered with atexit."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+# Registered after database.close_db (imported above), so atexit runs it
+# first and the final flush still has a client.
+atexit.register(close_writer)
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.account1_quiver import main
+
+
+def _scored(n):
+    return [{"symbol": f"S{i}", "composite_score": 100 - i} for i in range(n)]
+
+
+class _Analyzer:
+    """Stand-in analyzer: per-symbol results/delays, counts tokens like ClaudeClient."""
+
+    def __init__(self, results=None, delays=None, tokens_per_call=0):
+        self.results = results or {}
+        self.delays = delays or {}
+        self.tokens_per_call = tokens_per_call
+        self.calls = []
+        self._tokens = 0
+        self._lock = threading.Lock()
+        self.claude = MagicMock()
+        self.claude.tokens_used.side_effect = lambda: self._tokens
+
+    def build_run_context(self, symbols):
+        self.context_symbols = symbols
+        return "ctx"
+
+    def analyze_signal(self, scored, portfolio_state, context=None):
+        assert context == "ctx"
+        symbol = scored["symbol"]
+        self.calls.append(symbol)
+        time.sleep(self.delays.get(symbol, 0))
+        with self._lock:
+            self._tokens += self.tokens_per_call
+        result = self.results.get(symbol, {"confidence": 80, "decision": "buy"})
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _run(analyzer, scored, **config):
+    settings = {"max_signals": 20, "concurrency": 4, "token_budget": None,
+                "max_consecutive_failures": 3, **config}
+    tracker = MagicMock()
+    with patch.dict(main.CLAUDE_ANALYSIS, settings):
+        results = list(main.analyze_top_signals(analyzer, scored, {}, tracker))
+    return [s["symbol"] for s, _ in results], tracker
+
+
+class TestAnalyzeTopSignals(unittest.TestCase):
+
+    def test_results_keep_score_order_when_calls_finish_out_of_order(self):
+        analyzer = _Analyzer(delays={"S0": 0.15, "S1": 0.05})
+        symbols, _ = _run(analyzer, _scored(6))
+        self.assertEqual(symbols, ["S0", "S1", "S2", "S3", "S4", "S5"])
+
+    def test_circuit_breaker_trips_where_the_serial_loop_would(self):
+        # S2 raising doesn't count as a failure; the empty S1/S3/S4 results do
+        analyzer = _Analyzer(results={"S1": {}, "S2": RuntimeError("boom"), "S3": {}, "S4": {}})
+        symbols, tracker = _run(analyzer, _scored(10), concurrency=3)
+        self.assertEqual(symbols, ["S0"])
+        tracker.add_error.assert_called_once()
+        self.assertIn("circuit breaker", tracker.add_warning.call_args.args[0])
+        self.assertLess(len(analyzer.calls), 10)
+
+    def test_token_budget_stops_new_calls(self):
+        analyzer = _Analyzer(tokens_per_call=1000)
+        symbols, tracker = _run(analyzer, _scored(10), concurrency=1, token_budget=3000)
+        self.assertEqual(symbols, ["S0", "S1", "S2"])
+        self.assertIn("token budget", tracker.add_warning.call_args.args[0])
+
+    def test_max_signals_caps_the_run(self):
+        analyzer = _Analyzer()
+        symbols, _ = _run(analyzer, _scored(30), max_signals=5, concurrency=2)
+        self.assertEqual(len(symbols), 5)
+        self.assertEqual(analyzer.context_symbols, ["S0", "S1", "S2", "S3", "S4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from alpaca.trading.enums import OrderClass
+
+from src.shared.alpaca_client import AlpacaClient, MarketDataCache
+
+
+class TestMarketDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = MarketDataCache(ttls={"snapshot": 60}, max_entries=3)
+
+    def test_misses_fetched_in_one_batch(self):
+        fetch = MagicMock(side_effect=lambda syms: {s: f"snap-{s}" for s in syms})
+        self.cache.get_many("snapshot", ["AAPL"], fetch)
+
+        result = self.cache.get_many("snapshot", ["AAPL", "MSFT", "NVDA", "MSFT"], fetch)
+
+        self.assertEqual(result, {"AAPL": "snap-AAPL", "MSFT": "snap-MSFT", "NVDA": "snap-NVDA"})
+        self.assertEqual(fetch.call_count, 2)
+        fetch.assert_called_with(["MSFT", "NVDA"])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_failed_fetch_serves_hits_only(self):
+        self.cache.get_many("snapshot", ["AAPL"], lambda syms: {"AAPL": 1})
+        self.assertEqual(self.cache.get_many("snapshot", ["AAPL", "MSFT"], lambda syms: None),
+                         {"AAPL": 1})
+        self.assertIsNone(self.cache.get_many("snapshot", ["TSLA"], lambda syms: None))
+
+    def test_lru_eviction_and_uncached_kinds(self):
+        fetch = MagicMock(side_effect=lambda syms: {s: s for s in syms})
+        self.cache.get_many("snapshot", ["A", "B", "C", "D"], fetch)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.cache.get_many("snapshot", ["A"], fetch)
+        fetch.assert_called_with(["A"])
+
+        self.cache.get_many("quote", ["B"], fetch)  # no TTL configured
+        self.cache.get_many("quote", ["B"], fetch)
+        self.assertEqual(fetch.call_count, 4)
+
+
+class TestBracketOrders(unittest.TestCase):
+
+    def setUp(self):
+        self.client = AlpacaClient.__new__(AlpacaClient)
+        self.client.trading = MagicMock()
+
+    def test_bracket_uses_whole_shares_and_both_legs(self):
+        self.client.submit_bracket_order(
+            "AAPL", "buy", 1050, stop_price=98.456, target_price=103, ref_price=100,
+        )
+        request = self.client.trading.submit_order.call_args.kwargs["order_data"]
+        self.assertEqual(request.qty, 10)
+        self.assertEqual(request.order_class, OrderClass.BRACKET)
+        self.assertEqual(request.stop_loss.stop_price, 98.46)
+        self.assertEqual(request.take_profit.limit_price, 103)
+
+    def test_single_leg_is_oto(self):
+        self.client.submit_bracket_order("AAPL", "sell", 500, stop_price=105, ref_price=100)
+        request = self.client.trading.submit_order.call_args.kwargs["order_data"]
+        self.assertEqual(request.order_class, OrderClass.OTO)
+        self.assertIsNone(request.take_profit)
+
+    def test_invalid_legs_or_size_return_none(self):
+        # Long stop above price, short target above price, qty < 1
+        self.assertIsNone(self.client.submit_bracket_order(
+            "AAPL", "buy", 1000, stop_price=101, target_price=105, ref_price=100))
+        self.assertIsNone(self.client.submit_bracket_order(
+            "AAPL", "sell", 1000, stop_price=105, target_price=101, ref_price=100))
+        self.assertIsNone(self.client.submit_bracket_order(
+            "AAPL", "buy", 50, stop_price=95, ref_price=100))
+        self.client.trading.submit_order.assert_not_called()
+
+
+@patch("src.shared.alpaca_client.CANCEL_POLL_INTERVAL", 0)
+class TestClosePosition(unittest.TestCase):
+
+    def setUp(self):
+        self.client = AlpacaClient.__new__(AlpacaClient)
+        self.client.account_id = "day_trader"
+        self.client.trading = MagicMock()
+        self.client.trading.get_orders.return_value = [SimpleNamespace(id="leg1")]
+
+    def test_close_waits_for_cancelled_legs(self):
+        statuses = iter(["pending_cancel", "pending_cancel", "canceled"])
+        self.client.trading.get_order_by_id.side_effect = \
+            lambda order_id: SimpleNamespace(status=next(statuses))
+
+        self.assertIsNotNone(self.client.close_position("AAPL", cancel_orders=True))
+
+        self.client.trading.cancel_order_by_id.assert_called_once_with("leg1")
+        self.assertEqual(self.client.trading.get_order_by_id.call_count, 3)
+        self.client.trading.close_position.assert_called_once_with("AAPL")
+
+    @patch("src.shared.alpaca_client.CANCEL_SETTLE_TIMEOUT", 0)
+    def test_leg_that_never_cancels_blocks_the_close(self):
+        self.client.trading.get_order_by_id.return_value = SimpleNamespace(status="pending_cancel")
+
+        self.assertIsNone(self.client.close_position("AAPL", cancel_orders=True))
+        self.client.trading.close_position.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
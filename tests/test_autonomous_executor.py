@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.account3_autonomous.executor import AutonomousExecutor
+
+
+class TestAutonomousFillSync(unittest.TestCase):
+
+    @patch("src.account3_autonomous.executor.ThesisTracker")
+    @patch("src.account3_autonomous.executor.RiskManager")
+    @patch("src.account3_autonomous.executor.Database")
+    @patch("src.account3_autonomous.executor.AlpacaClient")
+    def setUp(self, alpaca_cls, db_cls, risk_cls, thesis_cls):
+        self.executor = AutonomousExecutor()
+        self.alpaca, self.db, risk = alpaca_cls.return_value, db_cls.return_value, risk_cls.return_value
+        self.executor.fills.poll_interval = 0
+        self.alpaca.get_clock.return_value = SimpleNamespace(is_open=True)
+        risk.check_max_trades_per_day.return_value = (True, 0)
+        risk.calculate_position_size.return_value = 1000.0
+        risk.can_open_position.return_value = (True, "OK")
+        self.alpaca.submit_market_order.return_value = SimpleNamespace(id="o1", status="pending_new")
+
+        self.row = {"id": 7, "symbol": "AAPL", "alpaca_order_id": "o1",
+                    "status": "pending_new", "created_at": "2026-03-02T14:30:00+00:00"}
+        self.db.insert_trade.return_value = dict(self.row)
+        self.db.get_unfilled_trades.side_effect = lambda account, ids=None, since=None: [dict(self.row)]
+        self.db.update_trades_batch.side_effect = lambda rows: len(rows)
+        self.alpaca.get_orders_since.return_value = [SimpleNamespace(
+            id="o1", status="filled", filled_avg_price="190.5", filled_qty=2,
+            filled_at="2026-03-02T14:31:00Z",
+        )]
+
+    def _written(self):
+        rows = self.db.update_trades_batch.call_args.args[0]
+        return {r["id"]: (r["status"], r["fill_price"]) for r in rows}
+
+    def test_new_positions_get_their_fills_recorded(self):
+        self.executor.execute_decisions({"new_positions": [
+            {"symbol": "AAPL", "confidence": 80, "position_size_pct": 0.5, "thesis": "t"},
+        ]})
+        self.assertEqual(self._written(), {7: ("filled", 190.5)})
+
+    def test_queued_orders_get_their_fills_recorded(self):
+        with patch.object(self.executor, "_get_pending_orders", return_value=[
+            {"id": 1, "symbol": "AAPL", "direction": "buy", "signal_data": {}},
+        ]), patch.object(self.executor, "_mark_order_executed"):
+            self.executor.execute_queued_orders()
+        self.assertEqual(self._written(), {7: ("filled", 190.5)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from src.account2_daytrader import indicators
+from src.account2_daytrader.bar_store import BarStore
+from tests.test_indicators import SESSION_OPEN, _make_bars
+
+
+def _full_recompute(bars):
+    packed = indicators.pack_bars({"X": bars}, ["X"])
+    values = indicators.compute(packed, SESSION_OPEN.timestamp())
+    return {name: float(arr[0]) for name, arr in values.items()}
+
+
+class TestBarStore(unittest.TestCase):
+
+    def test_incremental_updates_match_full_recompute(self):
+        rng = np.random.default_rng(11)
+        bars = _make_bars(rng, 150, premarket=40)
+        store = BarStore(capacity=200)
+        session_open = SESSION_OPEN.timestamp()
+
+        self.assertEqual(store.update("X", bars[:60], session_open), 60)
+        # Each cycle re-sends a few already-stored bars; only new ones are added
+        self.assertEqual(store.update("X", bars[55:61], session_open), 1)
+        self.assertEqual(store.update("X", bars[61:61], session_open), 0)
+        self.assertEqual(store.update("X", bars[58:150], session_open), 89)
+        self.assertEqual(store.get("X").count, 150)
+
+        expected = _full_recompute(bars)
+        got = store.indicators(["X"])["X"]
+        for name, value in expected.items():
+            self.assertAlmostEqual(got[name], value, places=9, msg=name)
+
+    def test_ring_buffer_evicts_oldest_bars(self):
+        rng = np.random.default_rng(3)
+        bars = _make_bars(rng, 90, premarket=5)
+        store = BarStore(capacity=50)
+        session_open = SESSION_OPEN.timestamp()
+        for i in range(0, 90, 7):
+            store.update("X", bars[i:i + 7], session_open)
+
+        series = store.get("X")
+        self.assertEqual(series.count, 50)
+        self.assertEqual(series.last_epoch, bars[-1].timestamp.timestamp())
+        np.testing.assert_array_equal(
+            series.tail(3)[4], [b.close for b in bars[-3:]])
+
+        # Windowed indicators and VWAP cover exactly the bars still held
+        expected = _full_recompute(bars[-50:])
+        got = store.indicators(["X"])["X"]
+        for name in ("current_price", "avg_volume", "sma_10", "sma_20",
+                     "recent_high", "recent_low", "vwap"):
+            self.assertAlmostEqual(got[name], expected[name], places=9, msg=name)
+
+    def test_short_history_not_ready(self):
+        rng = np.random.default_rng(5)
+        store = BarStore()
+        bars = _make_bars(rng, indicators.LOOKBACK - 1)
+        store.update("X", bars[:indicators.RSI_PERIOD], SESSION_OPEN.timestamp())
+        self.assertEqual(store.get("X").rsi, 50.0)
+
+        store.update("X", bars, SESSION_OPEN.timestamp())
+        self.assertEqual(store.indicators(["X", "MISSING"]), {})
+        packed = indicators.pack_bars({"X": bars[:indicators.RSI_PERIOD + 1]}, ["X"])
+        expected = indicators.rsi(packed["close"], packed["lengths"])[0]
+        store = BarStore()
+        store.update("X", bars[:indicators.RSI_PERIOD + 1], SESSION_OPEN.timestamp())
+        self.assertEqual(store.get("X").rsi, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.account1_quiver.claude_analyzer import ClaudeAnalyzer
+
+
+def _snapshot(price, prev_close):
+    return SimpleNamespace(latest_trade=SimpleNamespace(price=price),
+                           previous_daily_bar=SimpleNamespace(close=prev_close))
+
+
+def _scored(symbol):
+    return {"symbol": symbol, "direction": "buy", "composite_score": 40,
+            "source_count": 1, "sources": ["house_trading"], "signals": []}
+
+
+class TestRunContext(unittest.TestCase):
+
+    @patch("src.account1_quiver.claude_analyzer.AlpacaClient")
+    @patch("src.account1_quiver.claude_analyzer.Database")
+    @patch("src.account1_quiver.claude_analyzer.ClaudeClient")
+    def setUp(self, claude_cls, db_cls, alpaca_cls):
+        self.analyzer = ClaudeAnalyzer()
+        self.db, self.alpaca, self.claude = db_cls.return_value, alpaca_cls.return_value, claude_cls.return_value
+        self.db.get_scorecard.return_value = []
+        self.db.get_learnings.return_value = []
+        self.db.get_trade_outcomes.return_value = [
+            {"symbol": "AAPL", "entry_date": "2026-03-01", "realized_pnl": 12.5, "outcome": "win"},
+        ]
+        self.alpaca.get_snapshots.return_value = {"AAPL": _snapshot(110, 100)}
+        self.claude.analyze.return_value = {"confidence": 70, "decision": "buy"}
+
+    def test_context_is_fetched_once_per_run(self):
+        context = self.analyzer.build_run_context(["AAPL", "MSFT"])
+        for symbol in ("AAPL", "MSFT"):
+            self.analyzer.analyze_signal(_scored(symbol), {}, context)
+
+        self.alpaca.get_snapshots.assert_called_once_with(["AAPL", "MSFT"])
+        self.db.get_scorecard.assert_called_once()
+        self.db.get_trade_outcomes.assert_called_once()
+        prompts = [c.kwargs["user_prompt"] for c in self.claude.analyze.call_args_list]
+        self.assertIn("Daily Change: +10.00%", prompts[0])
+        self.assertIn("P&L=12.5", prompts[0])
+        self.assertIn("Price data unavailable", prompts[1])
+        self.assertIn("No prior trades on this symbol", prompts[1])
+
+    def test_cache_key_is_signal_set_and_price_band_not_portfolio(self):
+        context = self.analyzer.build_run_context(["AAPL"])
+        scored = {**_scored("AAPL"), "signals": [
+            {"source": "house_trading", "signal_type": "congress_buy", "strength": 40,
+             "raw_data": {"Representative": "X", "Range": "$1,001 - $15,000"}},
+        ]}
+        self.analyzer.analyze_signal(scored, {"working_capital": 9000, "total_pnl": 12}, context)
+        self.alpaca.get_snapshots.return_value = {"AAPL": _snapshot(110.01, 100)}
+        moved = self.analyzer.build_run_context(["AAPL"])
+        self.analyzer.analyze_signal(scored, {"working_capital": 9100, "total_pnl": -40}, moved)
+
+        keys = [c.kwargs["cache_inputs"] for c in self.claude.analyze.call_args_list]
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(keys[0]["symbol"], "AAPL")
+        self.assertEqual(len(keys[0]["signals"]), 1)
+        self.assertEqual(keys[0]["composite_score"], 40)
+
+        scored["composite_score"] = 55
+        self.analyzer.analyze_signal(scored, {}, moved)
+        self.assertNotEqual(self.claude.analyze.call_args.kwargs["cache_inputs"], keys[0])
+
+    def test_without_context_fetches_for_the_one_symbol(self):
+        result = self.analyzer.analyze_signal(_scored("AAPL"), {})
+        self.assertEqual(result["symbol"], "AAPL")
+        self.alpaca.get_snapshots.assert_called_once_with(["AAPL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.shared.claude_cache import ClaudeResponseCache, price_bucket
+from src.shared.claude_client import ClaudeClient
+
+
+def _message(text, **usage):
+    counts = {"input_tokens": 100, "output_tokens": 20, **usage}
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)],
+                           usage=SimpleNamespace(**counts))
+
+
+class TestPromptCaching(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ClaudeClient(account_id="quiver_strat")
+        self.client.client = MagicMock()
+        self.client.limiter = MagicMock()
+        patcher = patch("src.shared.claude_client.enqueue_insert")
+        self.enqueue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stable_prefix_comes_first_with_cache_breakpoints(self):
+        self.client.client.messages.create.return_value = _message('{"confidence": 70}')
+        self.client.analyze("SYSTEM", "symbol part", cached_context="learnings + scorecard")
+
+        params = self.client.client.messages.create.call_args.kwargs
+        self.assertEqual(params["system"][0]["text"], "SYSTEM")
+        self.assertIn("cache_control", params["system"][0])
+        content = params["messages"][0]["content"]
+        self.assertEqual([block["text"] for block in content], ["learnings + scorecard", "symbol part"])
+        self.assertIn("cache_control", content[0])
+        self.assertNotIn("cache_control", content[1])
+
+    def test_cache_tokens_are_logged_and_counted(self):
+        self.client.client.messages.create.return_value = _message(
+            '{"confidence": 70}', cache_read_input_tokens=1800, cache_creation_input_tokens=0,
+        )
+        self.client.analyze("SYSTEM", "prompt")
+
+        row = self.enqueue.call_args.args[1]
+        self.assertEqual(row["full_response"]["usage"]["cache_read_input_tokens"], 1800)
+        # Cached input still counts toward logged totals and run budgets
+        self.assertEqual(row["tokens_used"], 1920)
+        self.assertEqual(self.client.usage["cache_read_input_tokens"], 1800)
+        self.assertEqual(self.client.tokens_used(), 1920)
+
+    def test_caching_can_be_disabled(self):
+        self.client.client.messages.create.return_value = _message("{}")
+        with patch("src.shared.claude_client.CLAUDE_PROMPT_CACHING", False):
+            self.client.analyze("SYSTEM", "prompt", cached_context="ctx")
+        params = self.client.client.messages.create.call_args.kwargs
+        self.assertEqual(params["system"], "SYSTEM")
+        self.assertEqual(params["messages"][0]["content"], "ctx\n\nprompt")
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ClaudeClient(account_id="day_trader")
+        self.client.client = MagicMock()
+        self.client.client.messages.create.return_value = _message(
+            '{"decision": "yes", "confidence": 72, "reason": "trend"}'
+        )
+        self.client.limiter = MagicMock()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ClaudeResponseCache(os.path.join(tmp.name, "responses.sqlite"), max_entries=2)
+        self.addCleanup(self.cache.conn.close)
+        patcher = patch("src.shared.claude_client.get_response_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("src.shared.claude_client.enqueue_insert")
+        self.enqueue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_decision_is_served_from_cache_and_logged_as_hit(self):
+        first = self.client.quick_decision("Symbol: AAPL\nEntry: $187.42\nShould we take this trade?")
+        again = self.client.quick_decision("Symbol: AAPL\nEntry:  $187.42\nShould we take this trade?")
+
+        self.assertEqual(first, again)
+        self.client.client.messages.create.assert_called_once()
+        hit = self.enqueue.call_args.args[1]
+        self.assertTrue(hit["full_response"]["cache_hit"])
+        self.assertEqual(hit["tokens_used"], 0)
+        self.assertEqual(self.client.usage["response_cache_hits"], 1)
+
+    def test_changed_inputs_and_uncached_types_go_to_the_model(self):
+        self.client.quick_decision("Symbol: AAPL\nStrategy: vwap_reversion")
+        self.client.quick_decision("Symbol: AAPL\nStrategy: orb_breakout")
+        self.client.analyze("SYSTEM", "Symbol: AAPL", analysis_type="daily_decision")
+        self.client.analyze("SYSTEM", "Symbol: AAPL", analysis_type="daily_decision")
+        self.assertEqual(self.client.client.messages.create.call_count, 4)
+
+    def test_expired_entries_miss_and_size_is_bounded(self):
+        self.cache.put("a", "quick_decision", "{}")
+        self.assertEqual(self.cache.get("a", ttl_seconds=60), "{}")
+        with patch("src.shared.claude_cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get("a", ttl_seconds=60))
+
+        self.cache.put("b", "quick_decision", "{}")
+        self.cache.put("c", "quick_decision", "{}")
+        self.assertEqual(len(self.cache), 2)
+
+    def test_prompt_keys_are_exact_and_structured_keys_band_prices(self):
+        self.client.quick_decision("Entry: $187.42")
+        self.client.quick_decision("Entry: $187.43")
+        self.assertEqual(self.client.client.messages.create.call_count, 2)
+
+        for entry in (187.42, 187.43):
+            self.client.quick_decision(f"Entry: ${entry}",
+                                       cache_inputs={"entry": price_bucket(entry, 0.1)})
+        self.assertEqual(self.client.client.messages.create.call_count, 3)
+
+    def test_price_bands_stay_below_stop_widths(self):
+        self.assertEqual(price_bucket(187.42, 0.1), price_bucket(187.43, 0.1))
+        self.assertNotEqual(price_bucket(187.42, 0.1), price_bucket(187.9, 0.1))
+        self.assertNotEqual(price_bucket(100.4, 0.1), price_bucket(100.0, 0.1))
+        self.assertNotEqual(price_bucket(1000, 0.1), price_bucket(1002, 0.1))
+        self.assertIsNone(price_bucket(None, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
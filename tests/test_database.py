@@ -0,0 +1,273 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.shared import database
+from src.shared.database import Database, get_db, close_db, get_db_stats
+
+
+class TestClientRegistry(unittest.TestCase):
+
+    def setUp(self):
+        close_db()
+        patcher = patch("src.shared.database.create_client")
+        self.mock_create = patcher.start()
+        self.mock_create.side_effect = lambda *a, **kw: MagicMock()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_db)
+
+    def test_databases_share_one_client(self):
+        before = get_db_stats()["clients_created"]
+        db1 = Database()
+        db2 = Database()
+        self.assertIs(db1.client, db2.client)
+        self.assertEqual(get_db_stats()["clients_created"], before + 1)
+        self.assertEqual(self.mock_create.call_count, 1)
+
+    def test_concurrent_first_use_creates_one_client(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(get_db())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(c) for c in clients}), 1)
+        self.assertEqual(self.mock_create.call_count, 1)
+
+    def test_close_releases_pool_and_recreates(self):
+        first = get_db()
+        pool = database._http_client
+        close_db()
+        self.assertTrue(pool.is_closed)
+        self.assertIsNot(get_db(), first)
+        self.assertEqual(self.mock_create.call_count, 2)
+
+    def test_close_is_idempotent(self):
+        get_db()
+        closed = get_db_stats()["clients_closed"]
+        close_db()
+        close_db()
+        self.assertEqual(get_db_stats()["clients_closed"], closed + 1)
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("src.shared.database.get_db")
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        database._query_cache.clear()
+        self.addCleanup(database._query_cache.clear)
+        self.db = Database()
+        self.query = self.mock_client.table.return_value.select.return_value
+        self.query.eq.return_value = self.query
+        self.query.execute.return_value = MagicMock(data=[{"value": "1.5"}])
+
+    def test_repeated_read_hits_cache(self):
+        first = self.db.get_adaptive_config("day_trader", parameter="stop_pct", strategy="momentum")
+        second = self.db.get_adaptive_config("day_trader", parameter="stop_pct", strategy="momentum")
+        self.assertEqual(first, second)
+        self.assertEqual(self.query.execute.call_count, 1)
+
+    def test_write_invalidates_table(self):
+        self.db.get_adaptive_config("day_trader", parameter="stop_pct")
+        self.db.upsert_adaptive_config({"account_id": "day_trader", "parameter": "stop_pct"})
+        self.db.get_adaptive_config("day_trader", parameter="stop_pct")
+        self.assertEqual(self.query.execute.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.query.execute.side_effect = [Exception("boom"), MagicMock(data=[{"value": "2"}])]
+        self.assertEqual(self.db.get_adaptive_config("day_trader"), [])
+        self.assertEqual(self.db.get_adaptive_config("day_trader"), [{"value": "2"}])
+
+    def test_returned_values_are_copies(self):
+        self.db.get_adaptive_config("day_trader")[0]["value"] = "mutated"
+        self.assertEqual(self.db.get_adaptive_config("day_trader")[0]["value"], "1.5")
+
+    def test_lru_eviction_and_expiry(self):
+        cache = database.QueryCache(ttls={"t": 60}, max_entries=2)
+        cache.put(("t", 1), "a")
+        cache.put(("t", 2), "b")
+        cache.get(("t", 1))
+        cache.put(("t", 3), "c")
+        self.assertIs(cache.get(("t", 2)), database._MISS)
+        self.assertEqual(cache.get(("t", 1)), "a")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        with patch("src.shared.database.time.monotonic", return_value=1e12):
+            self.assertIs(cache.get(("t", 1)), database._MISS)
+
+
+class TestOutcomeAggregates(unittest.TestCase):
+
+    ROWS = [
+        {"symbol": "AAPL", "strategy": "momentum", "realized_pnl": 100, "pnl_pct": 2.0,
+         "holding_period_hours": 4},
+        {"symbol": "MSFT", "strategy": "momentum", "realized_pnl": -50, "pnl_pct": -1.0},
+        {"symbol": "NVDA", "strategy": "gap_fill", "signal_source": "house_trading",
+         "realized_pnl": 200, "pnl_pct": 4.0, "holding_period_hours": 2},
+        {"symbol": "TSLA", "strategy": None, "realized_pnl": None, "pnl_pct": None},
+    ]
+
+    def test_account_summary(self):
+        stats = database.aggregate_outcomes(self.ROWS)["all"]
+        self.assertEqual(stats["trades"], 4)
+        self.assertEqual((stats["wins"], stats["losses"], stats["flat"]), (2, 1, 1))
+        self.assertAlmostEqual(stats["total_pnl"], 250)
+        self.assertAlmostEqual(stats["gross_loss"], 50)
+        self.assertAlmostEqual(stats["avg_win"], 150)
+        self.assertAlmostEqual(stats["avg_loss"], -50)
+        self.assertAlmostEqual(stats["avg_pnl_pct"], 1.25)
+        self.assertAlmostEqual(stats["avg_holding_hours"], 3)
+        self.assertEqual(stats["best_trade"]["symbol"], "NVDA")
+        self.assertEqual(stats["worst_trade"]["symbol"], "MSFT")
+
+    def test_grouping(self):
+        by_strategy = database.aggregate_outcomes(self.ROWS, group_by="strategy")
+        self.assertEqual(set(by_strategy), {"momentum", "gap_fill", "unknown"})
+        self.assertEqual(by_strategy["momentum"]["trades"], 2)
+        by_source = database.aggregate_outcomes(self.ROWS, group_by="source")
+        self.assertIn("house_trading", by_source)
+        self.assertNotIn("gap_fill", by_source)
+
+    def _client(self, mock_get_db, rpc_error):
+        client = mock_get_db.return_value
+        client.rpc.return_value.execute.side_effect = rpc_error
+        query = client.table.return_value.select.return_value
+        query.eq.return_value = query
+        query.order.return_value = query
+        query.limit.return_value.execute.return_value = MagicMock(data=self.ROWS)
+        database._aggregate_rpc_available = None
+        self.addCleanup(setattr, database, "_aggregate_rpc_available", None)
+        return client
+
+    @patch("src.shared.database.get_db")
+    def test_falls_back_to_local_aggregation(self, mock_get_db):
+        error = Exception("Could not find the function public.trade_outcome_aggregates")
+        error.code = "PGRST202"
+        self._client(mock_get_db, error)
+
+        summary = Database(use_cache=False).get_outcome_summary("quiver_strat")
+        self.assertAlmostEqual(summary["total_pnl"], 250)
+        self.assertFalse(database._aggregate_rpc_available)
+
+    @patch("src.shared.database.get_db")
+    def test_transient_rpc_error_does_not_disable_the_rpc(self, mock_get_db):
+        client = self._client(mock_get_db, Exception("connection reset"))
+        db = Database(use_cache=False)
+
+        self.assertAlmostEqual(db.get_outcome_summary("quiver_strat")["total_pnl"], 250)
+        self.assertIsNot(database._aggregate_rpc_available, False)
+        db.get_outcome_summary("quiver_strat")
+        self.assertEqual(client.rpc.call_count, 2)
+
+
+class TestKeysetIterators(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("src.shared.database.get_db")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.query = self.client.table.return_value.select.return_value
+        for method in ("eq", "gte", "or_", "order"):
+            getattr(self.query, method).return_value = self.query
+
+    def _pages(self, *pages):
+        self.query.limit.return_value.execute.side_effect = [
+            MagicMock(data=page) for page in pages
+        ]
+
+    def test_pages_by_created_at_and_id(self):
+        rows = [{"id": i, "created_at": f"2026-01-0{i}T00:00:00+00:00"} for i in range(1, 6)]
+        self._pages(rows[:2], rows[2:4], rows[4:])
+
+        got = list(Database(use_cache=False).iter_signals("quiver_strat", page_size=2))
+
+        self.assertEqual(got, rows)
+        cursors = [c.args[0] for c in self.query.or_.call_args_list]
+        self.assertEqual(len(cursors), 2)
+        self.assertIn('created_at.gt."2026-01-02T00:00:00+00:00"', cursors[0])
+        self.assertIn("id.gt.4", cursors[1])
+
+    def test_projection_keeps_cursor_columns(self):
+        self._pages([])
+        list(Database(use_cache=False).iter_trade_outcomes(
+            "quiver_strat", columns="symbol, realized_pnl", since="2026-01-01"
+        ))
+        self.client.table.return_value.select.assert_called_with(
+            "symbol,realized_pnl,created_at,id"
+        )
+        self.query.gte.assert_called_with("exit_date", "2026-01-01")
+
+    def test_failed_page_ends_scan(self):
+        rows = [{"id": 1, "created_at": "2026-01-01"}, {"id": 2, "created_at": "2026-01-02"}]
+        self.query.limit.return_value.execute.side_effect = [
+            MagicMock(data=rows), Exception("timeout"),
+        ]
+        got = list(Database(use_cache=False).iter_snapshots("quiver_strat", page_size=2))
+        self.assertEqual(got, rows)
+
+    def test_signal_keys_split_by_source_in_one_scan(self):
+        self._pages([
+            {"id": 1, "created_at": "2026-01-01", "source": "lobbying",
+             "symbol": "LMT", "signal_type": "lobbying_change"},
+            {"id": 2, "created_at": "2026-01-02", "source": "gov_contracts",
+             "symbol": "RTX", "signal_type": "gov_contract"},
+        ])
+        keys = Database(use_cache=False).get_signal_keys_by_source("quiver_strat", since_hours=48)
+        self.assertEqual(keys, {"lobbying": {("LMT", "lobbying_change")},
+                                "gov_contracts": {("RTX", "gov_contract")}})
+        self.client.table.assert_called_once_with("signals")
+
+    def test_signal_keys_scan_failure_returns_none(self):
+        self.query.limit.return_value.execute.side_effect = Exception("timeout")
+        self.assertIsNone(Database(use_cache=False).get_signal_keys_by_source("quiver_strat"))
+
+
+class TestSignalUpdatesBatch(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("src.shared.database.get_db")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.update = self.client.table.return_value.update
+
+    def test_identical_fields_share_one_call(self):
+        db = Database(use_cache=False)
+        skip = {"acted_on": False, "skip_reason": "low score"}
+        written = db.update_signals_batch([(1, skip), (2, skip), (3, skip)])
+
+        self.assertEqual(written, 3)
+        self.update.assert_called_once_with(skip)
+        self.update.return_value.in_.assert_called_once_with("id", [1, 2, 3])
+
+    def test_mixed_fields_are_one_upsert_of_merged_rows(self):
+        table = self.client.table.return_value
+        table.select.return_value.in_.return_value.execute.return_value = MagicMock(data=[
+            {"id": i, "account_id": "quiver_strat", "symbol": f"S{i}", "confidence": None}
+            for i in (1, 2, 3)
+        ])
+        db = Database(use_cache=False)
+        written = db.update_signals_batch(
+            [(i, {"confidence": 60 + i, "composite_score": 10 * i}) for i in (1, 2, 3)]
+        )
+
+        self.assertEqual(written, 3)
+        self.update.assert_not_called()
+        rows = table.upsert.call_args.args[0]
+        self.assertEqual([(r["id"], r["confidence"], r["account_id"]) for r in rows],
+                         [(1, 61, "quiver_strat"), (2, 62, "quiver_strat"), (3, 63, "quiver_strat")])
+
+    def test_deferred_updates_merge_until_flush(self):
+        db = Database(use_cache=False)
+        db.update_signals_batch([(1, {"confidence": 70})], defer=True)
+        db.update_signals_batch([(1, {"acted_on": False})], defer=True)
+        self.update.assert_not_called()
+
+        self.assertEqual(db.flush_signal_updates(), 1)
+        self.update.assert_called_once_with({"confidence": 70, "acted_on": False})
+        self.assertEqual(db.flush_signal_updates(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from src.account2_daytrader.claude_analyzer import DayTraderClaudeAnalyzer
+
+
+def _setup(symbol, strategy="vwap_bounce"):
+    return {"symbol": symbol, "strategy": strategy, "confidence": 65,
+            "entry_price": 10.0, "target_price": 10.5, "stop_price": 9.8}
+
+
+class TestBatchEvaluation(unittest.TestCase):
+
+    @patch("src.account2_daytrader.claude_analyzer.Database")
+    @patch("src.account2_daytrader.claude_analyzer.ClaudeClient")
+    def setUp(self, claude_cls, db_cls):
+        self.analyzer = DayTraderClaudeAnalyzer()
+        self.claude = claude_cls.return_value
+        self.claude.quick_decision.return_value = {"decision": "yes", "reason": "single"}
+        self.setups = [_setup("AAPL"), _setup("AAPL", "gap_fill"), _setup("TSLA")]
+
+    def test_one_call_for_all_setups_keyed_by_symbol_and_strategy(self):
+        self.claude.analyze.return_value = {"evaluations": [
+            {"symbol": "AAPL", "strategy": "vwap_bounce", "decision": "yes", "confidence": 70},
+            {"symbol": "AAPL", "strategy": "gap_fill", "decision": "no", "reason": "faded"},
+            {"symbol": "TSLA", "strategy": "vwap_bounce", "decision": "no"},
+        ]}
+
+        evaluations = self.analyzer.evaluate_setups(self.setups, {"market_outlook": "neutral"})
+
+        self.claude.analyze.assert_called_once()
+        self.claude.quick_decision.assert_not_called()
+        self.assertEqual(evaluations[("AAPL", "gap_fill")]["reason"], "faded")
+        self.assertEqual(evaluations[("AAPL", "vwap_bounce")]["decision"], "yes")
+
+    def test_unparsed_or_missing_setups_fall_back_to_single_calls(self):
+        self.claude.analyze.return_value = {"evaluations": [
+            {"symbol": "TSLA", "strategy": "vwap_bounce", "decision": "no"},
+        ]}
+        evaluations = self.analyzer.evaluate_setups(self.setups, {})
+        self.assertEqual(self.claude.quick_decision.call_count, 2)
+        self.assertEqual(evaluations[("TSLA", "vwap_bounce")]["decision"], "no")
+
+        self.claude.quick_decision.reset_mock()
+        self.claude.analyze.return_value = None
+        evaluations = self.analyzer.evaluate_setups(self.setups, {})
+        self.assertEqual(self.claude.quick_decision.call_count, 3)
+        self.assertEqual(len(evaluations), 3)
+
+    def test_cache_key_bands_prices_but_tells_moved_stops_apart(self):
+        key = DayTraderClaudeAnalyzer._setup_key
+        drifted = {**_setup("AAPL"), "entry_price": 10.001}
+        moved_stop = {**_setup("AAPL"), "stop_price": 9.9}
+        self.assertEqual(key(_setup("AAPL")), key(drifted))
+        self.assertNotEqual(key(_setup("AAPL")), key(moved_stop))
+        self.assertNotEqual(key(_setup("AAPL")), key(_setup("AAPL", "gap_fill")))
+
+
+if __name__ == "__main__":
+    unittest.main()
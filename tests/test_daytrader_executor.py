@@ -0,0 +1,41 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.account2_daytrader.executor import DayTraderExecutor
+
+
+class TestDayTraderClose(unittest.TestCase):
+
+    @patch("src.account2_daytrader.executor.RiskManager")
+    @patch("src.account2_daytrader.executor.Database")
+    @patch("src.account2_daytrader.executor.AlpacaClient")
+    def setUp(self, alpaca_cls, db_cls, risk_cls):
+        self.executor = DayTraderExecutor()
+        self.alpaca, self.db = alpaca_cls.return_value, db_cls.return_value
+        self.position = SimpleNamespace(
+            symbol="AAPL", avg_entry_price="100", current_price="101", qty="10",
+            unrealized_pl="10", unrealized_plpc="0.01",
+        )
+        self.alpaca.get_positions.return_value = [self.position]
+        self.db.get_open_trades.return_value = [
+            {"id": 7, "symbol": "AAPL", "created_at": "2026-03-02T14:30:00+00:00"},
+        ]
+
+    def test_failed_close_leaves_trade_open(self):
+        self.alpaca.close_position.return_value = None
+
+        self.assertEqual(self.executor.force_close_all(), [])
+        self.db.update_trade.assert_not_called()
+        self.db.insert_trade_outcome.assert_not_called()
+
+    def test_successful_close_records_outcome(self):
+        self.alpaca.close_position.return_value = SimpleNamespace(id="c1")
+
+        self.assertEqual(self.executor.force_close_all(), ["AAPL"])
+        self.assertEqual(self.db.update_trade.call_args.args[1]["status"], "closed")
+        self.db.insert_trade_outcome.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
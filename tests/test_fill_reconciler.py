@@ -0,0 +1,115 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.shared.fill_reconciler import FillReconciler
+
+
+def _order(order_id, status, price=None, qty=0):
+    return SimpleNamespace(
+        id=order_id, status=status, filled_avg_price=price, filled_qty=qty,
+        filled_at="2026-03-02T14:31:00Z" if price else None,
+    )
+
+
+def _trade(trade_id, order_id, status="OrderStatus.PENDING_NEW"):
+    return {"id": trade_id, "symbol": f"S{trade_id}", "alpaca_order_id": order_id,
+            "status": status, "created_at": "2026-03-02T14:30:00+00:00"}
+
+
+class TestFillReconciler(unittest.TestCase):
+
+    def setUp(self):
+        self.alpaca, self.db = MagicMock(), MagicMock()
+        self.rows = {}  # id -> row as currently stored
+        self.db.get_unfilled_trades.side_effect = lambda account, ids=None, since=None: [
+            r for r in self.rows.values()
+            if "PENDING" in r["status"] and (ids is None or r["id"] in ids)
+        ]
+        self.db.update_trades_batch.side_effect = lambda rows: len(rows)
+        self.fills = FillReconciler(self.alpaca, self.db, "acct", poll_interval=0)
+
+    def _track(self, *trades):
+        for t in trades:
+            self.rows[t["id"]] = dict(t)
+            self.fills.track(t)
+
+    def test_one_poll_and_one_bulk_write_for_many_orders(self):
+        self._track(_trade(1, "a"), _trade(2, "b"), _trade(3, "c"))
+        self.alpaca.get_orders_since.return_value = [
+            _order("a", "filled", "10.5", 3),
+            _order("b", "OrderStatus.FILLED", "20", 1),
+            _order("c", "canceled"),
+        ]
+
+        updated = self.fills.reconcile()
+
+        self.alpaca.get_orders_since.assert_called_once()
+        self.alpaca.get_order.assert_not_called()
+        rows = self.db.update_trades_batch.call_args.args[0]
+        self.assertEqual({r["id"]: r["status"] for r in rows},
+                         {1: "filled", 2: "filled", 3: "canceled"})
+        self.assertEqual(rows[0]["fill_price"], 10.5)
+        self.assertEqual(len(updated), 3)
+
+    def test_pending_orders_carry_over_without_waiting(self):
+        self._track(_trade(1, "a"))
+        self.alpaca.get_orders_since.return_value = [_order("a", "new")]
+        self.assertEqual(self.fills.reconcile(wait=False), [])
+        self.assertEqual(self.alpaca.get_orders_since.call_count, 1)
+
+        self.alpaca.get_orders_since.return_value = [_order("a", "filled", "9", 1)]
+        self.assertEqual(len(self.fills.reconcile(wait=False)), 1)
+        self.assertEqual(self.fills.reconcile(), [])
+
+    def test_picks_up_previous_runs_and_skips_rows_closed_meanwhile(self):
+        self.rows[5] = _trade(5, "old")
+        self._track(_trade(6, "new"))
+        self.rows[6]["status"] = "closed"  # closed by an exit before the fill synced
+        self.alpaca.get_orders_since.return_value = [
+            _order("old", "filled", "7", 1), _order("new", "filled", "8", 1),
+        ]
+
+        self.fills.reconcile()
+
+        rows = self.db.update_trades_batch.call_args.args[0]
+        self.assertEqual([r["id"] for r in rows], [5])
+
+    @patch("src.shared.fill_reconciler.time.sleep")
+    def test_orders_outside_the_poll_window_are_fetched_once(self, sleep):
+        self.rows[5] = _trade(5, "stale")
+        self.rows[6] = _trade(6, "gone")
+        self.alpaca.get_orders_since.return_value = []
+        self.alpaca.get_order.side_effect = lambda order_id: (
+            _order("stale", "filled", "7", 1) if order_id == "stale" else None
+        )
+
+        self.fills.reconcile()
+        self.fills.reconcile()
+
+        rows = self.db.update_trades_batch.call_args.args[0]
+        self.assertEqual([r["id"] for r in rows], [5])
+        self.assertEqual(self.alpaca.get_order.call_count, 2)
+        self.alpaca.get_orders_since.assert_called_once()
+        sleep.assert_not_called()
+        self.assertIsNotNone(self.db.get_unfilled_trades.call_args_list[0].kwargs["since"])
+
+    @patch("src.shared.fill_reconciler.time.sleep")
+    def test_no_waiting_on_open_orders_outside_the_window(self, sleep):
+        self.rows[5] = _trade(5, "gtc")
+        self.alpaca.get_orders_since.return_value = []
+        self.alpaca.get_order.return_value = _order("gtc", "new")
+
+        self.assertEqual(self.fills.reconcile(), [])
+        sleep.assert_not_called()
+        self.alpaca.get_order.assert_called_once()
+
+    def test_stream_events_avoid_polling(self):
+        self._track(_trade(1, "a"))
+        self.fills._events["a"] = _order("a", "filled", "3", 1)
+        self.fills.reconcile()
+        self.alpaca.get_orders_since.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+
+from src.account2_daytrader import indicators
+
+ET = pytz.timezone("US/Eastern")
+SESSION_OPEN = ET.localize(datetime(2026, 3, 2, 9, 30))
+
+
+class Bar:
+    def __init__(self, ts, o, h, l, c, v):
+        self.timestamp, self.open, self.high, self.low, self.close, self.volume = ts, o, h, l, c, v
+
+
+def _make_bars(rng, count, premarket=30):
+    start = SESSION_OPEN - timedelta(minutes=premarket)
+    price = rng.uniform(10, 300)
+    bars = []
+    for i in range(count):
+        o = price
+        price = max(1.0, price * (1 + rng.normal(0, 0.004)))
+        h = max(o, price) * (1 + abs(rng.normal(0, 0.001)))
+        l = min(o, price) * (1 - abs(rng.normal(0, 0.001)))
+        v = float(rng.integers(0, 50000))
+        bars.append(Bar(start + timedelta(minutes=i), o, h, l, price, v))
+    return bars
+
+
+def _reference(bars):
+    """The scanner's original per-symbol, list-based indicator math."""
+    closes = [float(b.close) for b in bars]
+    volumes = [float(b.volume) for b in bars]
+    highs = [float(b.high) for b in bars]
+    lows = [float(b.low) for b in bars]
+
+    today_idx = [i for i, b in enumerate(bars) if b.timestamp.astimezone(ET) >= SESSION_OPEN]
+    if len(today_idx) >= 5:
+        v_h = [highs[i] for i in today_idx]
+        v_l = [lows[i] for i in today_idx]
+        v_c = [closes[i] for i in today_idx]
+        v_v = [volumes[i] for i in today_idx]
+    else:
+        v_h, v_l, v_c, v_v = highs, lows, closes, volumes
+    tps = [(h + l + c) / 3 for h, l, c in zip(v_h, v_l, v_c)]
+    cum_tp_vol = sum(tp * v for tp, v in zip(tps, v_v))
+    cum_vol = sum(v_v)
+    vwap = cum_tp_vol / cum_vol if cum_vol > 0 else closes[-1]
+
+    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+    gains = [d if d > 0 else 0 for d in deltas]
+    losses = [-d if d < 0 else 0 for d in deltas]
+    avg_gain = np.mean(gains[:14])
+    avg_loss = np.mean(losses[:14])
+    for i in range(14, len(gains)):
+        avg_gain = (avg_gain * 13 + gains[i]) / 14
+        avg_loss = (avg_loss * 13 + losses[i]) / 14
+    rsi = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+
+    return {
+        "current_price": closes[-1],
+        "current_volume": volumes[-1],
+        "avg_volume": np.mean(volumes[-20:]),
+        "vwap": vwap,
+        "rsi": rsi,
+        "sma_10": np.mean(closes[-10:]),
+        "sma_20": np.mean(closes[-20:]),
+        "recent_high": max(highs[-20:]),
+        "recent_low": min(lows[-20:]),
+    }
+
+
+class TestIndicators(unittest.TestCase):
+
+    def test_matches_per_symbol_reference_exactly(self):
+        rng = np.random.default_rng(7)
+        # Mixed lengths, including one with too few session bars for session VWAP
+        bars_by_symbol = {
+            f"S{i}": _make_bars(rng, n, premarket=p)
+            for i, (n, p) in enumerate([(200, 30), (20, 10), (57, 55), (120, 0), (33, 31)])
+        }
+        symbols = list(bars_by_symbol)
+        packed = indicators.pack_bars(bars_by_symbol, symbols)
+        values = indicators.compute(packed, SESSION_OPEN.timestamp())
+
+        for row, symbol in enumerate(symbols):
+            expected = _reference(bars_by_symbol[symbol])
+            for name, value in expected.items():
+                self.assertEqual(values[name][row], value, f"{symbol} {name}")
+
+    def test_flat_prices_and_zero_volume(self):
+        start = SESSION_OPEN
+        bars = [Bar(start + timedelta(minutes=i), 10, 10, 10, 10, 0) for i in range(25)]
+        packed = indicators.pack_bars({"FLAT": bars}, ["FLAT"])
+        values = indicators.compute(packed, SESSION_OPEN.timestamp())
+        self.assertEqual(values["rsi"][0], 100.0)
+        self.assertEqual(values["vwap"][0], 10.0)
+        self.assertEqual(values["volume_ratio"][0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
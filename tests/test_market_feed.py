@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.account2_daytrader.market_feed import AlpacaStreamFeed, FeedEvent, ReplayFeed
+from tests.test_indicators import SESSION_OPEN, Bar, _make_bars
+
+
+class TestReplayFeed(unittest.TestCase):
+
+    def test_one_timestamp_per_call_for_subscribed_symbols(self):
+        rng = np.random.default_rng(1)
+        feed = ReplayFeed.from_bars({"A": _make_bars(rng, 3), "B": _make_bars(rng, 3)})
+        feed.subscribe(bars=["A", "B"])
+
+        first = feed.next_events()
+        self.assertEqual(sorted(e.symbol for e in first), ["A", "B"])
+        self.assertTrue(all(e.kind == "bar" for e in first))
+
+        feed.subscribe(bars=["B"])
+        self.assertEqual([e.symbol for e in feed.next_events()], ["B"])
+        self.assertEqual([e.symbol for e in feed.next_events()], ["B"])
+        self.assertTrue(feed.exhausted)
+        self.assertEqual(feed.next_events(), [])
+
+    def test_from_file(self):
+        rows = [
+            {"kind": "bar", "symbol": "A", "timestamp": "2026-03-02T14:31:00+00:00",
+             "open": 1, "high": 2, "low": 1, "close": 2, "volume": 100},
+            {"kind": "quote", "symbol": "A", "timestamp": "2026-03-02T14:30:30+00:00",
+             "bid_price": 1.0, "ask_price": 1.1},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(json.dumps(r) for r in rows))
+        self.addCleanup(os.remove, f.name)
+
+        feed = ReplayFeed.from_file(f.name)
+        feed.subscribe(bars=["A"], quotes=["A"])
+        quote, bar = feed.next_events(), feed.next_events()
+        self.assertEqual(quote[0].kind, "quote")
+        self.assertEqual(bar[0].data.close, 2)
+        self.assertEqual(bar[0].data.timestamp.minute, 31)
+
+
+class _ClockedReplay(ReplayFeed):
+    """Replay whose clock is the timestamp of the last delivered event."""
+
+    def __init__(self, events, start):
+        super().__init__(events)
+        self.now = start
+
+    def next_events(self, timeout=1.0):
+        events = super().next_events(timeout)
+        if events:
+            self.now = events[0].data.timestamp
+        return events
+
+
+class TestStreamingSession(unittest.TestCase):
+
+    def _run(self, feed, scanner, executor, clock):
+        from src.account2_daytrader import main
+        with patch.object(main, "AdaptiveEngine") as adaptive, \
+                patch.object(main, "_act_on_candidates") as act:
+            adaptive.return_value.should_cooldown.return_value = False
+            stats = main.run_streaming_session(
+                feed, scanner, executor, [], ["A", "B"], {},
+                no_new_trades_time=SESSION_OPEN + timedelta(hours=5),
+                force_close_time=SESSION_OPEN + timedelta(hours=6),
+                clock=clock,
+            )
+        return stats, act
+
+    def test_bars_drive_scans_and_exit_checks(self):
+        start = SESSION_OPEN
+        events = []
+        for i in range(3):
+            ts = start + timedelta(minutes=i)
+            events += [FeedEvent("bar", s, Bar(ts, 1, 1, 1, 1, 10)) for s in ("A", "B", "HELD")]
+        events.append(FeedEvent("quote", "HELD", Bar(start + timedelta(minutes=2, seconds=2),
+                                                     0, 0, 0, 0, 0)))
+        feed = _ClockedReplay(events, start)
+        scanner = MagicMock()
+        scanner.ingest_bars.return_value = 1
+        scanner.evaluate.side_effect = lambda syms: [{"symbol": s} for s in syms if s == "A"]
+        executor = MagicMock()
+        executor.state.positions = [MagicMock(symbol="HELD")]
+
+        stats, act = self._run(feed, scanner, executor, lambda: feed.now)
+
+        scanner.prime.assert_called_once_with(["A", "B"])
+        self.assertEqual(stats["bars"], 9)
+        self.assertEqual(stats["scans"], 3)
+        self.assertEqual(stats["setups"], 3)
+        # Only watchlist symbols are evaluated, never the held-only symbol
+        for call in scanner.evaluate.call_args_list:
+            self.assertEqual(call.args[0], ["A", "B"])
+        self.assertEqual(act.call_count, 3)
+        # Initial check, then minutes 1 and 2; the opening bar and the quote are throttled
+        self.assertEqual(stats["manage_calls"], 3)
+
+    def test_dead_stream_thread_ends_the_session(self):
+        with patch("src.account2_daytrader.market_feed.get_data_stream") as get_stream:
+            get_stream.return_value.run.side_effect = ConnectionError("socket closed")
+            feed = AlpacaStreamFeed("day_trader")
+        executor = MagicMock()
+        executor.state.positions = []
+
+        # The clock never reaches force close: only the dead feed can end the loop
+        stats, _ = self._run(feed, MagicMock(), executor, lambda: SESSION_OPEN)
+
+        feed._thread.join(timeout=1)
+        self.assertTrue(feed.exhausted)
+        self.assertEqual(stats["scans"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
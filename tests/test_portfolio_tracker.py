@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 
 from src.shared.portfolio_tracker import PortfolioTracker
+from src.shared.database import aggregate_outcomes
 from src.shared.config import STARTING_CAPITAL, PAPER_RESERVE
 
 
@@ -12,9 +13,12 @@ class TestPortfolioTracker(unittest.TestCase):
     def setUp(self, mock_db_cls, mock_alpaca_cls):
         self.mock_db = mock_db_cls.return_value
         self.mock_alpaca = mock_alpaca_cls.return_value
-        self.mock_db.get_trade_outcomes.return_value = []
+        self.mock_db.get_outcome_summary.return_value = aggregate_outcomes([]).get(
+            "all", {"trades": 0}
+        )
         self.mock_db.get_latest_snapshot.return_value = None
         self.mock_db.get_snapshots.return_value = []
+        self.mock_db.iter_snapshots.side_effect = lambda *a, **kw: iter([])
         self.mock_db.upsert_snapshot.return_value = {}
         self.mock_alpaca.get_positions.return_value = []
         # Default: $100k paper account, no P&L
@@ -47,11 +51,11 @@ class TestPortfolioTracker(unittest.TestCase):
         self.assertEqual(metrics["win_rate"], 0)
 
     def test_metrics_with_trades(self):
-        self.mock_db.get_trade_outcomes.return_value = [
+        self.mock_db.get_outcome_summary.return_value = aggregate_outcomes([
             {"realized_pnl": 100, "pnl_pct": 2.0},
             {"realized_pnl": -50, "pnl_pct": -1.0},
             {"realized_pnl": 200, "pnl_pct": 4.0},
-        ]
+        ])["all"]
         metrics = self.tracker.get_performance_metrics()
         self.assertEqual(metrics["total_trades"], 3)
         self.assertEqual(metrics["wins"], 2)
@@ -59,6 +63,19 @@ class TestPortfolioTracker(unittest.TestCase):
         self.assertAlmostEqual(metrics["win_rate"], 66.7, places=1)
         self.assertAlmostEqual(metrics["total_pnl"], 250, places=2)
 
+    def test_drawdown_uses_full_snapshot_history(self):
+        self.mock_db.get_outcome_summary.return_value = aggregate_outcomes([
+            {"realized_pnl": 100, "pnl_pct": 1.0},
+        ])["all"]
+        # Oldest-first: the peak is more than a year before the trough
+        equities = [10000, 12000] + [11000] * 400 + [9000]
+        self.mock_db.iter_snapshots.side_effect = lambda *a, **kw: iter(
+            {"equity": str(e)} for e in equities
+        )
+        metrics = self.tracker.get_performance_metrics()
+        self.assertAlmostEqual(metrics["max_drawdown_pct"], 25.0, places=2)
+        self.mock_db.get_snapshots.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.shared import protective_orders
+
+
+def _order(symbol, side, order_type, **kw):
+    return SimpleNamespace(symbol=symbol, side=side, order_type=order_type, **kw)
+
+
+class TestProtectiveOrders(unittest.TestCase):
+
+    def test_exit_orders_and_stop_leg(self):
+        orders = [
+            _order("AAPL", "sell", "limit"),
+            _order("AAPL", "sell", "stop", stop_price=95.0),
+            _order("AAPL", "buy", "market"),  # a pending entry, not an exit
+            _order("MSFT", "sell", "stop"),
+        ]
+        exits = protective_orders.exit_orders(orders, "AAPL", "buy")
+        self.assertEqual([o.order_type for o in exits], ["limit", "stop"])
+        self.assertEqual(protective_orders.stop_order(exits).stop_price, 95.0)
+        self.assertEqual(protective_orders.exit_orders(orders, "AAPL", "sell")[0].side, "buy")
+
+    def test_trailing_level_prices(self):
+        self.assertAlmostEqual(protective_orders.stop_price_for_pnl(100, "buy", 0.6), 100.6)
+        self.assertAlmostEqual(protective_orders.stop_price_for_pnl(100, "sell", 0.6), 99.4)
+        self.assertTrue(protective_orders.is_tighter("buy", 100.6, 98.0))
+        self.assertFalse(protective_orders.is_tighter("sell", 100.6, 98.0))
+
+    def test_record_broker_exit(self):
+        alpaca, db = MagicMock(), MagicMock()
+        alpaca.get_exit_fill.return_value = SimpleNamespace(
+            filled_avg_price="103", filled_qty="10", filled_at="2026-03-02T15:00:00Z",
+            order_type="limit",
+        )
+        trade = {"id": 7, "symbol": "AAPL", "side": "buy", "fill_price": 100.0,
+                 "created_at": "2026-03-02T14:35:00Z"}
+
+        outcome = protective_orders.record_broker_exit(alpaca, db, "day_trader", trade, "momentum")
+
+        self.assertEqual(outcome["realized_pnl"], 30.0)
+        self.assertEqual(outcome["pnl_pct"], 3.0)
+        self.assertEqual(outcome["exit_reason"], "target_hit")
+        db.update_trade.assert_called_once()
+        db.insert_trade_outcome.assert_called_once_with(outcome)
+
+    def test_no_exit_fill_leaves_trade_open(self):
+        alpaca, db = MagicMock(), MagicMock()
+        alpaca.get_exit_fill.return_value = None
+        trade = {"id": 7, "symbol": "AAPL", "side": "sell", "created_at": "x"}
+        self.assertIsNone(protective_orders.record_broker_exit(alpaca, db, "a", trade, "s"))
+        db.update_trade.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
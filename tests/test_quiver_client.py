@@ -0,0 +1,134 @@
+import glob
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.account1_quiver.quiver_client import QuiverClient, iter_json_records
+from src.account1_quiver.response_cache import ResponseCache, content_hash
+
+
+def _response(records, status=200, headers=None):
+    resp = MagicMock(status_code=status, headers=headers or {})
+    resp.content = json.dumps(records).encode() if records is not None else b""
+    return resp
+
+
+class TestQuiverResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = QuiverClient(use_cache=False)
+        self.client.cache = ResponseCache(self.tmp.name)
+        self.client.limiter = MagicMock()
+        self.client.session = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_conditional_request_reuses_cached_body_on_304(self):
+        self.client.session.get.return_value = _response([{"Ticker": "AAPL"}], headers={"ETag": '"v1"'})
+        first = self.client._get("/live/housetrading")
+        digest = self.client.fetch_stats["/live/housetrading"]["hash"]
+
+        self.client.session.get.return_value = _response(None, status=304)
+        second = self.client._get("/live/housetrading")
+
+        headers = self.client.session.get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(second, first)
+        stats = self.client.fetch_stats["/live/housetrading"]
+        self.assertTrue(stats["cached"])
+        self.assertEqual(stats["hash"], digest)
+
+    def test_fresh_entry_skips_the_request(self):
+        self.client.session.get.return_value = _response([{"Ticker": "LMT"}])
+        self.client._get("/live/lobbying")
+        self.client._get("/live/lobbying")  # within the lobbying freshness window
+        self.assertEqual(self.client.session.get.call_count, 1)
+        self.assertEqual(self.client.fetch_stats["/live/lobbying"]["records"], 1)
+
+    def test_changed_payload_gets_new_hash(self):
+        self.client.session.get.return_value = _response([{"Ticker": "A"}])
+        self.client._get("/live/housetrading")
+        before = self.client.fetch_stats["/live/housetrading"]["hash"]
+        self.client.session.get.return_value = _response([{"Ticker": "B"}])
+        self.client._get("/live/housetrading")
+        self.assertNotEqual(self.client.fetch_stats["/live/housetrading"]["hash"], before)
+
+    def test_interrupted_commit_keeps_body_and_hash_consistent(self):
+        cache = self.client.cache
+        cache.store("/live/housetrading", {}, b"old")
+        with patch.object(ResponseCache, "_write_json", side_effect=OSError("disk full")):
+            cache.store("/live/housetrading", {}, b"new")  # body placed, sidecar not
+
+        meta = cache.load("/live/housetrading", {})
+        self.assertEqual(cache.body("/live/housetrading", {}), b"old")
+        self.assertEqual(meta["hash"], content_hash(b"old"))
+
+        cache.store("/live/housetrading", {}, b"new")
+        self.assertEqual(cache.body("/live/housetrading", {}), b"new")
+        self.assertEqual(cache.load("/live/housetrading", {})["hash"], content_hash(b"new"))
+        self.assertEqual(len(glob.glob(os.path.join(self.tmp.name, "*.body.gz"))), 1)
+
+    def test_processed_hashes_persist(self):
+        self.client.cache.mark_processed("lobbying", "abc")
+        self.assertEqual(ResponseCache(self.tmp.name).processed_hash("lobbying"), "abc")
+        self.assertIsNone(self.client.cache.processed_hash("flights"))
+
+
+def _chunks(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class TestStreamingDecode(unittest.TestCase):
+
+    def test_records_split_across_chunks(self):
+        records = [{"Ticker": "AAPL", "Note": "caf\u00e9 [x], {y}"}, {"Ticker": "MSFT", "OTC_Short": 12.5}, 7]
+        body = json.dumps(records).encode()
+        for size in (1, 3, 7, 64):
+            self.assertEqual(list(iter_json_records(_chunks(body, size))), records)
+
+    def test_records_are_yielded_before_the_body_ends(self):
+        def chunks():
+            yield b'[{"Ticker": "A"}, '
+            raise ConnectionError("dropped")
+        stream = iter_json_records(chunks())
+        self.assertEqual(next(stream), {"Ticker": "A"})
+        with self.assertRaises(ConnectionError):
+            next(stream)
+
+    def test_results_envelope_and_truncation(self):
+        body = json.dumps({"results": [{"Ticker": "A"}]}).encode()
+        self.assertEqual(list(iter_json_records(_chunks(body, 5))), [{"Ticker": "A"}])
+        with self.assertRaises(ValueError):
+            list(iter_json_records([b'[{"Ticker": "A"}, {"Tick']))
+
+    def test_streamed_endpoint_caches_and_hashes_once_consumed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            client = QuiverClient(use_cache=False)
+            client.cache = ResponseCache(tmp)
+            client.limiter = MagicMock()
+            client.session = MagicMock()
+            records = [{"Ticker": "GME", "OTC_Short": 80, "OTC_Total": 100}]
+            resp = _response(records, headers={"ETag": '"v1"'})
+            resp.iter_content.side_effect = lambda size: iter(_chunks(resp.content, 10))
+            client.session.get.return_value = resp
+
+            stream = client._get("/live/offexchange")
+            self.assertTrue(client.session.get.call_args.kwargs["stream"])
+            self.assertIsNone(client.fetch_stats["/live/offexchange"]["hash"])
+            self.assertEqual(list(stream), records)
+            stats = client.fetch_stats["/live/offexchange"]
+            self.assertTrue(stats["ok"])
+            self.assertEqual(stats["bytes"], len(resp.content))
+
+            # Revalidated: the body is streamed back out of the cache
+            client.session.get.return_value = _response(None, status=304)
+            self.assertEqual(list(client._get("/live/offexchange")), records)
+            self.assertEqual(client.fetch_stats["/live/offexchange"]["hash"], stats["hash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
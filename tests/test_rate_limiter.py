@@ -0,0 +1,66 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.shared.rate_limiter import (
+    RateLimiter, SharedRateLimiter, ThrottledClient, get_rate_limiter,
+    get_rate_limiter_stats, limiter_for,
+)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_throttle(self):
+        limiter = RateLimiter(rate=50, capacity=2)
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 0.0)
+        start = time.monotonic()
+        waited = limiter.acquire()
+        self.assertGreater(waited, 0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+
+    def test_registry_shares_limiters_by_name(self):
+        a = get_rate_limiter("test:shared", rate=5)
+        b = get_rate_limiter("test:shared", rate=99)
+        self.assertIs(a, b)
+        self.assertEqual(b.rate, 5)
+
+    def test_stats_count_throttled_waits(self):
+        limiter = RateLimiter(rate=100, capacity=1)
+        limiter.acquire()
+        limiter.acquire()
+        stats = limiter.stats()
+        self.assertEqual(stats["acquired"], 2)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertGreater(stats["wait_seconds"], 0)
+
+    def test_file_backed_limiters_share_one_bucket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bucket.json")
+            # Two instances stand in for two processes using the same key
+            a = SharedRateLimiter(rate=50, capacity=2, path=path)
+            b = SharedRateLimiter(rate=50, capacity=2, path=path)
+            self.assertEqual(a.acquire(), 0.0)
+            self.assertEqual(b.acquire(), 0.0)
+            self.assertGreater(a.acquire(), 0)
+
+    def test_limiter_for_keys_by_credential_and_endpoint_class(self):
+        data = limiter_for("alpaca", "data", "key-1")
+        self.assertIs(limiter_for("alpaca", "data", "key-1"), data)
+        self.assertIsNot(limiter_for("alpaca", "data", "key-2"), data)
+        self.assertIsNot(limiter_for("alpaca", "trading", "key-1"), data)
+        self.assertFalse(any("key-1" in name for name in get_rate_limiter_stats()))
+
+    def test_throttled_client_acquires_per_call(self):
+        limiter = MagicMock()
+        client = ThrottledClient(MagicMock(timeout=5), limiter)
+        client.get_account()
+        client.get_all_positions()
+        self.assertEqual(client.timeout, 5)
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
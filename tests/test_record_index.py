@@ -0,0 +1,61 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.account1_quiver.record_index import RecordIndex, fingerprint
+
+
+class TestRecordIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "records.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_ignores_key_order_but_not_source(self):
+        a = {"Ticker": "AAPL", "Amount": 5}
+        b = {"Amount": 5, "Ticker": "AAPL"}
+        self.assertEqual(fingerprint("gov_contracts", a), fingerprint("gov_contracts", b))
+        self.assertNotEqual(fingerprint("gov_contracts", a), fingerprint("gov_contracts_all", a))
+
+    def test_seen_records_persist_across_opens(self):
+        records = [{"Ticker": "AAPL"}, {"Ticker": "MSFT"}]
+        index = RecordIndex(self.path)
+        new, fps = index.filter_new("wsb", records)
+        self.assertEqual(new, records)
+        index.add(fps)
+        index.conn.close()
+
+        index = RecordIndex(self.path)
+        new, fps = index.filter_new("wsb", records + [{"Ticker": "TSLA"}])
+        self.assertEqual(new, [{"Ticker": "TSLA"}])
+        self.assertEqual(len(fps), 1)
+        index.conn.close()
+
+    def test_streamed_records_are_filtered_lazily(self):
+        index = RecordIndex(self.path)
+        _, fps = index.filter_new("wsb", [{"Ticker": "OLD"}])
+        index.add(fps)
+        new, fps = index.filter_new("wsb", iter([{"Ticker": "OLD"}, {"Ticker": "NEW"}]))
+        self.assertEqual(fps, [])  # nothing consumed yet
+        self.assertEqual(list(new), [{"Ticker": "NEW"}])
+        self.assertEqual(len(fps), 1)
+        index.conn.close()
+
+    def test_compaction_drops_expired_fingerprints(self):
+        index = RecordIndex(self.path, ttl_days=1)
+        _, fps = index.filter_new("wsb", [{"Ticker": "OLD"}, {"Ticker": "NEW"}])
+        index.add(fps)
+        with index.conn:
+            index.conn.execute("UPDATE seen SET first_seen = ? WHERE fp = ?",
+                               (int(time.time()) - 3 * 86400, fps[0]))
+        self.assertEqual(index.compact(), 1)
+        self.assertEqual(len(index), 1)
+        index.conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
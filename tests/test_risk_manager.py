@@ -5,6 +5,15 @@ from src.shared.risk_manager import RiskManager
 from src.shared.config import STARTING_CAPITAL
 
 
+def _position(symbol, market_value=0.0):
+    pos = MagicMock()
+    pos.symbol = symbol
+    pos.market_value = str(market_value)
+    pos.unrealized_pl = "0"
+    pos.unrealized_intraday_pl = "0"
+    return pos
+
+
 class TestRiskManager(unittest.TestCase):
 
     @patch("src.shared.risk_manager.AlpacaClient")
@@ -12,24 +21,17 @@ class TestRiskManager(unittest.TestCase):
     def setUp(self, mock_db_cls, mock_alpaca_cls):
         self.mock_db = mock_db_cls.return_value
         self.mock_alpaca = mock_alpaca_cls.return_value
-        self.mock_db.get_trade_outcomes.return_value = []
+        self.mock_db.get_outcome_summary.return_value = {"total_pnl": 0.0}
         self.mock_alpaca.get_positions.return_value = []
-        self.mock_alpaca.get_invested_value.return_value = 0
-        self.mock_alpaca.get_position_count.return_value = 0
-        self.mock_alpaca.get_position.return_value = None
         self.risk = RiskManager("quiver_strat")
         self.risk.db = self.mock_db
-        self.risk.alpaca = self.mock_alpaca
 
     def test_working_capital_starts_at_10k(self):
         wc = self.risk.get_working_capital()
         self.assertEqual(wc, STARTING_CAPITAL)
 
     def test_working_capital_with_realized_pnl(self):
-        self.mock_db.get_trade_outcomes.return_value = [
-            {"realized_pnl": 500},
-            {"realized_pnl": -200},
-        ]
+        self.mock_db.get_outcome_summary.return_value = {"total_pnl": 300.0}
         wc = self.risk.get_working_capital()
         self.assertEqual(wc, STARTING_CAPITAL + 300)
 
@@ -39,7 +41,7 @@ class TestRiskManager(unittest.TestCase):
         self.assertEqual(reason, "OK")
 
     def test_cannot_exceed_max_invested(self):
-        self.mock_alpaca.get_invested_value.return_value = 8200
+        self.mock_alpaca.get_positions.return_value = [_position("MSFT", 8200)]
         can, reason = self.risk.can_open_position("AAPL", 600)
         self.assertFalse(can)
         self.assertIn("max invested", reason.lower())
@@ -51,23 +53,53 @@ class TestRiskManager(unittest.TestCase):
         self.assertIn("exceeds max", reason.lower())
 
     def test_cannot_exceed_max_positions(self):
-        self.mock_alpaca.get_position_count.return_value = 12
+        self.mock_alpaca.get_positions.return_value = [
+            _position(f"SYM{i}") for i in range(12)
+        ]
         can, reason = self.risk.can_open_position("AAPL", 500)
         self.assertFalse(can)
         self.assertIn("max positions", reason.lower())
 
     def test_cannot_open_duplicate_position(self):
-        self.mock_alpaca.get_position.return_value = MagicMock()
+        self.mock_alpaca.get_positions.return_value = [_position("AAPL", 100)]
         can, reason = self.risk.can_open_position("AAPL", 500)
         self.assertFalse(can)
         self.assertIn("already holding", reason.lower())
 
     def test_circuit_breaker(self):
-        self.mock_alpaca.get_invested_value.return_value = 12000  # > working capital
+        self.mock_alpaca.get_positions.return_value = [
+            _position("MSFT", 12000)  # > working capital
+        ]
         can, reason = self.risk.can_open_position("AAPL", 100)
         self.assertFalse(can)
         self.assertIn("circuit breaker", reason.lower())
 
+    def test_checks_share_one_positions_read(self):
+        self.risk.can_open_position("AAPL", 500)
+        self.risk.can_open_position("MSFT", 500)
+        self.assertEqual(self.mock_alpaca.get_positions.call_count, 1)
+
+    def test_recorded_fill_counts_toward_limits(self):
+        self.risk.state.record_open("AAPL", "buy", 500)
+        can, reason = self.risk.can_open_position("AAPL", 500)
+        self.assertFalse(can)
+        self.assertIn("already holding", reason.lower())
+        self.assertEqual(self.risk.get_invested_amount(), 500)
+
+        self.risk.state.record_close("AAPL")
+        self.assertTrue(self.risk.can_open_position("AAPL", 500)[0])
+
+    def test_refuses_while_positions_unknown_and_retries_next_check(self):
+        self.mock_alpaca.get_positions.side_effect = Exception("broker timeout")
+        can, reason = self.risk.can_open_position("AAPL", 500)
+        self.assertFalse(can)
+        self.assertIn("unavailable", reason.lower())
+
+        self.mock_alpaca.get_positions.side_effect = None
+        self.mock_alpaca.get_positions.return_value = [_position("AAPL", 100)]
+        can, reason = self.risk.can_open_position("AAPL", 500)
+        self.assertIn("already holding", reason.lower())
+
     def test_position_size_scales_with_confidence(self):
         size_high = self.risk.calculate_position_size("AAPL", 100)
         size_low = self.risk.calculate_position_size("AAPL", 50)
@@ -86,15 +118,11 @@ class TestDayTraderRisk(unittest.TestCase):
     def setUp(self, mock_db_cls, mock_alpaca_cls):
         self.mock_db = mock_db_cls.return_value
         self.mock_alpaca = mock_alpaca_cls.return_value
-        self.mock_db.get_trade_outcomes.return_value = []
+        self.mock_db.get_outcome_summary.return_value = {"total_pnl": 0.0}
         self.mock_db.get_todays_trades.return_value = []
         self.mock_alpaca.get_positions.return_value = []
-        self.mock_alpaca.get_invested_value.return_value = 0
-        self.mock_alpaca.get_position_count.return_value = 0
-        self.mock_alpaca.get_position.return_value = None
         self.risk = RiskManager("day_trader")
         self.risk.db = self.mock_db
-        self.risk.alpaca = self.mock_alpaca
 
     def test_max_daily_risk_2_percent(self):
         can, pnl = self.risk.check_daily_loss_limit()
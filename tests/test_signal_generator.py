@@ -1,20 +1,27 @@
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 
+from src.account1_quiver.config import SIGNAL_SOURCES
+from src.account1_quiver.record_index import RecordIndex
 from src.account1_quiver.signal_generator import SignalGenerator
 
 
 class TestSignalGenerator(unittest.TestCase):
 
+    @patch("src.account1_quiver.signal_generator.RecordIndex")
     @patch("src.account1_quiver.signal_generator.Database")
     @patch("src.account1_quiver.signal_generator.QuiverClient")
-    def setUp(self, mock_quiver_cls, mock_db_cls):
+    def setUp(self, mock_quiver_cls, mock_db_cls, mock_index_cls):
         self.mock_quiver = mock_quiver_cls.return_value
         self.mock_db = mock_db_cls.return_value
         self.mock_db.signal_exists.return_value = False
         self.generator = SignalGenerator()
         self.generator.quiver = self.mock_quiver
         self.generator.db = self.mock_db
+        self.generator.records = None
 
     def test_house_trade_buy(self):
         self.mock_quiver.get_house_trades.return_value = [
@@ -124,6 +131,101 @@ class TestSignalGenerator(unittest.TestCase):
         signals = self.generator._process_house_trading()
         self.assertEqual(len(signals), 0)
 
+    def test_concurrent_fetch_processes_sources_as_they_arrive(self):
+        self.mock_db.get_signal_keys_by_source.return_value = {}
+        self.mock_quiver.fetch_stats = {}
+        trade = {"Ticker": "AAPL", "Transaction": "Purchase", "Range": "$50,001 - $100,000"}
+
+        def slow_house():
+            time.sleep(0.2)
+            return [trade]
+        self.mock_quiver.get_house_trades.side_effect = slow_house
+        self.mock_quiver.get_senate_trades.return_value = [trade]
+        for getter in ("get_gov_contracts", "get_gov_contracts_all", "get_lobbying",
+                       "get_off_exchange", "get_flights"):
+            getattr(self.mock_quiver, getter).return_value = None
+
+        with patch.dict("src.account1_quiver.signal_generator.QUIVER_FETCH",
+                        {"concurrent": True, "workers": 4}):
+            signals = self.generator.generate_all_signals()
+
+        # Senate is listed after House but its response came back first
+        self.assertEqual([s["source"] for s in signals], ["senate_trading", "house_trading"])
+        self.mock_quiver.get_house_trades.assert_called_once()
+        self.mock_quiver.get_lobbying.assert_called_once()
+
+    def test_traced_memory_is_labelled_process_wide_when_concurrent(self):
+        self.mock_db.get_signal_keys_by_source.return_value = {}
+        self.mock_quiver.get_house_trades.return_value = []
+        endpoint = SIGNAL_SOURCES["house_trading"]["endpoint"]
+        with patch.dict("src.account1_quiver.signal_generator.SIGNAL_SOURCES",
+                        {"house_trading": SIGNAL_SOURCES["house_trading"]}, clear=True):
+            for concurrent, key in ((False, "peak_kb"), (True, "process_peak_kb")):
+                self.mock_quiver.fetch_stats = {}
+                with patch.dict("src.account1_quiver.signal_generator.QUIVER_FETCH",
+                                {"concurrent": concurrent, "trace_memory": True}):
+                    self.generator.generate_all_signals()
+                self.assertEqual(list(self.mock_quiver.fetch_stats[endpoint]), [key])
+
+    def test_unchanged_payload_skips_processor(self):
+        self.mock_db.get_signal_keys_by_source.return_value = {}
+        self.mock_quiver.cache.processed_hash.side_effect = {"lobbying": "h1"}.get
+        self.mock_quiver.fetch_stats = {
+            "/live/lobbying": {"ok": True, "hash": "h1", "seconds": 0.0, "bytes": 0},
+            "/live/housetrading": {"ok": True, "hash": "h2", "seconds": 0.4, "bytes": 900},
+        }
+        with patch.object(self.generator, "_process_lobbying") as lobbying, \
+                patch.object(self.generator, "_process_house_trading", return_value=[]) as house:
+            with patch.dict("src.account1_quiver.signal_generator.SIGNAL_SOURCES", {
+                "lobbying": {**SIGNAL_SOURCES["lobbying"]},
+                "house_trading": {**SIGNAL_SOURCES["house_trading"]},
+            }, clear=True):
+                self.generator.generate_all_signals()
+
+        lobbying.assert_not_called()
+        house.assert_called_once()
+        # Marked only once the caller has stored the signals
+        self.mock_quiver.cache.mark_processed.assert_not_called()
+        self.generator.commit_processed()
+        self.mock_quiver.cache.mark_processed.assert_called_once_with("house_trading", "h2")
+
+    def test_record_index_filters_seen_records(self):
+        self.mock_db.get_signal_keys_by_source.return_value = {}
+        self.mock_quiver.fetch_stats = {}
+        trades = [
+            {"Ticker": t, "Transaction": "Purchase", "Range": "$50,001 - $100,000"}
+            for t in ("AAPL", "MSFT")
+        ]
+        self.mock_quiver.get_house_trades.return_value = trades
+        with tempfile.TemporaryDirectory() as tmp:
+            self.generator.records = RecordIndex(os.path.join(tmp, "records.sqlite"))
+            _, fps = self.generator.records.filter_new("house_trading", trades[:1])
+            self.generator.records.add(fps)  # AAPL processed on an earlier run
+
+            with patch.dict("src.account1_quiver.signal_generator.SIGNAL_SOURCES",
+                            {"house_trading": SIGNAL_SOURCES["house_trading"]}, clear=True):
+                first = self.generator.generate_all_signals()
+                retried = self.generator.generate_all_signals()  # first run's insert failed
+                self.generator.commit_processed()
+                second = self.generator.generate_all_signals()
+            self.generator.records.conn.close()
+
+        self.assertEqual([s["symbol"] for s in first], ["MSFT"])
+        self.assertEqual([s["symbol"] for s in retried], ["MSFT"])
+        self.assertEqual(second, [])
+
+    def test_prefetched_keys_cover_gov_contracts_all(self):
+        keys = {"gov_contracts": {("RTX", "gov_contract")}}
+        self.assertEqual(self.generator._existing_keys("gov_contracts_all", keys),
+                         {("RTX", "gov_contract")})
+        self.assertEqual(self.generator._existing_keys("lobbying", keys), set())
+        self.mock_db.get_existing_signal_keys.assert_not_called()
+
+        # Failed prefetch falls back to per-source queries
+        self.mock_db.get_existing_signal_keys.return_value = {("LMT", "gov_contract_all")}
+        self.generator._existing_keys("gov_contracts_all", None)
+        self.assertEqual(self.mock_db.get_existing_signal_keys.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
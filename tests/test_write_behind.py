@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from src.shared.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("src.shared.write_behind.get_db")
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.insert = self.client.table.return_value.insert
+
+    def _queue(self, **kwargs):
+        params = {"batch_size": 3, "flush_interval": 60, "retry_backoff": 0}
+        params.update(kwargs)
+        queue = WriteBehindQueue(**params)
+        self.addCleanup(queue.close, 1)
+        return queue
+
+    def test_flush_batches_rows_per_table(self):
+        queue = self._queue()
+        for i in range(4):
+            queue.enqueue("claude_analyses", {"n": i})
+        queue.enqueue("health_checks", {"status": "success"})
+
+        self.assertTrue(queue.flush(timeout=5))
+        batches = [c.args[0] for c in self.insert.call_args_list]
+        self.assertIn([{"n": 0}, {"n": 1}, {"n": 2}], batches)
+        self.assertIn([{"n": 3}], batches)
+        self.assertIn([{"status": "success"}], batches)
+        stats = queue.stats()
+        self.assertEqual((stats["queued"], stats["written"], stats["pending"]), (5, 5, 0))
+
+    def test_full_queue_drops_new_rows(self):
+        queue = self._queue(max_queued=2)
+        queue._ensure_worker = MagicMock()  # no worker, so nothing drains
+        self.assertTrue(queue.enqueue("health_checks", {}))
+        self.assertTrue(queue.enqueue("health_checks", {}))
+        self.assertFalse(queue.enqueue("health_checks", {}))
+        self.assertEqual(queue.stats()["dropped"], 1)
+
+    def test_failed_batch_retried_then_dropped(self):
+        self.insert.return_value.execute.side_effect = Exception("503")
+        queue = self._queue(max_attempts=2)
+        queue.enqueue("claude_analyses", {"n": 1})
+
+        queue.flush(timeout=5)
+        stats = queue.stats()
+        self.assertEqual(self.insert.call_count, 2)
+        self.assertEqual((stats["retries"], stats["dropped"], stats["failed_batches"]), (1, 1, 1))
+
+    def test_closed_queue_rejects_rows(self):
+        queue = self._queue()
+        queue.close()
+        self.assertFalse(queue.enqueue("health_checks", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()